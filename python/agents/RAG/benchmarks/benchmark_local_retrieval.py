@@ -0,0 +1,153 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures the latency of local retrieval against the size of the index.
+
+Builds indexes of synthetic, clustered embeddings of increasing sizes, and for
+each reports the p50 and p99 latency of:
+
+  * exact: searching all the chunks,
+  * ivf: searching the clusters of the inverted file index closest to the
+    query, with its recall@k against the exact search,
+  * cached: the retrieval tool answering a query it has already answered.
+
+Usage (from the RAG directory):
+
+    python -m benchmarks.benchmark_local_retrieval --sizes=10000,100000
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from typing import Sequence
+
+import numpy as np
+
+from rag.shared_libraries import local_retrieval
+
+
+class SyntheticEmbedder:
+    """Embeds "query <i>" as the i-th of the given query vectors."""
+
+    def __init__(self, queries: np.ndarray):
+        self.name = "synthetic"
+        self.dimension = queries.shape[1]
+        self._queries = queries
+
+    def embed(self, texts: Sequence[str], task_type: str) -> np.ndarray:
+        return self._queries[[int(text.split()[-1]) for text in texts]]
+
+
+def clustered_vectors(
+    rng: np.random.Generator, centers: np.ndarray, count: int, noise: float
+) -> np.ndarray:
+    assignments = rng.integers(len(centers), size=count)
+    vectors = centers[assignments] + noise * rng.standard_normal(
+        (count, centers.shape[1]), dtype=np.float32
+    )
+    return vectors.astype(np.float32)
+
+
+def percentiles(latencies: list[float]) -> str:
+    p50, p99 = np.percentile(np.asarray(latencies) * 1e3, [50, 99])
+    return f"p50={p50:.3f}ms p99={p99:.3f}ms"
+
+
+def benchmark(size: int, args: argparse.Namespace) -> None:
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((args.topics, args.dimension), dtype=np.float32)
+    queries = clustered_vectors(rng, centers, args.queries, args.noise)
+    with tempfile.TemporaryDirectory() as index_dir:
+        chunks = [
+            local_retrieval.Chunk(text=f"chunk {i}", source="synthetic")
+            for i in range(size)
+        ]
+        batches = (
+            clustered_vectors(rng, centers, min(10_000, size - start), args.noise)
+            for start in range(0, size, 10_000)
+        )
+        start = time.perf_counter()
+        local_retrieval.write_index(
+            index_dir, chunks, batches, "synthetic", args.dimension
+        )
+        build_secs = time.perf_counter() - start
+        tool = local_retrieval.LocalRagRetrieval(
+            name="retrieve",
+            description="",
+            index_dir=index_dir,
+            embedder=SyntheticEmbedder(queries),
+            similarity_top_k=args.top_k,
+            nprobe=args.nprobe,
+        )
+        index = tool.index
+
+        exact_latencies, ivf_latencies, recalls = [], [], []
+        for query in queries:
+            start = time.perf_counter()
+            exact = index.search(query, args.top_k)
+            exact_latencies.append(time.perf_counter() - start)
+            if index.centroids is None:
+                continue
+            start = time.perf_counter()
+            approximate = index.search(query, args.top_k, args.nprobe)
+            ivf_latencies.append(time.perf_counter() - start)
+            recalls.append(
+                len({i for i, _ in exact} & {i for i, _ in approximate}) / args.top_k
+            )
+
+        async def run_tool():
+            latencies = []
+            for i in range(len(queries)):
+                await tool.run_async(args={"query": f"query {i}"}, tool_context=None)
+            for i in range(len(queries)):
+                start = time.perf_counter()
+                await tool.run_async(args={"query": f"query {i}"}, tool_context=None)
+                latencies.append(time.perf_counter() - start)
+            return latencies
+
+        cached_latencies = asyncio.run(run_tool())
+        index.close()
+
+    print(f"{size:>9} chunks: built in {build_secs:.1f}s")
+    print(f"{'':>9} exact:  {percentiles(exact_latencies)}")
+    if ivf_latencies:
+        print(
+            f"{'':>9} ivf:    {percentiles(ivf_latencies)}"
+            f" recall@{args.top_k}={np.mean(recalls):.3f}"
+            f" ({index.metadata['ivf_lists']} lists, nprobe={args.nprobe})"
+        )
+    print(f"{'':>9} cached: {percentiles(cached_latencies)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000",
+        help="Comma-separated numbers of chunks.",
+    )
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top_k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=8)
+    args = parser.parse_args()
+    for size in args.sizes.split(","):
+        benchmark(int(size), args)
+
+
+if __name__ == "__main__":
+    main()
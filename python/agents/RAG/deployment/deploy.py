@@ -62,6 +62,7 @@ remote_app = agent_engines.create(
         "tqdm",
         "requests",
         "llama-index",
+        "numpy",
     ],
     extra_packages=[
         "./rag",
@@ -20,25 +20,39 @@ from vertexai.preview import rag
 
 from dotenv import load_dotenv
 from .prompts import return_instructions_root
+from .shared_libraries.local_retrieval import LocalRagRetrieval
 
 load_dotenv()
 
-ask_vertex_retrieval = VertexAiRagRetrieval(
-    name='retrieve_rag_documentation',
-    description=(
-        'Use this tool to retrieve documentation and reference materials for the question from the RAG corpus,'
-    ),
-    rag_resources=[
-        rag.RagResource(
-            # please fill in your own rag corpus
-            # here is a sample rag corpus for testing purpose
-            # e.g. projects/123/locations/us-central1/ragCorpora/456
-            rag_corpus=os.environ.get("RAG_CORPUS")
-        )
-    ],
-    similarity_top_k=10,
-    vector_distance_threshold=0.6,
-)
+if os.environ.get("RAG_LOCAL_INDEX_DIR"):
+    # A local index, built with rag/shared_libraries/local_retrieval.py,
+    # searched without RAG Engine.
+    ask_vertex_retrieval = LocalRagRetrieval(
+        name='retrieve_rag_documentation',
+        description=(
+            'Use this tool to retrieve documentation and reference materials for the question from the RAG corpus,'
+        ),
+        index_dir=os.environ["RAG_LOCAL_INDEX_DIR"],
+        similarity_top_k=10,
+        vector_distance_threshold=0.6,
+    )
+else:
+    ask_vertex_retrieval = VertexAiRagRetrieval(
+        name='retrieve_rag_documentation',
+        description=(
+            'Use this tool to retrieve documentation and reference materials for the question from the RAG corpus,'
+        ),
+        rag_resources=[
+            rag.RagResource(
+                # please fill in your own rag corpus
+                # here is a sample rag corpus for testing purpose
+                # e.g. projects/123/locations/us-central1/ragCorpora/456
+                rag_corpus=os.environ.get("RAG_CORPUS")
+            )
+        ],
+        similarity_top_k=10,
+        vector_distance_threshold=0.6,
+    )
 
 root_agent = Agent(
     model='gemini-2.5-flash',
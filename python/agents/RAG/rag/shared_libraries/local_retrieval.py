@@ -0,0 +1,534 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A local retrieval backend, for running the RAG agent without RAG Engine.
+
+Documents are split into overlapping chunks, whose embeddings are stored in an
+index directory:
+
+  * embeddings.npy: the normalized embeddings, as a float32 matrix which is
+    memory-mapped rather than loaded,
+  * chunks.jsonl: the chunks, one JSON object per line, with
+    chunk_offsets.npy holding where each line starts,
+  * ivf.npz: optionally, an inverted file index of the embeddings, which
+    restricts searches to the clusters closest to the query,
+  * index.json: the embedder and the size of the index.
+
+Usage, to index documents (local paths or URLs) from the RAG directory:
+
+    python rag/shared_libraries/local_retrieval.py --index_dir=local_index \\
+        https://abc.xyz/assets/77/51/9841ad5c4fbe85b4440c47a4df8d/goog-10-k-2024.pdf
+
+Then set RAG_LOCAL_INDEX_DIR in the .env file, for the agent to use it.
+"""
+
+import argparse
+import asyncio
+from collections import OrderedDict
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Any, Iterable, Iterator, Optional, Protocol, Sequence
+
+from google.adk.tools.retrieval.base_retrieval_tool import BaseRetrievalTool
+from google.adk.tools.tool_context import ToolContext
+import numpy as np
+import requests
+
+EMBEDDINGS_FILE = "embeddings.npy"
+CHUNKS_FILE = "chunks.jsonl"
+CHUNK_OFFSETS_FILE = "chunk_offsets.npy"
+IVF_FILE = "ivf.npz"
+METADATA_FILE = "index.json"
+
+# Indexes smaller than this are always searched exhaustively.
+MIN_IVF_CHUNKS = 20_000
+
+
+class Embedder(Protocol):
+    """Embeds texts into vectors, e.g. with a remote model."""
+
+    # How the index refers to the embedder, see `make_embedder`.
+    name: str
+    dimension: int
+
+    def embed(self, texts: Sequence[str], task_type: str) -> np.ndarray:
+        """Returns the embeddings of the texts, as a (len(texts), dimension) matrix.
+
+        Args:
+          texts: The texts to embed.
+          task_type: RETRIEVAL_DOCUMENT for chunks, RETRIEVAL_QUERY for queries.
+        """
+
+
+class HashingEmbedder:
+    """Embeds texts locally, by hashing their words and word pairs.
+
+    It needs no model nor network, which suits tests and offline runs; its
+    similarities are lexical rather than semantic.
+    """
+
+    def __init__(self, dimension: int = 1024):
+        self.name = f"hashing:{dimension}"
+        self.dimension = dimension
+
+    def _bucket(self, feature: str) -> tuple[int, float]:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dimension, 1.0 if value >> 63 else -1.0
+
+    def embed(self, texts: Sequence[str], task_type: str) -> np.ndarray:
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = re.findall(r"\w+", text.lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                bucket, sign = self._bucket(feature)
+                embeddings[row, bucket] += sign
+        return embeddings
+
+
+class VertexAiEmbedder:
+    """Embeds texts with a Vertex AI text embedding model.
+
+    The default model is the one the RAG Engine corpus is created with.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "text-embedding-004",
+        dimension: int = 768,
+        batch_size: int = 64,
+    ):
+        self.name = f"vertex:{model_name}"
+        self.dimension = dimension
+        self.batch_size = batch_size
+        self._model_name = model_name
+        self._model = None
+
+    def embed(self, texts: Sequence[str], task_type: str) -> np.ndarray:
+        from vertexai.language_models import TextEmbeddingInput, TextEmbeddingModel
+
+        if self._model is None:
+            self._model = TextEmbeddingModel.from_pretrained(self._model_name)
+        embeddings = []
+        for start in range(0, len(texts), self.batch_size):
+            inputs = [
+                TextEmbeddingInput(text, task_type)
+                for text in texts[start : start + self.batch_size]
+            ]
+            embeddings.extend(
+                embedding.values
+                for embedding in self._model.get_embeddings(
+                    inputs, output_dimensionality=self.dimension
+                )
+            )
+        return np.asarray(embeddings, dtype=np.float32).reshape(-1, self.dimension)
+
+
+def make_embedder(name: str) -> Embedder:
+    """Returns the embedder of the given name, e.g. "hashing:1024"."""
+    kind, _, arg = name.partition(":")
+    if kind == "hashing":
+        return HashingEmbedder(int(arg or 1024))
+    if kind == "vertex":
+        return VertexAiEmbedder(arg or "text-embedding-004")
+    raise ValueError(f"Unknown embedder: {name}")
+
+
+@dataclasses.dataclass
+class Chunk:
+    """A chunk of a document."""
+
+    text: str
+    source: str
+
+
+def chunk_text(
+    text: str, chunk_chars: int = 4000, overlap_chars: int = 800
+) -> Iterator[str]:
+    """Splits the text into overlapping chunks, at whitespace where possible.
+
+    The defaults approximate RAG Engine's chunks of 1024 tokens, with 200 tokens
+    of overlap.
+    """
+    text = re.sub(r"\s+", " ", text).strip()
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_chars, len(text))
+        if end < len(text):
+            space = text.rfind(" ", start + chunk_chars // 2, end)
+            end = space if space != -1 else end
+        yield text[start:end].strip()
+        if end == len(text):
+            break
+        start = max(end - overlap_chars, start + 1)
+        space = text.find(" ", start, end)
+        start = space + 1 if space != -1 else start
+
+
+def read_document(path: str) -> str:
+    """Returns the text of a PDF or text file."""
+    if path.lower().endswith(".pdf"):
+        from pypdf import PdfReader
+
+        return "\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Returns the positions of the k highest scores, highest first."""
+    if k <= 0:
+        return np.arange(0)
+    if k < len(scores):
+        positions = np.argpartition(-scores, k - 1)[:k]
+    else:
+        positions = np.arange(len(scores))
+    return positions[np.argsort(-scores[positions], kind="stable")]
+
+
+def _train_ivf(
+    embeddings: np.ndarray,
+    num_lists: int,
+    iterations: int = 10,
+    block_rows: int = 65536,
+    seed: int = 0,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Clusters the embeddings with spherical k-means, on a sample of them.
+
+    Returns:
+      The normalized centroids, the ids of the embeddings ordered by cluster,
+      and the offsets of each cluster's ids in them.
+    """
+    rng = np.random.default_rng(seed)
+    num_rows = len(embeddings)
+    num_lists = min(num_lists, num_rows)
+    sample_ids = np.sort(
+        rng.choice(num_rows, min(num_rows, num_lists * 64), replace=False)
+    )
+    sample = np.asarray(embeddings[sample_ids])
+    centroids = sample[rng.choice(len(sample), num_lists, replace=False)]
+    for _ in range(iterations):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        # Clusters left empty keep their centroid.
+        empty = np.bincount(assignments, minlength=num_lists) == 0
+        sums[empty] = centroids[empty]
+        centroids = _normalize(sums)
+
+    assignments = np.concatenate(
+        [
+            np.argmax(
+                np.asarray(embeddings[start : start + block_rows]) @ centroids.T, axis=1
+            )
+            for start in range(0, num_rows, block_rows)
+        ]
+    )
+    ids = np.argsort(assignments, kind="stable").astype(np.int64)
+    offsets = np.concatenate(
+        [[0], np.cumsum(np.bincount(assignments, minlength=num_lists))]
+    ).astype(np.int64)
+    return centroids.astype(np.float32), ids, offsets
+
+
+def write_index(
+    index_dir: str,
+    chunks: Sequence[Chunk],
+    embeddings: Iterable[np.ndarray],
+    embedder_name: str,
+    dimension: int,
+    ivf_lists: Optional[int] = None,
+) -> "LocalIndex":
+    """Writes an index of the chunks, given batches of their embeddings.
+
+    Args:
+      index_dir: The directory to write the index to.
+      chunks: The chunks to index.
+      embeddings: The embeddings of the chunks, in batches in the same order,
+        which are written to the memory-mapped matrix as they come.
+      embedder_name: The name of the embedder, to embed the queries with.
+      dimension: The dimension of the embeddings.
+      ivf_lists: The number of clusters of the inverted file index, 0 for none.
+        Defaults to none for small indexes, and 4 * sqrt(len(chunks)) otherwise.
+
+    Returns:
+      The index.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    matrix = np.lib.format.open_memmap(
+        os.path.join(index_dir, EMBEDDINGS_FILE),
+        mode="w+",
+        dtype=np.float32,
+        shape=(len(chunks), dimension),
+    )
+    row = 0
+    for batch in embeddings:
+        matrix[row : row + len(batch)] = _normalize(batch)
+        row += len(batch)
+    if row != len(chunks):
+        raise ValueError(f"Got {row} embeddings for {len(chunks)} chunks.")
+    matrix.flush()
+
+    offsets = []
+    with open(os.path.join(index_dir, CHUNKS_FILE), "wb") as f:
+        for chunk in chunks:
+            offsets.append(f.tell())
+            f.write(json.dumps(dataclasses.asdict(chunk)).encode("utf-8") + b"\n")
+    np.save(
+        os.path.join(index_dir, CHUNK_OFFSETS_FILE), np.asarray(offsets, dtype=np.int64)
+    )
+
+    if ivf_lists is None:
+        ivf_lists = 0 if len(chunks) < MIN_IVF_CHUNKS else int(4 * np.sqrt(len(chunks)))
+    ivf_path = os.path.join(index_dir, IVF_FILE)
+    if ivf_lists:
+        centroids, ids, list_offsets = _train_ivf(matrix, ivf_lists)
+        np.savez(ivf_path, centroids=centroids, ids=ids, offsets=list_offsets)
+    elif os.path.exists(ivf_path):
+        os.remove(ivf_path)
+
+    with open(os.path.join(index_dir, METADATA_FILE), "w") as f:
+        json.dump(
+            {
+                "embedder": embedder_name,
+                "dimension": dimension,
+                "chunks": len(chunks),
+                "ivf_lists": ivf_lists,
+            },
+            f,
+        )
+    return LocalIndex(index_dir)
+
+
+def build_index(
+    index_dir: str,
+    chunks: Sequence[Chunk],
+    embedder: Embedder,
+    batch_size: int = 256,
+    ivf_lists: Optional[int] = None,
+) -> "LocalIndex":
+    """Embeds the chunks and writes their index, see `write_index`."""
+    embeddings = (
+        embedder.embed(
+            [chunk.text for chunk in chunks[start : start + batch_size]],
+            "RETRIEVAL_DOCUMENT",
+        )
+        for start in range(0, len(chunks), batch_size)
+    )
+    return write_index(
+        index_dir, chunks, embeddings, embedder.name, embedder.dimension, ivf_lists
+    )
+
+
+class LocalIndex:
+    """An index written by `write_index`, searched exactly or with its IVF."""
+
+    def __init__(self, index_dir: str):
+        with open(os.path.join(index_dir, METADATA_FILE), "r") as f:
+            self.metadata = json.load(f)
+        self.embeddings = np.load(
+            os.path.join(index_dir, EMBEDDINGS_FILE), mmap_mode="r"
+        )
+        self._chunk_offsets = np.load(os.path.join(index_dir, CHUNK_OFFSETS_FILE))
+        self._chunks_file = open(os.path.join(index_dir, CHUNKS_FILE), "rb")
+        self._chunks_lock = threading.Lock()
+        self.centroids = None
+        if self.metadata["ivf_lists"]:
+            with np.load(os.path.join(index_dir, IVF_FILE)) as ivf:
+                self.centroids = ivf["centroids"]
+                self._ivf_ids = ivf["ids"]
+                self._ivf_offsets = ivf["offsets"]
+
+    def __len__(self) -> int:
+        return len(self.embeddings)
+
+    def chunk(self, i: int) -> Chunk:
+        with self._chunks_lock:
+            self._chunks_file.seek(int(self._chunk_offsets[i]))
+            line = self._chunks_file.readline()
+        return Chunk(**json.loads(line))
+
+    def search(
+        self, query: np.ndarray, top_k: int, nprobe: Optional[int] = None
+    ) -> list[tuple[int, float]]:
+        """Returns the ids and cosine similarities of the chunks closest to the query.
+
+        Args:
+          query: The embedding of the query.
+          top_k: How many chunks to return at most.
+          nprobe: How many clusters of the IVF to search, for an approximate
+            search; None or 0 searches all the chunks exactly.
+        """
+        query = _normalize(np.asarray(query, dtype=np.float32))
+        if self.centroids is not None and nprobe and nprobe < len(self.centroids):
+            lists = _top_k(self.centroids @ query, nprobe)
+            ids = np.concatenate(
+                [
+                    self._ivf_ids[self._ivf_offsets[l] : self._ivf_offsets[l + 1]]
+                    for l in lists
+                ]
+            )
+            # Read the rows of the memory-mapped matrix in order.
+            ids.sort()
+            scores = self.embeddings[ids] @ query
+        else:
+            ids = None
+            scores = self.embeddings @ query
+        positions = _top_k(scores, top_k)
+        if ids is not None:
+            return [(int(ids[p]), float(scores[p])) for p in positions]
+        return [(int(p), float(scores[p])) for p in positions]
+
+    def close(self) -> None:
+        self._chunks_file.close()
+
+
+class LocalRagRetrieval(BaseRetrievalTool):
+    """Retrieves chunks from a local index, as VertexAiRagRetrieval from a corpus.
+
+    Results of recent queries are cached, so a repeated question needs no
+    embedding nor search.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        description: str,
+        index_dir: str,
+        embedder: Optional[Embedder] = None,
+        similarity_top_k: int = 10,
+        vector_distance_threshold: Optional[float] = None,
+        nprobe: int = 8,
+        cache_size: int = 256,
+    ):
+        super().__init__(name=name, description=description)
+        self.index = LocalIndex(index_dir)
+        self.embedder = embedder or make_embedder(self.index.metadata["embedder"])
+        self.similarity_top_k = similarity_top_k
+        self.vector_distance_threshold = vector_distance_threshold
+        self.nprobe = nprobe
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, list[dict[str, Any]]] = OrderedDict()
+
+    def retrieve(self, query: str) -> list[dict[str, Any]]:
+        """Returns the text, source and cosine distance of the closest chunks."""
+        embedding = self.embedder.embed([query], "RETRIEVAL_QUERY")[0]
+        results = []
+        for i, similarity in self.index.search(
+            embedding, self.similarity_top_k, self.nprobe
+        ):
+            # Like RAG Engine, the threshold applies to the cosine distance.
+            distance = 1.0 - similarity
+            if (
+                self.vector_distance_threshold is not None
+                and distance > self.vector_distance_threshold
+            ):
+                break
+            chunk = self.index.chunk(i)
+            results.append(
+                {
+                    "text": chunk.text,
+                    "source": chunk.source,
+                    "distance": round(distance, 4),
+                }
+            )
+        return results
+
+    async def run_async(
+        self, *, args: dict[str, Any], tool_context: ToolContext
+    ) -> Any:
+        query = " ".join(args["query"].split())
+        results = self._cache.get(query)
+        if results is None:
+            results = await asyncio.to_thread(self.retrieve, query)
+            self._cache[query] = results
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(query)
+        if not results:
+            return f"No matching result found for the query: {query}"
+        return results
+
+
+def _download(url: str, directory: str) -> str:
+    """Downloads the URL into the directory, and returns the file's path."""
+    path = os.path.join(directory, os.path.basename(url.split("?")[0]) or "document")
+    response = requests.get(url, stream=True)
+    response.raise_for_status()
+    with open(path, "wb") as f:
+        for data in response.iter_content(chunk_size=8192):
+            f.write(data)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Builds a local retrieval index.")
+    parser.add_argument(
+        "sources", nargs="+", help="Paths or URLs of PDF or text files."
+    )
+    parser.add_argument("--index_dir", required=True, help="Where to write the index.")
+    parser.add_argument(
+        "--embedder",
+        default="vertex:text-embedding-004",
+        help='"vertex:<model>", or "hashing:<dimension>" to index offline.',
+    )
+    parser.add_argument("--chunk_chars", type=int, default=4000)
+    parser.add_argument("--overlap_chars", type=int, default=800)
+    parser.add_argument(
+        "--ivf_lists", type=int, default=None, help="0 to always search exactly."
+    )
+    args = parser.parse_args()
+
+    embedder = make_embedder(args.embedder)
+    if isinstance(embedder, VertexAiEmbedder):
+        import vertexai
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        vertexai.init(
+            project=os.getenv("GOOGLE_CLOUD_PROJECT"),
+            location=os.getenv("GOOGLE_CLOUD_LOCATION"),
+        )
+
+    chunks = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for source in args.sources:
+            path = source
+            if source.startswith(("http://", "https://")):
+                print(f"Downloading {source}...")
+                path = _download(source, temp_dir)
+            text = read_document(path)
+            chunks.extend(
+                Chunk(text=text, source=source)
+                for text in chunk_text(text, args.chunk_chars, args.overlap_chars)
+            )
+    print(f"Indexing {len(chunks)} chunks with {embedder.name}...")
+    index = build_index(args.index_dir, chunks, embedder, ivf_lists=args.ivf_lists)
+    print(f"Wrote an index of {len(index)} chunks to {args.index_dir}")
+
+
+if __name__ == "__main__":
+    main()
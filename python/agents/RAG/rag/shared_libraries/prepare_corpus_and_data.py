@@ -12,14 +12,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import argparse
+import concurrent.futures
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
 from google.auth import default
 from google.api_core.exceptions import ResourceExhausted
 import vertexai
 from vertexai.preview import rag
-import os
 from dotenv import load_dotenv, set_key
 import requests
-import tempfile
 
 # Load environment variables from .env file
 load_dotenv()
@@ -41,6 +51,18 @@ CORPUS_DESCRIPTION = "Corpus containing Alphabet's 10-K 2024 document"
 PDF_URL = "https://abc.xyz/assets/77/51/9841ad5c4fbe85b4440c47a4df8d/goog-10-k-2024.pdf"
 PDF_FILENAME = "goog-10-k-2024.pdf"
 ENV_FILE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".env"))
+# What was uploaded from each source, to skip unchanged sources on re-runs.
+STATE_FILE_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", ".ingestion_state.jsonl")
+)
+# The sources to upload when no manifest is given.
+DEFAULT_MANIFEST = [
+    {
+        "source": PDF_URL,
+        "display_name": PDF_FILENAME,
+        "description": "Alphabet's 10-K 2024 document",
+    }
+]
 
 
 # --- Start of the script ---
@@ -73,41 +95,328 @@ def create_or_get_corpus():
   return corpus
 
 
-def download_pdf_from_url(url, output_path):
-  """Downloads a PDF file from the specified URL."""
-  print(f"Downloading PDF from {url}...")
-  response = requests.get(url, stream=True)
-  response.raise_for_status()  # Raise an exception for HTTP errors
-  
-  with open(output_path, 'wb') as f:
-    for chunk in response.iter_content(chunk_size=8192):
-      f.write(chunk)
-  
-  print(f"PDF downloaded successfully to {output_path}")
-  return output_path
+def load_manifest(path):
+  """Loads the sources to upload from a JSON manifest.
+
+  The manifest is a list whose entries are either the URL or local path of a
+  file, or an object with its "source", and optionally its "display_name" and
+  "description". Repeated sources are only uploaded once, with their first
+  entry.
+  """
+  with open(path, "r") as f:
+    entries = json.load(f)
+  sources = []
+  seen = set()
+  for entry in entries:
+    if isinstance(entry, str):
+      entry = {"source": entry}
+    source = entry["source"]
+    if source in seen:
+      print(f"Skipping the repeated source {source}")
+      continue
+    seen.add(source)
+    sources.append({
+        "source": source,
+        "display_name": (
+            entry.get("display_name")
+            or os.path.basename(urlparse(source).path)
+            or source
+        ),
+        "description": entry.get("description", ""),
+    })
+  return sources
+
+
+def is_url(source):
+  return urlparse(source).scheme in ("http", "https")
+
+
+class IngestionState:
+  """Records the content hash and RAG file of each uploaded source.
+
+  The state is a journal of JSON lines, one per change to the entry of a
+  source, so that recording an upload appends a line rather than rewriting
+  the whole state. A run resumes after a crash with the sources that weren't
+  uploaded yet, and re-runs skip unchanged sources. The journal is compacted
+  when a run starts.
+
+  An upload is recorded as pending before it starts, so that `reconcile` can
+  find the RAG files of uploads that were interrupted before being recorded.
+  """
+
+  def __init__(self, path, corpus_name):
+    self.path = path
+    self.corpus_name = corpus_name
+    self._lock = threading.Lock()
+    self._corpora = {}
+    if os.path.exists(path):
+      with open(path, "r") as f:
+        for line in f:
+          try:
+            change = json.loads(line)
+          except json.JSONDecodeError:
+            # The last line of a run that crashed mid-write.
+            continue
+          files = self._corpora.setdefault(change["corpus"], {})
+          if change["entry"] is None:
+            files.pop(change["source"], None)
+          else:
+            files[change["source"]] = change["entry"]
+    self._files = self._corpora.setdefault(corpus_name, {})
+
+  def reconcile(self, rag_files):
+    """Reconciles the state with the files in the corpus, and compacts it.
+
+    Forgets the uploads whose RAG file is no longer in the corpus, and the
+    pending uploads, so that their sources are uploaded again.
+
+    Returns:
+      The files of pending uploads that reached the corpus without being
+      recorded: files not recorded for any source, with the display name of a
+      pending upload. They should be deleted, as their sources are uploaded
+      again.
+    """
+    with self._lock:
+      names = {file.name for file in rag_files}
+      recorded = {entry.get("rag_file") for entry in self._files.values()}
+      pending_names = set()
+      for source, entry in list(self._files.items()):
+        pending = entry.pop("pending", None)
+        if pending:
+          pending_names.add(pending["display_name"])
+        if entry.get("rag_file") not in names:
+          del self._files[source]
+      temp_path = f"{self.path}.tmp"
+      with open(temp_path, "w") as f:
+        for corpus_name, files in self._corpora.items():
+          for source, entry in files.items():
+            f.write(self._line(corpus_name, source, entry))
+      os.replace(temp_path, self.path)
+    return [
+        file
+        for file in rag_files
+        if file.name not in recorded and file.display_name in pending_names
+    ]
+
+  def get(self, source):
+    with self._lock:
+      return self._files.get(source)
+
+  @staticmethod
+  def _line(corpus_name, source, entry):
+    return json.dumps(
+        {"corpus": corpus_name, "source": source, "entry": entry}
+    ) + "\n"
+
+  def record(self, source, entry):
+    with self._lock:
+      self._files[source] = entry
+      with open(self.path, "a") as f:
+        f.write(self._line(self.corpus_name, source, entry))
+
+  def record_pending(self, source, display_name):
+    """Records that the source is about to be uploaded."""
+    previous = self.get(source) or {}
+    self.record(
+        source,
+        {
+            **previous,
+            "pending": {
+                "display_name": display_name,
+                "started_at": datetime.now(timezone.utc).isoformat(),
+            },
+        },
+    )
+
+
+class AdaptiveLimiter:
+  """Bounds the number of concurrent uploads, adapting it to the quota.
+
+  Each quota error halves the number of uploads allowed at once, down to one,
+  and each successful upload raises it by one, up to `max_concurrency`.
+  """
+
+  def __init__(self, max_concurrency):
+    self.max_concurrency = max_concurrency
+    self.limit = max_concurrency
+    self._active = 0
+    self._condition = threading.Condition()
+
+  def acquire(self):
+    with self._condition:
+      while self._active >= self.limit:
+        self._condition.wait()
+      self._active += 1
+
+  def release(self, throttled=False):
+    with self._condition:
+      self._active -= 1
+      if throttled:
+        self.limit = max(1, self.limit // 2)
+      else:
+        self.limit = min(self.max_concurrency, self.limit + 1)
+      self._condition.notify_all()
+
 
+def upload_with_backoff(limiter, max_retries, **upload_kwargs):
+  """Uploads a file with rag.upload_file, retrying on quota errors.
 
-def upload_pdf_to_corpus(corpus_name, pdf_path, display_name, description):
-  """Uploads a PDF file to the specified corpus."""
-  print(f"Uploading {display_name} to corpus...")
+  Retries wait exponentially longer, with jitter so that concurrent uploads
+  don't retry all at once.
+  """
+  for attempt in range(max_retries + 1):
+    limiter.acquire()
+    try:
+      rag_file = rag.upload_file(**upload_kwargs)
+    except ResourceExhausted:
+      limiter.release(throttled=True)
+      if attempt == max_retries:
+        raise
+      delay = min(60.0, 2.0 ** attempt) * random.uniform(0.5, 1.5)
+      print(
+          f"Quota exceeded uploading {upload_kwargs['display_name']},"
+          f" retrying in {delay:.1f}s with at most {limiter.limit} uploads at"
+          " once."
+      )
+      time.sleep(delay)
+    except BaseException:
+      limiter.release()
+      raise
+    else:
+      limiter.release()
+      return rag_file
+
+
+def fetch_source(source, output_path, previous):
+  """Downloads or reads the source, hashing its content as it streams.
+
+  Args:
+    source: The URL or local path of the file.
+    output_path: Where to download the file to, if it's a URL.
+    previous: The state of the source's last upload, if any, whose HTTP
+      validators make the server skip unchanged files.
+
+  Returns:
+    The path of the file, its SHA-256 and its HTTP validators, or None if the
+    server reports that the file didn't change.
+  """
+  sha256 = hashlib.sha256()
+  if not is_url(source):
+    with open(source, "rb") as f:
+      for chunk in iter(lambda: f.read(1 << 20), b""):
+        sha256.update(chunk)
+    return source, sha256.hexdigest(), {}
+
+  headers = {}
+  if previous and previous.get("etag"):
+    headers["If-None-Match"] = previous["etag"]
+  if previous and previous.get("last_modified"):
+    headers["If-Modified-Since"] = previous["last_modified"]
+  with requests.get(source, stream=True, headers=headers, timeout=60) as response:
+    if response.status_code == 304:
+      return None
+    response.raise_for_status()  # Raise an exception for HTTP errors
+    with open(output_path, "wb") as f:
+      for chunk in response.iter_content(chunk_size=1 << 16):
+        sha256.update(chunk)
+        f.write(chunk)
+    validators = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+  return output_path, sha256.hexdigest(), validators
+
+
+def ingest_source(corpus_name, entry, state, limiter, temp_dir, max_retries):
+  """Uploads the source to the corpus, unless it's unchanged since last time.
+
+  A changed source replaces the RAG file of its previous upload.
+
+  Returns:
+    "unchanged", "uploaded" or "updated".
+  """
+  source = entry["source"]
+  previous = state.get(source)
+  # Keep the basename, and so the extension, of the source, which the upload
+  # sends as the file name.
+  digest = hashlib.sha256(source.encode()).hexdigest()[:16]
+  basename = os.path.basename(urlparse(source).path) or "download"
+  output_path = os.path.join(temp_dir, f"{digest}_{basename}")
+  fetched = fetch_source(source, output_path, previous)
+  if fetched is None:
+    return "unchanged"
+  path, sha256, validators = fetched
   try:
-    rag_file = rag.upload_file(
+    if previous and previous["sha256"] == sha256:
+      state.record(source, {**previous, **validators})
+      return "unchanged"
+    state.record_pending(source, entry["display_name"])
+    rag_file = upload_with_backoff(
+        limiter,
+        max_retries,
         corpus_name=corpus_name,
-        path=pdf_path,
-        display_name=display_name,
-        description=description,
+        path=path,
+        display_name=entry["display_name"],
+        description=entry["description"],
     )
-    print(f"Successfully uploaded {display_name} to corpus")
-    return rag_file
-  except ResourceExhausted as e:
-    print(f"Error uploading file {display_name}: {e}")
-    print("\nThis error suggests that you have exceeded the API quota for the embedding model.")
-    print("This is common for new Google Cloud projects.")
-    print("Please see the 'Troubleshooting' section in the README.md for instructions on how to request a quota increase.")
-    return None
-  except Exception as e:
-    print(f"Error uploading file {display_name}: {e}")
-    return None
+  finally:
+    if path == output_path:
+      os.remove(output_path)
+  state.record(source, {
+      "sha256": sha256,
+      **validators,
+      "rag_file": rag_file.name,
+      "display_name": entry["display_name"],
+      "uploaded_at": datetime.now(timezone.utc).isoformat(),
+  })
+  if previous:
+    try:
+      rag.delete_file(name=previous["rag_file"])
+    except Exception as e:
+      print(f"Could not delete the previous upload of {source}: {e}")
+  return "updated" if previous else "uploaded"
+
+
+def ingest_sources(corpus_name, sources, state, max_workers, max_retries):
+  """Ingests the sources concurrently, and returns the number of each outcome.
+
+  Up to `max_workers` sources are downloaded and uploaded at once, and fewer
+  are uploaded at once while the embedding quota is exceeded.
+  """
+  limiter = AdaptiveLimiter(max_workers)
+  outcomes = {"uploaded": 0, "updated": 0, "unchanged": 0, "failed": 0}
+  with tempfile.TemporaryDirectory() as temp_dir:
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+      futures = {
+          executor.submit(
+              ingest_source,
+              corpus_name,
+              entry,
+              state,
+              limiter,
+              temp_dir,
+              max_retries,
+          ): entry
+          for entry in sources
+      }
+      for future in concurrent.futures.as_completed(futures):
+        entry = futures[future]
+        try:
+          outcome = future.result()
+        except ResourceExhausted as e:
+          outcome = "failed"
+          print(f"Error uploading file {entry['display_name']}: {e}")
+          print("\nThis error suggests that you have exceeded the API quota for the embedding model.")
+          print("This is common for new Google Cloud projects.")
+          print("Please see the 'Troubleshooting' section in the README.md for instructions on how to request a quota increase.")
+        except Exception as e:
+          outcome = "failed"
+          print(f"Error ingesting {entry['source']}: {e}")
+        else:
+          print(f"{entry['display_name']}: {outcome}")
+        outcomes[outcome] += 1
+  return outcomes
+
 
 def update_env_file(corpus_name, env_file_path):
     """Updates the .env file with the corpus name."""
@@ -126,27 +435,53 @@ def list_corpus_files(corpus_name):
 
 
 def main():
+  parser = argparse.ArgumentParser(
+      description="Creates the RAG corpus and uploads files to it."
+  )
+  parser.add_argument(
+      "--manifest",
+      help="JSON list of the URLs or paths of the files to upload. Defaults"
+      " to Alphabet's 10-K 2024 document.",
+  )
+  parser.add_argument(
+      "--max_workers",
+      type=int,
+      default=8,
+      help="How many files to download and upload at once.",
+  )
+  parser.add_argument(
+      "--max_retries",
+      type=int,
+      default=6,
+      help="How many times to retry an upload exceeding the quota.",
+  )
+  parser.add_argument(
+      "--state_file",
+      default=STATE_FILE_PATH,
+      help="Where to record the uploaded files, to skip them on re-runs.",
+  )
+  args = parser.parse_args()
+  sources = load_manifest(args.manifest) if args.manifest else DEFAULT_MANIFEST
+
   initialize_vertex_ai()
   corpus = create_or_get_corpus()
 
   # Update the .env file with the corpus name
   update_env_file(corpus.name, ENV_FILE_PATH)
-  
-  # Create a temporary directory to store the downloaded PDF
-  with tempfile.TemporaryDirectory() as temp_dir:
-    pdf_path = os.path.join(temp_dir, PDF_FILENAME)
-    
-    # Download the PDF from the URL
-    download_pdf_from_url(PDF_URL, pdf_path)
-    
-    # Upload the PDF to the corpus
-    upload_pdf_to_corpus(
-        corpus_name=corpus.name,
-        pdf_path=pdf_path,
-        display_name=PDF_FILENAME,
-        description="Alphabet's 10-K 2024 document"
+
+  # Upload the files to the corpus
+  state = IngestionState(args.state_file, corpus.name)
+  for file in state.reconcile(list(rag.list_files(corpus_name=corpus.name))):
+    print(
+        f"Deleting {file.display_name} ({file.name}), left by an interrupted"
+        " upload"
     )
-  
+    rag.delete_file(name=file.name)
+  outcomes = ingest_sources(
+      corpus.name, sources, state, args.max_workers, args.max_retries
+  )
+  print(", ".join(f"{count} {outcome}" for outcome, count in outcomes.items()))
+
   # List all files in the corpus
   list_corpus_files(corpus_name=corpus.name)
 
@@ -0,0 +1,136 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the local retrieval backend, with the offline HashingEmbedder."""
+
+import asyncio
+import os
+
+import pytest
+
+from rag.shared_libraries import local_retrieval
+from rag.shared_libraries.local_retrieval import Chunk, HashingEmbedder
+
+TOPICS = [
+    "revenue grew in the cloud segment",
+    "advertising income from search",
+    "capital expenditures on data centers",
+    "employee headcount and compensation",
+    "legal proceedings and regulatory fines",
+]
+
+
+def make_chunks(num_chunks: int) -> list[Chunk]:
+    return [
+        Chunk(
+            text=f"{TOPICS[i % len(TOPICS)]} in quarter {i} of the fiscal year",
+            source=f"doc{i % 3}.pdf",
+        )
+        for i in range(num_chunks)
+    ]
+
+
+@pytest.fixture
+def embedder():
+    return HashingEmbedder(dimension=256)
+
+
+def test_build_and_search(tmp_path, embedder):
+    chunks = make_chunks(20)
+    index = local_retrieval.build_index(str(tmp_path), chunks, embedder, batch_size=7)
+    assert len(index) == 20
+    assert index.centroids is None
+
+    # Reopened from disk, the best match of a chunk's own text is itself.
+    index = local_retrieval.LocalIndex(str(tmp_path))
+    query = embedder.embed([chunks[12].text], "RETRIEVAL_QUERY")[0]
+    results = index.search(query, top_k=3)
+    assert results[0][0] == 12
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert [score for _, score in results] == sorted(
+        (score for _, score in results), reverse=True
+    )
+    assert index.chunk(12) == chunks[12]
+    index.close()
+
+
+def test_ivf_search(tmp_path, embedder):
+    chunks = make_chunks(300)
+    index = local_retrieval.build_index(str(tmp_path), chunks, embedder, ivf_lists=8)
+    assert index.centroids.shape == (8, embedder.dimension)
+    assert os.path.exists(tmp_path / local_retrieval.IVF_FILE)
+
+    query = embedder.embed([chunks[42].text], "RETRIEVAL_QUERY")[0]
+    # Probing every cluster is exact, and the closest cluster of a chunk's
+    # embedding is the one it is filed under.
+    assert index.search(query, 5, nprobe=8) == index.search(query, 5)
+    assert index.search(query, 5, nprobe=1)[0][0] == 42
+
+    # Rebuilding without an IVF removes it.
+    index = local_retrieval.build_index(str(tmp_path), chunks, embedder, ivf_lists=0)
+    assert index.centroids is None
+    assert not os.path.exists(tmp_path / local_retrieval.IVF_FILE)
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__(dimension=256)
+        self.queries = []
+
+    def embed(self, texts, task_type):
+        if task_type == "RETRIEVAL_QUERY":
+            self.queries.extend(texts)
+        return super().embed(texts, task_type)
+
+
+def test_retrieval_caches_recent_queries(tmp_path):
+    embedder = CountingEmbedder()
+    local_retrieval.build_index(str(tmp_path), make_chunks(20), embedder)
+    tool = local_retrieval.LocalRagRetrieval(
+        name="retrieve",
+        description="Retrieves chunks.",
+        index_dir=str(tmp_path),
+        embedder=embedder,
+        similarity_top_k=2,
+        cache_size=1,
+    )
+
+    def run(query: str):
+        return asyncio.run(tool.run_async(args={"query": query}, tool_context=None))
+
+    first = run("cloud  revenue")
+    assert first[0]["text"].startswith("revenue grew in the cloud segment")
+    # Queries are normalized, and repeated ones are served from the cache.
+    assert run("cloud revenue") == first
+    assert embedder.queries == ["cloud revenue"]
+
+    # The least recently used query is evicted.
+    run("legal fines")
+    run("cloud revenue")
+    assert embedder.queries == ["cloud revenue", "legal fines", "cloud revenue"]
+
+
+def test_retrieval_applies_the_distance_threshold(tmp_path, embedder):
+    local_retrieval.build_index(str(tmp_path), make_chunks(20), embedder)
+    tool = local_retrieval.LocalRagRetrieval(
+        name="retrieve",
+        description="Retrieves chunks.",
+        index_dir=str(tmp_path),
+        embedder=embedder,
+        vector_distance_threshold=0.6,
+    )
+    results = tool.retrieve("advertising income from search")
+    assert results
+    assert all(result["distance"] <= 0.6 for result in results)
+    assert tool.retrieve("zebra giraffe") == []
@@ -0,0 +1,138 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the ingestion state of the corpus preparation script."""
+
+import os
+import types
+
+import pytest
+
+# The script requires them at import time.
+os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "my-project")
+os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "us-central1")
+
+from rag.shared_libraries import prepare_corpus_and_data  # noqa: E402
+from rag.shared_libraries.prepare_corpus_and_data import (  # noqa: E402
+    AdaptiveLimiter,
+    IngestionState,
+)
+
+CORPUS = "corpora/1"
+
+
+class FakeRag:
+    """Stands in for `vertexai.preview.rag`, with an in-memory corpus."""
+
+    def __init__(self):
+        self.files = {}
+        self.num_uploads = 0
+        self.crash_after_upload = False
+
+    def upload_file(self, corpus_name, path, display_name, description):
+        del corpus_name, path, description  # Unused.
+        name = f"files/{self.num_uploads}"
+        self.num_uploads += 1
+        self.files[name] = display_name
+        if self.crash_after_upload:
+            raise KeyboardInterrupt
+        return types.SimpleNamespace(name=name, display_name=display_name)
+
+    def list_files(self, corpus_name):
+        del corpus_name  # Unused.
+        return [
+            types.SimpleNamespace(name=name, display_name=display_name)
+            for name, display_name in self.files.items()
+        ]
+
+    def delete_file(self, name):
+        del self.files[name]
+
+
+@pytest.fixture
+def fake_rag(monkeypatch):
+    fake = FakeRag()
+    monkeypatch.setattr(prepare_corpus_and_data, "rag", fake)
+    return fake
+
+
+def count_lines(path):
+    with open(path, "r") as f:
+        return len(f.readlines())
+
+
+def ingest(source, state, temp_dir):
+    entry = {"source": source, "display_name": "doc.pdf", "description": ""}
+    return prepare_corpus_and_data.ingest_source(
+        CORPUS, entry, state, AdaptiveLimiter(1), temp_dir, max_retries=0
+    )
+
+
+def test_records_are_appended_and_replayed(tmp_path):
+    path = str(tmp_path / "state.jsonl")
+    state = IngestionState(path, CORPUS)
+    for i in range(3):
+        state.record(f"source{i}", {"sha256": str(i), "rag_file": f"files/{i}"})
+        assert count_lines(path) == i + 1
+    state.record("source0", {"sha256": "3", "rag_file": "files/3"})
+    # A crash in the middle of a write leaves a partial line.
+    with open(path, "a") as f:
+        f.write('{"corpus": "corpora/1", "sour')
+
+    state = IngestionState(path, CORPUS)
+    assert state.get("source0") == {"sha256": "3", "rag_file": "files/3"}
+    assert state.get("source2") == {"sha256": "2", "rag_file": "files/2"}
+    assert IngestionState(path, "corpora/2").get("source0") is None
+
+
+def test_reconcile_compacts_the_journal(tmp_path):
+    path = str(tmp_path / "state.jsonl")
+    state = IngestionState(path, CORPUS)
+    for i in range(3):
+        state.record("source", {"sha256": str(i), "rag_file": f"files/{i}"})
+    state.record("deleted", {"sha256": "0", "rag_file": "files/gone"})
+
+    state = IngestionState(path, CORPUS)
+    rag_files = [types.SimpleNamespace(name="files/2", display_name="doc.pdf")]
+    assert state.reconcile(rag_files) == []
+    assert count_lines(path) == 1
+    assert IngestionState(path, CORPUS).get("source")["rag_file"] == "files/2"
+    assert IngestionState(path, CORPUS).get("deleted") is None
+
+
+def test_interrupted_uploads_are_reconciled(tmp_path, fake_rag):
+    source = tmp_path / "doc.pdf"
+    source.write_bytes(b"%PDF-1.4 first version")
+    path = str(tmp_path / "state.jsonl")
+    assert ingest(str(source), IngestionState(path, CORPUS), tmp_path) == "uploaded"
+
+    # The process dies after the upload of a new version, before recording it.
+    source.write_bytes(b"%PDF-1.4 second version")
+    fake_rag.crash_after_upload = True
+    with pytest.raises(KeyboardInterrupt):
+        ingest(str(source), IngestionState(path, CORPUS), tmp_path)
+    assert fake_rag.files == {"files/0": "doc.pdf", "files/1": "doc.pdf"}
+
+    # The next run finds the unrecorded upload, and uploads the source again.
+    fake_rag.crash_after_upload = False
+    state = IngestionState(path, CORPUS)
+    orphans = state.reconcile(fake_rag.list_files(CORPUS))
+    assert [file.name for file in orphans] == ["files/1"]
+    for file in orphans:
+        fake_rag.delete_file(file.name)
+    assert "pending" not in state.get(str(source))
+    assert ingest(str(source), state, tmp_path) == "updated"
+    assert list(fake_rag.files) == ["files/2"]
+    assert state.get(str(source))["rag_file"] == "files/2"
+    assert ingest(str(source), state, tmp_path) == "unchanged"
@@ -0,0 +1,75 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures validate_customer_id with and without the parsed-profile cache.
+
+Usage (from the customer-service directory):
+
+    python -m benchmarks.benchmark_profile_cache --purchases=5000
+"""
+
+import argparse
+import timeit
+
+from customer_service.entities.customer import Customer, Product, Purchase
+from customer_service.shared_libraries import callbacks
+from customer_service.shared_libraries.profile_cache import (
+    PROFILE_CACHE_KEY,
+    set_customer_profile,
+)
+
+
+def make_customer(num_purchases: int) -> Customer:
+    """Returns the sample customer with a long purchase history."""
+    customer = Customer.get_customer("123")
+    customer.purchase_history = [
+        Purchase(
+            date="2024-01-20",
+            items=[
+                Product(product_id=f"sku-{i}-{j}", name="Seeds", quantity=1)
+                for j in range(3)
+            ],
+            total_amount=12.5,
+        )
+        for i in range(num_purchases)
+    ]
+    return customer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--purchases", type=int, default=5000)
+    parser.add_argument("--calls", type=int, default=100)
+    args = parser.parse_args()
+
+    cached_state = {}
+    set_customer_profile(cached_state, make_customer(args.purchases))
+    print(
+        f"profile: {args.purchases} purchases,"
+        f" {len(cached_state['customer_profile']) / 1e6:.2f} MB of JSON"
+    )
+    # Without a cache key, the profile is parsed on every call.
+    uncached_state = dict(cached_state)
+    del uncached_state[PROFILE_CACHE_KEY]
+    for name, state in (("uncached", uncached_state), ("cached", cached_state)):
+        callbacks.validate_customer_id("123", state)  # Warm up.
+        secs = timeit.timeit(
+            lambda: callbacks.validate_customer_id("123", state),
+            number=args.calls,
+        )
+        print(f"{name:>8}: {secs / args.calls * 1e6:.1f} us per tool call")
+
+
+if __name__ == "__main__":
+    main()
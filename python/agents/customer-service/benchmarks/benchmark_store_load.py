@@ -0,0 +1,156 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Drives concurrent simulated sessions through the store-backed tools.
+
+Each session browses recommendations, checks availability, updates its
+customer's cart and books a planting appointment. Sessions share a smaller
+pool of customers and dates, so carts and time slots are contended.
+
+For each tool, "service" is the time spent inside the tool and "latency"
+also includes waiting for a worker thread.
+
+Usage (from the customer-service directory):
+
+    python -m benchmarks.benchmark_store_load --sessions=5000 --customers=100
+"""
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import logging
+import random
+import statistics
+import time
+from collections.abc import Callable
+
+from customer_service.shared_libraries import store
+from customer_service.tools import tools
+
+
+def timed(tool: Callable, service_times: list[float]) -> Callable:
+    """Wraps the tool to record the time spent inside it."""
+
+    def run(*tool_args):
+        start = time.perf_counter()
+        try:
+            return tool(*tool_args)
+        finally:
+            service_times.append(time.perf_counter() - start)
+
+    return run
+
+
+async def run_session(
+    session_id: int,
+    args: argparse.Namespace,
+    executor: concurrent.futures.Executor,
+    latencies: dict[str, list[float]],
+    service_times: dict[str, list[float]],
+) -> None:
+    rng = random.Random(session_id)
+    customer_id = f"customer-{rng.randrange(args.customers)}"
+    date = f"2025-05-{rng.randrange(args.dates) + 1:02d}"
+    loop = asyncio.get_running_loop()
+
+    async def call(tool: Callable, *tool_args):
+        start = time.perf_counter()
+        result = await loop.run_in_executor(
+            executor, timed(tool, service_times[tool.__name__]), *tool_args
+        )
+        latencies[tool.__name__].append(time.perf_counter() - start)
+        return result
+
+    recommendations = await call(
+        tools.get_product_recommendations, "petunias", customer_id
+    )
+    for product in recommendations["recommendations"]:
+        await call(
+            tools.check_product_availability, product["product_id"], "pickup"
+        )
+    await call(tools.access_cart_information, customer_id)
+    await call(
+        tools.modify_cart,
+        customer_id,
+        [
+            {"product_id": p["product_id"], "quantity": rng.randint(1, 3)}
+            for p in recommendations["recommendations"]
+        ],
+        ["soil-123"],
+    )
+    await call(tools.access_cart_information, customer_id)
+    slots = await call(tools.get_available_planting_times, date)
+    if slots:
+        await call(
+            tools.schedule_planting_service,
+            customer_id,
+            date,
+            rng.choice(slots),
+            "Planting Petunias",
+        )
+
+
+async def run(
+    args: argparse.Namespace,
+) -> tuple[dict[str, list[float]], dict[str, list[float]]]:
+    latencies = collections.defaultdict(list)
+    service_times = collections.defaultdict(list)
+    with concurrent.futures.ThreadPoolExecutor(args.workers) as executor:
+        await asyncio.gather(
+            *(
+                run_session(
+                    session_id, args, executor, latencies, service_times
+                )
+                for session_id in range(args.sessions)
+            )
+        )
+    return latencies, service_times
+
+
+def format_quantiles(samples: list[float]) -> str:
+    quantiles = statistics.quantiles(samples, n=100)
+    return f"p50={quantiles[49] * 1e6:9.1f}us p99={quantiles[98] * 1e6:9.1f}us"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--customers", type=int, default=100)
+    parser.add_argument("--dates", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+
+    # The tools log every call, which would dominate the measurements.
+    logging.getLogger(tools.__name__).setLevel(logging.WARNING)
+    store.set_store(store.InMemoryStore())
+    start = time.perf_counter()
+    latencies, service_times = asyncio.run(run(args))
+    elapsed = time.perf_counter() - start
+
+    num_calls = sum(len(samples) for samples in latencies.values())
+    print(
+        f"{args.sessions} sessions, {num_calls} tool calls in {elapsed:.2f}s"
+        f" ({num_calls / elapsed:.0f} calls/s)"
+    )
+    for name, samples in sorted(latencies.items()):
+        print(
+            f"{name:>30}: n={len(samples):>6}"
+            f" | service {format_quantiles(service_times[name])}"
+            f" | latency {format_quantiles(samples)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
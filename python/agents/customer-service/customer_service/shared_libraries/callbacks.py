@@ -15,7 +15,7 @@
 """Callback functions for FOMC Research Agent."""
 
 import logging
-import time
+import os
 
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models import LlmRequest
@@ -26,19 +26,34 @@ from google.adk.sessions.state import State
 from google.adk.tools.tool_context import ToolContext
 from jsonschema import ValidationError
 from customer_service.entities.customer import Customer
+from customer_service.shared_libraries import profile_cache
+from customer_service.shared_libraries import rate_limiter
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
-RATE_LIMIT_SECS = 60
+# The quotas are shared by every session in the process, and by every process
+# on the host if CUSTOMER_SERVICE_RATE_LIMIT_DB is set.
 RPM_QUOTA = 10
+TPM_QUOTA = 1_000_000
+RATE_LIMIT_DB_PATH = os.getenv("CUSTOMER_SERVICE_RATE_LIMIT_DB")
 
+limiter = rate_limiter.create_rate_limiter(
+    rpm=RPM_QUOTA, tpm=TPM_QUOTA, db_path=RATE_LIMIT_DB_PATH
+)
 
-def rate_limit_callback(
+# Parsed customer profiles, so tool calls don't re-parse the profile JSON.
+profiles = profile_cache.ProfileCache()
+
+
+async def rate_limit_callback(
     callback_context: CallbackContext, llm_request: LlmRequest
 ) -> None:
     """Callback function that implements a query rate limit.
 
+    Waits (without blocking the event loop) until the model's request and
+    token budgets allow the request.
+
     Args:
       callback_context: A CallbackContext obj representing the active callback
         context.
@@ -49,41 +64,19 @@ def rate_limit_callback(
             if part.text=="":
                 part.text=" "
 
-    
-    
-
-    now = time.time()
-    if "timer_start" not in callback_context.state:
-
-        callback_context.state["timer_start"] = now
-        callback_context.state["request_count"] = 1
-        logger.debug(
-            "rate_limit_callback [timestamp: %i, "
-            "req_count: 1, elapsed_secs: 0]",
-            now,
-        )
-        return
-
-    request_count = callback_context.state["request_count"] + 1
-    elapsed_secs = now - callback_context.state["timer_start"]
+    model = llm_request.model or "default"
+    tokens = rate_limiter.estimate_tokens(llm_request)
+    wait_secs = await limiter.acquire(model, tokens)
+    metrics = limiter.metrics(model)
     logger.debug(
-        "rate_limit_callback [timestamp: %i, request_count: %i,"
-        " elapsed_secs: %i]",
-        now,
-        request_count,
-        elapsed_secs,
+        "rate_limit_callback [model: %s, est_tokens: %i, waited_secs: %.2f,"
+        " queue_depth: %i, mean_wait_secs: %.2f]",
+        model,
+        tokens,
+        wait_secs,
+        metrics.queue_depth,
+        metrics.mean_wait_secs,
     )
-
-    if request_count > RPM_QUOTA:
-        delay = RATE_LIMIT_SECS - elapsed_secs + 1
-        if delay > 0:
-            logger.debug("Sleeping for %i seconds", delay)
-            time.sleep(delay)
-        callback_context.state["timer_start"] = now
-        callback_context.state["request_count"] = 1
-    else:
-        callback_context.state["request_count"] = request_count
-
     return
 
 def validate_customer_id(customer_id: str, session_state: State) -> Tuple[bool, str]:
@@ -105,7 +98,7 @@ def validate_customer_id(customer_id: str, session_state: State) -> Tuple[bool,
     try:
         # We read the profile from the state, where it is set deterministically
         # at the beginning of the session.
-        c = Customer.model_validate_json(session_state['customer_profile'])
+        c = profiles.get(session_state)
         if customer_id == c.customer_id:
             return True, None
         else:
@@ -184,8 +177,12 @@ def before_agent(callback_context: InvocationContext):
     # In a production agent, this is set as part of the
     # session creation for the agent. 
     if "customer_profile" not in callback_context.state:
-        callback_context.state["customer_profile"] = Customer.get_customer(
-            "123"
-        ).to_json()
+        profile_cache.set_customer_profile(
+            callback_context.state, Customer.get_customer("123")
+        )
+    else:
+        # The profile was set at session creation; give it a cache key so
+        # that its parsed copy can be cached.
+        profile_cache.enable_caching(callback_context.state)
 
     # logger.info(callback_context.state["customer_profile"])
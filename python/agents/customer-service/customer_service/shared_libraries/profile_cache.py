@@ -0,0 +1,97 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-session cache of parsed customer profiles."""
+
+import collections
+import threading
+import uuid
+from collections.abc import Mapping, MutableMapping
+from typing import Any
+
+from customer_service.entities.customer import Customer
+
+PROFILE_KEY = "customer_profile"
+PROFILE_CACHE_KEY = "customer_profile_cache_key"
+MAX_SESSIONS = 1024
+
+
+def set_customer_profile(
+    session_state: MutableMapping[str, Any], customer: Customer
+) -> None:
+    """Stores the customer's profile in the state, and enables its caching."""
+    session_state[PROFILE_KEY] = customer.to_json()
+    enable_caching(session_state)
+
+
+def enable_caching(session_state: MutableMapping[str, Any]) -> None:
+    """Gives the session state the cache key that ProfileCache needs to cache
+    the profile it holds, if it doesn't have one yet.
+
+    The cache key is random, so that the sessions of different users never
+    share a cache entry, and lives in the state, so that looking it up needs
+    no private context.
+    """
+    if PROFILE_CACHE_KEY not in session_state:
+        session_state[PROFILE_CACHE_KEY] = uuid.uuid4().hex
+
+
+class ProfileCache:
+    """LRU cache of parsed Customer models, one per session.
+
+    An entry is keyed by the cache key of the session state and holds the
+    profile JSON it was parsed from. A lookup compares it with the JSON in
+    the state, which is much cheaper than parsing it (and free when the state
+    still holds the same string), and only re-parses the profile if it
+    changed, however it was written to the state.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._entries: collections.OrderedDict[str, tuple[str, Customer]] = (
+            collections.OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_state: Mapping[str, Any]) -> Customer:
+        """Returns the parsed profile stored in the session state.
+
+        Raises:
+          pydantic.ValidationError: If the profile cannot be parsed.
+        """
+        profile_json = session_state[PROFILE_KEY]
+        session_id = session_state.get(PROFILE_CACHE_KEY)
+        if session_id is None:
+            return Customer.model_validate_json(profile_json)
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry and entry[0] == profile_json:
+                self._entries.move_to_end(session_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        customer = Customer.model_validate_json(profile_json)
+        with self._lock:
+            self._entries[session_id] = (profile_json, customer)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+        return customer
+
+    def invalidate(self, session_state: Mapping[str, Any]) -> None:
+        """Drops the cached profile of the session."""
+        with self._lock:
+            self._entries.pop(session_state.get(PROFILE_CACHE_KEY), None)
@@ -0,0 +1,380 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pluggable carts, inventory and scheduling backend for the tools."""
+
+import dataclasses
+import threading
+import uuid
+from collections.abc import Iterable, Sequence
+from typing import Optional, Protocol, Union
+
+# Planting service time slots offered every day, and how many appointments
+# (one per planting crew) each slot can hold.
+PLANTING_SLOTS = ("9-12", "13-16")
+PLANTING_SLOT_CAPACITY = 4
+# The customer's preferred store, the store of the area they garden in (see
+# the agent's instructions), and pickup.
+DEFAULT_STORE_IDS = (
+    "Main Store",
+    "Anytown Garden Store",
+    "Las Vegas",
+    "pickup",
+)
+DEFAULT_STOCK = 10
+# Recommendations for plant types without a dedicated product list.
+DEFAULT_PLANT_TYPE = "default"
+
+
+class StoreError(Exception):
+    """A cart, inventory or scheduling request could not be applied."""
+
+
+@dataclasses.dataclass(frozen=True)
+class CatalogProduct:
+    """A product sold by the store."""
+
+    product_id: str
+    name: str
+    price: float
+    description: str
+    plant_types: tuple[str, ...] = ()
+
+
+DEFAULT_CATALOG = (
+    CatalogProduct(
+        "soil-123",
+        "Standard Potting Soil",
+        12.99,
+        "A good all-purpose potting soil.",
+        (DEFAULT_PLANT_TYPE,),
+    ),
+    CatalogProduct(
+        "fert-456",
+        "General Purpose Fertilizer",
+        12.99,
+        "Suitable for a wide variety of plants.",
+        (DEFAULT_PLANT_TYPE,),
+    ),
+    CatalogProduct(
+        "soil-456",
+        "Bloom Booster Potting Mix",
+        15.99,
+        "Provides extra nutrients that Petunias love.",
+        ("petunias",),
+    ),
+    CatalogProduct(
+        "fert-789",
+        "Flower Power Fertilizer",
+        14.99,
+        "Specifically formulated for flowering annuals.",
+        ("petunias",),
+    ),
+    CatalogProduct(
+        "tree-789",
+        "Dwarf Lemon Tree",
+        49.99,
+        "A compact citrus tree for patios and containers.",
+    ),
+    CatalogProduct(
+        "seeds-333",
+        "Tomato Seeds (Variety Pack)",
+        4.99,
+        "Six heirloom tomato varieties.",
+    ),
+    CatalogProduct(
+        "pots-444",
+        "Terracotta Pots (6-inch)",
+        6.49,
+        "Classic clay pots with drainage holes.",
+    ),
+    # Products from the purchase history of the sample customer profile.
+    CatalogProduct(
+        "fert-111",
+        "All-Purpose Fertilizer",
+        22.99,
+        "A balanced fertilizer for lawns, gardens and houseplants.",
+    ),
+    CatalogProduct(
+        "trowel-222",
+        "Gardening Trowel",
+        12.99,
+        "A stainless steel hand trowel for planting and transplanting.",
+    ),
+    CatalogProduct(
+        "gloves-555",
+        "Gardening Gloves (Leather)",
+        19.99,
+        "Durable leather gloves that protect against thorns.",
+    ),
+    CatalogProduct(
+        "pruner-666",
+        "Pruning Shears",
+        35.26,
+        "Bypass pruners for clean cuts on stems and branches.",
+    ),
+    # A drought-tolerant tree suited to the Las Vegas climate.
+    CatalogProduct(
+        "arbequina_olive_tree",
+        "Arbequina Olive Tree",
+        59.99,
+        "A self-pollinating, drought-tolerant olive tree for hot climates.",
+    ),
+)
+# The cart every customer starts with.
+DEFAULT_CART = (("soil-123", 1), ("fert-456", 1))
+
+
+# An item to remove: a product ID, or a dict with "product_id" and an
+# optional "quantity" (all units are removed if it is missing).
+RemoveItem = Union[str, dict]
+
+
+class StoreBackend(Protocol):
+    """Backend serving the cart, inventory and scheduling tools."""
+
+    def get_cart(self, customer_id: str) -> dict:
+        """Returns the customer's cart items and subtotal."""
+
+    def modify_cart(
+        self,
+        customer_id: str,
+        items_to_add: Sequence[dict],
+        items_to_remove: Sequence[RemoveItem],
+    ) -> tuple[bool, bool]:
+        """Applies all the changes to the cart, or none of them.
+
+        Returns:
+          Whether any items were added and whether any were removed.
+
+        Raises:
+          StoreError: If any of the changes is invalid.
+        """
+
+    def get_recommendations(self, plant_type: str) -> list[dict]:
+        """Returns the products recommended for the plant type."""
+
+    def get_stock(self, product_id: str, store_id: str) -> int:
+        """Returns the quantity of the product in stock at the store.
+
+        Raises:
+          StoreError: If the store does not exist.
+        """
+
+    def get_available_slots(self, date: str) -> list[str]:
+        """Returns the planting time slots with room left on the date."""
+
+    def book_slot(self, customer_id: str, date: str, time_range: str) -> str:
+        """Books a planting appointment and returns its ID.
+
+        Raises:
+          StoreError: If the slot does not exist or is full.
+        """
+
+
+class InMemoryStore:
+    """Thread-safe, indexed in-memory implementation of StoreBackend.
+
+    Carts are keyed by customer ID, inventory by (product_id, store_id) and
+    bookings by (date, time_range). Each cart has its own lock, so requests
+    for different customers never wait for each other.
+    """
+
+    def __init__(
+        self,
+        catalog: Iterable[CatalogProduct] = DEFAULT_CATALOG,
+        store_ids: Iterable[str] = DEFAULT_STORE_IDS,
+        stock: int = DEFAULT_STOCK,
+        default_cart: Sequence[tuple[str, int]] = DEFAULT_CART,
+    ):
+        self.catalog = {product.product_id: product for product in catalog}
+        self._recommendations: dict[str, list[CatalogProduct]] = {}
+        for product in self.catalog.values():
+            for plant_type in product.plant_types:
+                self._recommendations.setdefault(plant_type, []).append(
+                    product
+                )
+        self.store_ids = tuple(store_ids)
+        self._inventory = {
+            (product_id, store_id): stock
+            for product_id in self.catalog
+            for store_id in self.store_ids
+        }
+        self._default_cart = tuple(default_cart)
+        self._carts: dict[str, dict[str, int]] = {}
+        self._cart_locks: dict[str, threading.Lock] = {}
+        self._carts_lock = threading.Lock()
+        # (date, time_range) -> [(appointment_id, customer_id)]
+        self._bookings: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        self._bookings_lock = threading.Lock()
+
+    def _cart(self, customer_id: str) -> tuple[threading.Lock, dict[str, int]]:
+        with self._carts_lock:
+            if customer_id not in self._carts:
+                self._carts[customer_id] = dict(self._default_cart)
+                self._cart_locks[customer_id] = threading.Lock()
+            return self._cart_locks[customer_id], self._carts[customer_id]
+
+    def get_cart(self, customer_id: str) -> dict:
+        lock, cart = self._cart(customer_id)
+        with lock:
+            items = list(cart.items())
+        return {
+            "items": [
+                {
+                    "product_id": product_id,
+                    "name": self.catalog[product_id].name,
+                    "quantity": quantity,
+                }
+                for product_id, quantity in items
+            ],
+            "subtotal": round(
+                sum(
+                    self.catalog[product_id].price * quantity
+                    for product_id, quantity in items
+                ),
+                2,
+            ),
+        }
+
+    def modify_cart(
+        self,
+        customer_id: str,
+        items_to_add: Sequence[dict],
+        items_to_remove: Sequence[RemoveItem],
+    ) -> tuple[bool, bool]:
+        # The items are model-generated, so check their shape before use.
+        for item in items_to_add:
+            if not isinstance(item, dict):
+                raise StoreError(
+                    f"Invalid item to add: {item!r}. Expected a dict with"
+                    ' "product_id" and "quantity".'
+                )
+        for item in items_to_remove:
+            if not isinstance(item, (str, dict)):
+                raise StoreError(
+                    f"Invalid item to remove: {item!r}. Expected a product ID"
+                    ' or a dict with "product_id" and "quantity".'
+                )
+        additions = [
+            (
+                item.get("product_id"),
+                1 if item.get("quantity") is None else item["quantity"],
+            )
+            for item in items_to_add
+        ]
+        removals = [
+            (item, None)
+            if isinstance(item, str)
+            else (item.get("product_id"), item.get("quantity"))
+            for item in items_to_remove
+        ]
+        for product_id, _ in removals:
+            if not isinstance(product_id, str):
+                raise StoreError(f"Invalid product to remove: {product_id!r}.")
+        for product_id, _ in additions:
+            if product_id not in self.catalog:
+                raise StoreError(f"Unknown product: {product_id}.")
+        for product_id, quantity in additions + removals:
+            # Model-generated arguments may carry whole numbers as floats.
+            if quantity is not None and (
+                not isinstance(quantity, (int, float))
+                or not float(quantity).is_integer()
+                or quantity <= 0
+            ):
+                raise StoreError(
+                    f"Invalid quantity for {product_id}: {quantity}."
+                )
+
+        # Everything is validated up front and readers take the same lock, so
+        # they observe either all of the changes or none of them.
+        lock, cart = self._cart(customer_id)
+        with lock:
+            removed = False
+            for product_id, quantity in removals:
+                if product_id not in cart:
+                    continue
+                if quantity is None or quantity >= cart[product_id]:
+                    del cart[product_id]
+                else:
+                    cart[product_id] -= int(quantity)
+                removed = True
+            for product_id, quantity in additions:
+                cart[product_id] = cart.get(product_id, 0) + int(quantity)
+        return bool(additions), removed
+
+    def get_recommendations(self, plant_type: str) -> list[dict]:
+        products = self._recommendations.get(
+            plant_type.lower(), self._recommendations[DEFAULT_PLANT_TYPE]
+        )
+        return [
+            {
+                "product_id": product.product_id,
+                "name": product.name,
+                "description": product.description,
+            }
+            for product in products
+        ]
+
+    def get_stock(self, product_id: str, store_id: str) -> int:
+        # An unknown store would otherwise read as "out of stock".
+        if store_id not in self.store_ids:
+            raise StoreError(
+                f"Unknown store: {store_id}. Available stores are"
+                f" {', '.join(self.store_ids)}."
+            )
+        return self._inventory.get((product_id, store_id), 0)
+
+    def get_available_slots(self, date: str) -> list[str]:
+        with self._bookings_lock:
+            return [
+                time_range
+                for time_range in PLANTING_SLOTS
+                if len(self._bookings.get((date, time_range), ()))
+                < PLANTING_SLOT_CAPACITY
+            ]
+
+    def book_slot(self, customer_id: str, date: str, time_range: str) -> str:
+        if time_range not in PLANTING_SLOTS:
+            raise StoreError(
+                f"Unknown time slot: {time_range}. Available slots are"
+                f" {', '.join(PLANTING_SLOTS)}."
+            )
+        with self._bookings_lock:
+            bookings = self._bookings.setdefault((date, time_range), [])
+            if len(bookings) >= PLANTING_SLOT_CAPACITY:
+                raise StoreError(f"The {time_range} slot on {date} is full.")
+            appointment_id = str(uuid.uuid4())
+            bookings.append((appointment_id, customer_id))
+        return appointment_id
+
+
+_store: Optional[StoreBackend] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> StoreBackend:
+    """Returns the process-wide backend, an InMemoryStore by default."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = InMemoryStore()
+        return _store
+
+
+def set_store(store: StoreBackend) -> None:
+    """Replaces the process-wide backend, e.g. with a real API client."""
+    global _store
+    with _store_lock:
+        _store = store
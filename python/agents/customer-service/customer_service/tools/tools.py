@@ -15,9 +15,9 @@
 """Tools module for the customer service agent."""
 
 import logging
-import uuid
 from datetime import datetime, timedelta
 from google.adk.tools import ToolContext
+from customer_service.shared_libraries.store import StoreError, get_store
 
 logger = logging.getLogger(__name__)
 
@@ -134,24 +134,7 @@ def access_cart_information(customer_id: str) -> dict:
         {'items': [{'product_id': 'soil-123', 'name': 'Standard Potting Soil', 'quantity': 1}, {'product_id': 'fert-456', 'name': 'General Purpose Fertilizer', 'quantity': 1}], 'subtotal': 25.98}
     """
     logger.info("Accessing cart information for customer ID: %s", customer_id)
-
-    # MOCK API RESPONSE - Replace with actual API call
-    mock_cart = {
-        "items": [
-            {
-                "product_id": "soil-123",
-                "name": "Standard Potting Soil",
-                "quantity": 1,
-            },
-            {
-                "product_id": "fert-456",
-                "name": "General Purpose Fertilizer",
-                "quantity": 1,
-            },
-        ],
-        "subtotal": 25.98,
-    }
-    return mock_cart
+    return get_store().get_cart(customer_id)
 
 
 def modify_cart(
@@ -167,19 +150,25 @@ def modify_cart(
     Returns:
         dict: A dictionary indicating the status of the cart modification.
     Example:
-        >>> modify_cart(customer_id='123', items_to_add=[{'product_id': 'soil-456', 'quantity': 1}, {'product_id': 'fert-789', 'quantity': 1}], items_to_remove=[{'product_id': 'fert-112', 'quantity': 1}])
+        >>> modify_cart(customer_id='123', items_to_add=[{'product_id': 'soil-456', 'quantity': 1}, {'product_id': 'fert-789', 'quantity': 1}], items_to_remove=[{'product_id': 'soil-123', 'quantity': 1}])
         {'status': 'success', 'message': 'Cart updated successfully.', 'items_added': True, 'items_removed': True}
     """
 
     logger.info("Modifying cart for customer ID: %s", customer_id)
     logger.info("Adding items: %s", items_to_add)
     logger.info("Removing items: %s", items_to_remove)
-    # MOCK API RESPONSE - Replace with actual API call
+    try:
+        items_added, items_removed = get_store().modify_cart(
+            customer_id, items_to_add, items_to_remove
+        )
+    except StoreError as e:
+        # Nothing was changed; send back the reason so the model can recover.
+        return {"status": "error", "message": str(e)}
     return {
         "status": "success",
         "message": "Cart updated successfully.",
-        "items_added": True,
-        "items_removed": True,
+        "items_added": items_added,
+        "items_removed": items_removed,
     }
 
 
@@ -203,38 +192,7 @@ def get_product_recommendations(plant_type: str, customer_id: str) -> dict:
         plant_type,
         customer_id,
     )
-    # MOCK API RESPONSE - Replace with actual API call or recommendation engine
-    if plant_type.lower() == "petunias":
-        recommendations = {
-            "recommendations": [
-                {
-                    "product_id": "soil-456",
-                    "name": "Bloom Booster Potting Mix",
-                    "description": "Provides extra nutrients that Petunias love.",
-                },
-                {
-                    "product_id": "fert-789",
-                    "name": "Flower Power Fertilizer",
-                    "description": "Specifically formulated for flowering annuals.",
-                },
-            ]
-        }
-    else:
-        recommendations = {
-            "recommendations": [
-                {
-                    "product_id": "soil-123",
-                    "name": "Standard Potting Soil",
-                    "description": "A good all-purpose potting soil.",
-                },
-                {
-                    "product_id": "fert-456",
-                    "name": "General Purpose Fertilizer",
-                    "description": "Suitable for a wide variety of plants.",
-                },
-            ]
-        }
-    return recommendations
+    return {"recommendations": get_store().get_recommendations(plant_type)}
 
 
 def check_product_availability(product_id: str, store_id: str) -> dict:
@@ -245,7 +203,8 @@ def check_product_availability(product_id: str, store_id: str) -> dict:
         store_id: The ID of the store (or 'pickup' for pickup availability).
 
     Returns:
-        A dictionary indicating availability.  Example:
+        A dictionary indicating availability, or an error status if the
+        store does not exist.  Example:
         {'available': True, 'quantity': 10, 'store': 'Main Store'}
 
     Example:
@@ -257,8 +216,11 @@ def check_product_availability(product_id: str, store_id: str) -> dict:
         product_id,
         store_id,
     )
-    # MOCK API RESPONSE - Replace with actual API call
-    return {"available": True, "quantity": 10, "store": store_id}
+    try:
+        quantity = get_store().get_stock(product_id, store_id)
+    except StoreError as e:
+        return {"status": "error", "message": str(e)}
+    return {"available": quantity > 0, "quantity": quantity, "store": store_id}
 
 
 def schedule_planting_service(
@@ -287,7 +249,10 @@ def schedule_planting_service(
         time_range,
     )
     logger.info("Details: %s", details)
-    # MOCK API RESPONSE - Replace with actual API call to your scheduling system
+    try:
+        appointment_id = get_store().book_slot(customer_id, date, time_range)
+    except StoreError as e:
+        return {"status": "error", "message": str(e)}
     # Calculate confirmation time based on date and time_range
     start_time_str = time_range.split("-")[0]  # Get the start time (e.g., "9")
     confirmation_time_str = (
@@ -296,7 +261,7 @@ def schedule_planting_service(
 
     return {
         "status": "success",
-        "appointment_id": str(uuid.uuid4()),
+        "appointment_id": appointment_id,
         "date": date,
         "time": time_range,
         "confirmation_time": confirmation_time_str,  # formatted time for calendar
@@ -317,9 +282,7 @@ def get_available_planting_times(date: str) -> list:
         ['9-12', '13-16']
     """
     logger.info("Retrieving available planting times for %s", date)
-    # MOCK API RESPONSE - Replace with actual API call
-    # Generate some mock time slots, ensuring they're in the correct format:
-    return ["9-12", "13-16"]
+    return get_store().get_available_slots(date)
 
 
 def send_care_instructions(
@@ -0,0 +1,94 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from customer_service.entities.customer import Customer
+from customer_service.shared_libraries import callbacks
+from customer_service.shared_libraries.profile_cache import (
+    PROFILE_KEY,
+    ProfileCache,
+    set_customer_profile,
+)
+
+
+def test_profile_is_parsed_once_per_content():
+    cache = ProfileCache()
+    state = {}
+    set_customer_profile(state, Customer.get_customer("123"))
+
+    first = cache.get(state)
+    assert cache.get(state) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    set_customer_profile(state, Customer.get_customer("456"))
+    assert cache.get(state).customer_id == "456"
+    assert cache.misses == 2
+
+
+def test_direct_writes_to_the_profile_are_seen():
+    cache = ProfileCache()
+    state = {}
+    set_customer_profile(state, Customer.get_customer("123"))
+    assert cache.get(state).customer_id == "123"
+
+    # Bypasses set_customer_profile, e.g. as a state delta would.
+    state[PROFILE_KEY] = Customer.get_customer("456").to_json()
+    assert cache.get(state).customer_id == "456"
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_sessions_do_not_share_entries():
+    cache = ProfileCache()
+    first, second = {}, {}
+    set_customer_profile(first, Customer.get_customer("123"))
+    set_customer_profile(second, Customer.get_customer("456"))
+    assert cache.get(first).customer_id == "123"
+    assert cache.get(second).customer_id == "456"
+    assert cache.misses == 2
+
+
+def test_cache_evicts_least_recently_used_session():
+    cache = ProfileCache(max_sessions=2)
+    states = {}
+    for name in ("a", "b", "c"):
+        states[name] = {}
+        set_customer_profile(states[name], Customer.get_customer("123"))
+    for name in ("a", "b", "a", "c"):
+        cache.get(states[name])
+    cache.get(states["b"])
+    assert cache.misses == 4
+
+
+def test_state_without_cache_key_is_not_cached():
+    cache = ProfileCache()
+    state = {PROFILE_KEY: Customer.get_customer("123").to_json()}
+    cache.get(state)
+    cache.get(state)
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_validate_customer_id_uses_cached_profile(monkeypatch):
+    state = {}
+    set_customer_profile(state, Customer.get_customer("123"))
+    assert callbacks.validate_customer_id("123", state) == (True, None)
+
+    def fail_to_parse(*args, **kwargs):
+        raise AssertionError("The profile was parsed again.")
+
+    # The second lookup must be a cache hit, without parsing the profile.
+    monkeypatch.setattr(Customer, "model_validate_json", fail_to_parse)
+    hits = callbacks.profiles.hits
+    valid, err = callbacks.validate_customer_id("999", state)
+    assert callbacks.profiles.hits == hits + 1
+    assert not valid
+    assert "only for 123" in err
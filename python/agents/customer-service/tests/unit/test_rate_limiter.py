@@ -0,0 +1,119 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import pathlib
+import sqlite3
+import time
+
+import pytest
+
+from customer_service.shared_libraries import rate_limiter
+from customer_service.shared_libraries.rate_limiter import (
+    RateLimiter,
+    SqliteBucketBackend,
+)
+
+# The copy of the module in the other agent using it, which must not drift.
+FOMC_RATE_LIMITER = (
+    pathlib.Path(__file__).resolve().parents[3]
+    / "fomc-research"
+    / "fomc_research"
+    / "shared_libraries"
+    / "rate_limiter.py"
+)
+
+
+@pytest.mark.asyncio
+async def test_requests_within_budget_do_not_wait():
+    limiter = RateLimiter(rpm=60)
+    waits = await asyncio.gather(*(limiter.acquire("m") for _ in range(60)))
+    assert max(waits) == 0
+    assert limiter.metrics("m").throttled_requests == 0
+
+
+@pytest.mark.asyncio
+async def test_requests_over_budget_wait_without_blocking_loop():
+    limiter = RateLimiter(rpm=600)  # Refills one request every 0.1s.
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    start = time.monotonic()
+    await asyncio.gather(*(limiter.acquire("m") for _ in range(603)))
+    elapsed = time.monotonic() - start
+    ticker_task.cancel()
+
+    metrics = limiter.metrics("m")
+    assert elapsed == pytest.approx(0.3, abs=0.1)
+    assert metrics.throttled_requests == 3
+    assert metrics.max_queue_depth == 3
+    assert metrics.queue_depth == 0
+    # The event loop kept running other tasks while requests were throttled.
+    assert ticks > 10
+
+
+@pytest.mark.asyncio
+async def test_token_budget_is_enforced_per_model():
+    limiter = RateLimiter(rpm=1000, tpm=600)
+    assert await limiter.acquire("a", tokens=600) == 0
+    assert await limiter.acquire("b", tokens=600) == 0
+    assert limiter._reserve("a", 60) == pytest.approx(6, abs=0.1)
+
+
+def test_sqlite_backend_is_shared_between_limiters(tmp_path):
+    db_path = str(tmp_path / "rate_limit.sqlite")
+    first = RateLimiter(rpm=60, backend=SqliteBucketBackend(db_path))
+    second = RateLimiter(rpm=60, backend=SqliteBucketBackend(db_path))
+    for _ in range(60):
+        assert first._reserve("m", 0) == 0
+    assert second._reserve("m", 0) > 0
+
+
+@pytest.mark.asyncio
+async def test_sqlite_lock_contention_does_not_block_loop(tmp_path):
+    db_path = str(tmp_path / "rate_limit.sqlite")
+    limiter = RateLimiter(rpm=60, backend=SqliteBucketBackend(db_path))
+    # Another process holds the write lock for a while.
+    other = sqlite3.connect(db_path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    asyncio.get_running_loop().call_later(0.3, other.execute, "COMMIT")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    assert await limiter.acquire("m") == 0
+    ticker_task.cancel()
+    other.close()
+    assert ticks > 10
+
+
+@pytest.mark.skipif(
+    not FOMC_RATE_LIMITER.exists(),
+    reason="The agent was checked out without the rest of the repository.",
+)
+def test_copies_are_identical():
+    assert pathlib.Path(rate_limiter.__file__).read_text(
+        encoding="utf-8"
+    ) == FOMC_RATE_LIMITER.read_text(encoding="utf-8")
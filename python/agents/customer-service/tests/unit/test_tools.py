@@ -12,9 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import logging
+import os
 from datetime import datetime, timedelta
 
+from customer_service.shared_libraries import store
 from customer_service.tools.tools import (
     access_cart_information,
     approve_discount,
@@ -193,3 +196,106 @@ def test_generate_qr_code():
     assert "expiration_date" in result
     expiration_date = datetime.now() + timedelta(days=expiration_days)
     assert result["expiration_date"] == expiration_date.strftime("%Y-%m-%d")
+
+
+def test_modify_cart_is_atomic():
+    customer_id = "atomic"
+    before = access_cart_information(customer_id)
+    result = modify_cart(
+        customer_id,
+        [{"product_id": "seeds-333", "quantity": 2},
+         {"product_id": "unknown-000", "quantity": 1}],
+        ["soil-123"],
+    )
+    assert result["status"] == "error"
+    assert access_cart_information(customer_id) == before
+
+    result = modify_cart(
+        customer_id, [{"product_id": "seeds-333", "quantity": 2}], ["soil-123"]
+    )
+    assert result["items_added"] and result["items_removed"]
+    cart = access_cart_information(customer_id)
+    assert [(i["product_id"], i["quantity"]) for i in cart["items"]] == [
+        ("fert-456", 1),
+        ("seeds-333", 2),
+    ]
+    assert cart["subtotal"] == 22.97
+
+
+def test_modify_cart_rejects_malformed_items():
+    customer_id = "malformed"
+    before = access_cart_information(customer_id)
+    for items_to_add, items_to_remove in (
+        (["seeds-333"], []),
+        ([["seeds-333", 1]], []),
+        ([], [["soil-123"]]),
+        ([], [{"quantity": 1}]),
+    ):
+        result = modify_cart(customer_id, items_to_add, items_to_remove)
+        assert result["status"] == "error"
+    assert access_cart_information(customer_id) == before
+
+
+def test_schedule_planting_service_fills_slots():
+    date = "2024-08-01"
+    while "9-12" in get_available_planting_times(date):
+        result = schedule_planting_service("123", date, "9-12", "Planting")
+        assert result["status"] == "success"
+    assert get_available_planting_times(date) == ["13-16"]
+    result = schedule_planting_service("123", date, "9-12", "Planting")
+    assert result["status"] == "error"
+
+
+def test_check_product_availability_unknown_store():
+    result = check_product_availability("soil-123", "Nowhere")
+    assert result["status"] == "error"
+    assert "Unknown store: Nowhere" in result["message"]
+
+
+def test_eval_session_tool_calls():
+    """Replays the tool calls of the recorded eval session on a fresh store."""
+    session_path = os.path.join(
+        os.path.dirname(__file__),
+        "..",
+        "..",
+        "eval",
+        "sessions",
+        "123.session.json",
+    )
+    with open(session_path, encoding="utf-8") as f:
+        session = json.load(f)
+    calls = [
+        part["function_call"]
+        for event in session["events"]
+        for part in (event.get("content") or {}).get("parts") or []
+        if part.get("function_call")
+    ]
+    assert calls
+
+    tools = {
+        "access_cart_information": access_cart_information,
+        "check_product_availability": check_product_availability,
+        "modify_cart": modify_cart,
+    }
+    previous = store.get_store()
+    store.set_store(store.InMemoryStore())
+    try:
+        for call in calls:
+            result = tools[call["name"]](**call["args"])
+            if call["name"] == "modify_cart":
+                assert result["status"] == "success", result
+                assert result["items_added"]
+            elif call["name"] == "check_product_availability":
+                assert result == {
+                    "available": True,
+                    "quantity": 10,
+                    "store": call["args"]["store_id"],
+                }
+        cart = access_cart_information("123")
+    finally:
+        store.set_store(previous)
+    assert [(i["product_id"], i["quantity"]) for i in cart["items"]] == [
+        ("soil-123", 1),
+        ("fert-456", 1),
+        ("arbequina_olive_tree", 2),
+    ]
@@ -0,0 +1,419 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures how schema linking shrinks the schema in the NL2SQL prompts.
+
+Builds a wide, synthetic airline data warehouse in the format of the BigQuery
+tools, and for a set of test questions reports the size of the schema in the
+prompt with and without schema linking, the recall of the tables and columns
+that the question needs, and the latency of the linking. With `--model`, also
+reports the latency of generating the SQL with both prompts.
+
+Usage (from the data-science directory):
+
+    python benchmarks/benchmark_schema_linking.py
+    python benchmarks/benchmark_schema_linking.py --model=gemini-2.5-flash
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+# Imports the module alone, as importing the package would build the agents.
+sys.path.append(
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "data_science", "utils"
+    )
+)
+import schema_linking  # pylint: disable=import-error,wrong-import-position
+
+DATASET = "my-project.airline_warehouse"
+
+TABLES = {
+    "flight_history": [
+        "flight_id",
+        "flight_number",
+        "departure_airport_iata",
+        "arrival_airport_iata",
+        "scheduled_departure",
+        "actual_departure",
+        "scheduled_arrival",
+        "actual_arrival",
+        "departure_delay_minutes",
+        "arrival_delay_minutes",
+        "cancelled",
+        "diverted",
+        "aircraft_id",
+        "distance_miles",
+    ],
+    "ticket_sales_history": [
+        "ticket_id",
+        "flight_id",
+        "passenger_id",
+        "booking_date",
+        "fare_class",
+        "ticket_price",
+        "currency",
+        "sales_channel",
+    ],
+    "passengers": [
+        "passenger_id",
+        "first_name",
+        "last_name",
+        "loyalty_tier",
+        "loyalty_points",
+        "home_airport_iata",
+        "date_of_birth",
+        "nationality",
+    ],
+    "airports": [
+        "iata",
+        "airport_name",
+        "city",
+        "country",
+        "timezone",
+        "latitude",
+        "longitude",
+    ],
+    "aircraft": [
+        "aircraft_id",
+        "model",
+        "manufacturer",
+        "seat_capacity",
+        "year_built",
+        "maintenance_status",
+    ],
+    "crew_assignments": [
+        "assignment_id",
+        "flight_id",
+        "crew_member_id",
+        "role",
+    ],
+    "crew_members": [
+        "crew_member_id",
+        "full_name",
+        "base_airport_iata",
+        "hire_date",
+        "rank",
+    ],
+    "baggage_claims": [
+        "claim_id",
+        "ticket_id",
+        "bag_tag",
+        "claim_status",
+        "claim_amount",
+    ],
+    "cymbalair_policies": [
+        "policy_id",
+        "policy_name",
+        "policy_text",
+        "effective_date",
+    ],
+    "maintenance_events": [
+        "maintenance_event_id",
+        "aircraft_id",
+        "event_date",
+        "event_type",
+        "cost_usd",
+        "downtime_hours",
+    ],
+    "customer_feedback": [
+        "feedback_id",
+        "passenger_id",
+        "flight_id",
+        "rating",
+        "comment",
+        "submitted_at",
+    ],
+    "fuel_purchases": [
+        "purchase_id",
+        "airport_iata",
+        "purchase_date",
+        "gallons",
+        "price_per_gallon",
+        "supplier",
+    ],
+}
+
+FOREIGN_KEYS = {
+    "flight_history": [
+        ("departure_airport_iata", "airports", "iata"),
+        ("arrival_airport_iata", "airports", "iata"),
+        ("aircraft_id", "aircraft", "aircraft_id"),
+    ],
+    "ticket_sales_history": [
+        ("flight_id", "flight_history", "flight_id"),
+        ("passenger_id", "passengers", "passenger_id"),
+    ],
+    "crew_assignments": [
+        ("flight_id", "flight_history", "flight_id"),
+        ("crew_member_id", "crew_members", "crew_member_id"),
+    ],
+    "baggage_claims": [("ticket_id", "ticket_sales_history", "ticket_id")],
+    "maintenance_events": [("aircraft_id", "aircraft", "aircraft_id")],
+    "customer_feedback": [
+        ("passenger_id", "passengers", "passenger_id"),
+        ("flight_id", "flight_history", "flight_id"),
+    ],
+    "fuel_purchases": [("airport_iata", "airports", "iata")],
+}
+
+# Unrelated tables of the warehouse, with their vocabulary.
+OTHER_DOMAINS = {
+    "hr": "employee salary payroll bonus department manager review leave"
+    " benefit pension headcount position",
+    "marketing": "campaign impression click conversion audience segment"
+    " creative budget channel attribution email newsletter",
+    "finance": "invoice ledger account journal tax payable receivable"
+    " budget forecast cost_center expense revenue",
+    "inventory": "sku warehouse stock reorder supplier shipment pallet bin"
+    " quantity lot expiry catalog",
+    "it": "ticket incident server outage patch license asset device user"
+    " severity sla queue",
+}
+
+# The questions, with the tables and columns that answering them needs.
+QUESTIONS = [
+    (
+        "What was the average arrival delay of flights departing from SFO in"
+        " March 2025?",
+        {
+            "flight_history": [
+                "arrival_delay_minutes",
+                "departure_airport_iata",
+                "scheduled_departure",
+            ]
+        },
+    ),
+    (
+        "Which loyalty tier generated the most ticket revenue last year?",
+        {
+            "ticket_sales_history": ["ticket_price", "passenger_id", "booking_date"],
+            "passengers": ["loyalty_tier", "passenger_id"],
+        },
+    ),
+    (
+        "How many flights were cancelled per aircraft model?",
+        {
+            "flight_history": ["cancelled", "aircraft_id"],
+            "aircraft": ["model", "aircraft_id"],
+        },
+    ),
+    (
+        "What is the total maintenance cost per aircraft manufacturer?",
+        {
+            "maintenance_events": ["cost_usd", "aircraft_id"],
+            "aircraft": ["manufacturer", "aircraft_id"],
+        },
+    ),
+    (
+        "List the top 10 airports by number of departures.",
+        {
+            "flight_history": ["departure_airport_iata"],
+            "airports": ["iata", "airport_name"],
+        },
+    ),
+    (
+        "What is the average customer feedback rating of the flights with a"
+        " departure delay over 60 minutes?",
+        {
+            "customer_feedback": ["rating", "flight_id"],
+            "flight_history": ["departure_delay_minutes", "flight_id"],
+        },
+    ),
+    (
+        "Which crew members were assigned to the most flights in 2025?",
+        {
+            "crew_assignments": ["crew_member_id", "flight_id"],
+            "crew_members": ["crew_member_id", "full_name"],
+        },
+    ),
+    (
+        "What is the total baggage claim amount by claim status?",
+        {"baggage_claims": ["claim_amount", "claim_status"]},
+    ),
+    (
+        "How many gallons of fuel did we purchase at each airport, and at what"
+        " average price per gallon?",
+        {"fuel_purchases": ["gallons", "price_per_gallon", "airport_iata"]},
+    ),
+    (
+        "What does the refund policy say about cancelled flights?",
+        {"cymbalair_policies": ["policy_name", "policy_text"]},
+    ),
+    (
+        "How many tickets were sold per sales channel and fare class?",
+        {"ticket_sales_history": ["ticket_id", "sales_channel", "fare_class"]},
+    ),
+    (
+        "Which passengers flew more than 20 times in the business fare class?",
+        {
+            "ticket_sales_history": ["passenger_id", "fare_class"],
+            "passengers": ["passenger_id", "first_name", "last_name"],
+        },
+    ),
+]
+
+PROMPT_TEMPLATE = """
+You are a BigQuery SQL expert. Write a BigQuery SQL query that answers the
+question, using only the tables and columns of the schema. Return only the SQL.
+
+**Schema:**
+
+```
+{SCHEMA}
+```
+
+**Natural language question:**
+
+```
+{QUESTION}
+```
+"""
+
+
+def build_schema(
+    rng: random.Random, extra_columns: int, other_tables: int
+) -> dict[str, dict]:
+    """Returns the tables context of a wide airline warehouse."""
+    types = ["STRING", "INT64", "FLOAT64", "TIMESTAMP", "BOOL"]
+    tables = {}
+    for table, columns in TABLES.items():
+        # Warehouse tables are wide, with many denormalized attributes.
+        columns = columns + [
+            f"{table.split('_')[0]}_attribute_{k:02d}" for k in range(extra_columns)
+        ]
+        context = {
+            "table_schema": [(column, rng.choice(types)) for column in columns],
+            "example_values": [],
+        }
+        if table in FOREIGN_KEYS:
+            context["foreign_keys"] = [
+                {
+                    "columns": [column],
+                    "referenced_table": f"{DATASET}.{referenced_table}",
+                    "referenced_columns": [referenced_column],
+                }
+                for column, referenced_table, referenced_column in FOREIGN_KEYS[table]
+            ]
+        tables[f"{DATASET}.{table}"] = context
+    for k in range(other_tables):
+        domain = list(OTHER_DOMAINS)[k % len(OTHER_DOMAINS)]
+        words = OTHER_DOMAINS[domain].split()
+        name = f"{domain}_{'_'.join(rng.sample(words, 2))}_{k}"
+        columns = {f"{domain}_id"}
+        while len(columns) < len(TABLES["flight_history"]) + extra_columns:
+            columns.add("_".join(rng.sample(words, 2)))
+        tables[f"{DATASET}.{name}"] = {
+            "table_schema": [(column, rng.choice(types)) for column in sorted(columns)],
+            "example_values": [],
+        }
+    return tables
+
+
+def percentiles(latencies: list[float]) -> str:
+    p50, p99 = np.percentile(np.asarray(latencies) * 1e3, [50, 99])
+    return f"p50={p50:.2f}ms p99={p99:.2f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--extra_columns", type=int, default=60)
+    parser.add_argument("--other_tables", type=int, default=60)
+    parser.add_argument("--top_k", type=int, default=schema_linking.TOP_K_TABLES)
+    parser.add_argument(
+        "--model",
+        default="",
+        help="The model to measure the SQL generation latency with, if any.",
+    )
+    args = parser.parse_args()
+
+    schema = build_schema(random.Random(0), args.extra_columns, args.other_tables)
+    start = time.perf_counter()
+    schema_linking.prune_bigquery_schema(schema, "warm up", args.top_k)
+    build_secs = time.perf_counter() - start
+    num_columns = sum(len(table["table_schema"]) for table in schema.values())
+    print(
+        f"Schema: {len(schema)} tables, {num_columns} columns;"
+        f" index built in {build_secs * 1e3:.0f}ms"
+    )
+
+    full_prompts, pruned_prompts, latencies = [], [], []
+    table_hits = table_total = column_hits = column_total = 0
+    for question, expected in QUESTIONS:
+        start = time.perf_counter()
+        pruned = schema_linking.prune_bigquery_schema(schema, question, args.top_k)
+        latencies.append(time.perf_counter() - start)
+        full_prompts.append(PROMPT_TEMPLATE.format(SCHEMA=schema, QUESTION=question))
+        pruned_prompts.append(PROMPT_TEMPLATE.format(SCHEMA=pruned, QUESTION=question))
+        missing = []
+        for table, columns in expected.items():
+            kept = pruned.get(f"{DATASET}.{table}")
+            table_total += 1
+            column_total += len(columns)
+            if kept is None:
+                missing.append(table)
+                continue
+            table_hits += 1
+            kept_columns = {field[0] for field in kept["table_schema"]}
+            column_hits += len(set(columns) & kept_columns)
+            missing += [f"{table}.{c}" for c in columns if c not in kept_columns]
+        print(
+            f"{len(full_prompts):>2}. {len(pruned)} tables,"
+            f" {len(pruned_prompts[-1]):>6} chars"
+            f"{', missing ' + ', '.join(missing) if missing else ''}: {question}"
+        )
+
+    full_chars = np.mean([len(prompt) for prompt in full_prompts])
+    pruned_chars = np.mean([len(prompt) for prompt in pruned_prompts])
+    print(
+        f"Prompt size: {full_chars:.0f} -> {pruned_chars:.0f} chars"
+        f" (~{full_chars / 4:.0f} -> ~{pruned_chars / 4:.0f} tokens),"
+        f" {1 - pruned_chars / full_chars:.1%} smaller"
+    )
+    print(
+        f"Recall: tables {table_hits / table_total:.1%},"
+        f" columns {column_hits / column_total:.1%}"
+    )
+    print(f"Linking latency: {percentiles(latencies)}")
+
+    if args.model:
+        # pylint: disable=import-outside-toplevel
+        from google.genai import Client
+
+        client = Client(
+            vertexai=True,
+            project=os.getenv("GOOGLE_CLOUD_PROJECT"),
+            location=os.getenv("GOOGLE_CLOUD_LOCATION"),
+        )
+        for label, prompts in (("full", full_prompts), ("pruned", pruned_prompts)):
+            generation_latencies = []
+            for prompt in prompts:
+                start = time.perf_counter()
+                client.models.generate_content(
+                    model=args.model, contents=prompt, config={"temperature": 0.1}
+                )
+                generation_latencies.append(time.perf_counter() - start)
+            print(
+                f"Generation latency, {label} schema:"
+                f" {percentiles(generation_latencies)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
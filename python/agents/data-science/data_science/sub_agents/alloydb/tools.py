@@ -18,6 +18,7 @@ import logging
 import os
 import re
 
+from data_science.utils import schema_linking
 from data_science.utils.utils import get_env_var
 from google.adk.tools import ToolContext
 from google.genai import Client
@@ -181,7 +182,11 @@ sample rows):
 
    """
 
-    schema = tool_context.state["database_settings"]["alloydb"]["schema"]
+    schema = schema_linking.prune_alloydb_schema(
+        tool_context.state["database_settings"]["alloydb"]["schema"],
+        question,
+        embed=schema_linking.embedder_from_env(),
+    )
 
     prompt = prompt_template.format(
         #        MAX_NUM_ROWS=MAX_NUM_ROWS,
@@ -17,6 +17,7 @@
 import enum
 import os
 
+from data_science.utils import schema_linking
 from google.adk.tools import ToolContext
 
 # pylint: disable=g-importing-member
@@ -94,7 +95,11 @@ def initial_bq_nl2sql(
     """
     print("****** Running agent with ChaseSQL algorithm.")
     bq_settings = tool_context.state["database_settings"]["bigquery"]
-    bq_schema = bq_settings["schema"]
+    bq_schema = schema_linking.prune_bigquery_schema(
+        bq_settings["schema"],
+        question,
+        embed=schema_linking.embedder_from_env(),
+    )
     project = bq_settings["data_project_id"]
     db = bq_settings["dataset_id"]
     transpile_to_bigquery = tool_context.state["database_settings"][
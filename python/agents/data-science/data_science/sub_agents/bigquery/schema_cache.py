@@ -0,0 +1,253 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-disk cache of the schema of the tables of a BigQuery dataset.
+
+Describing a dataset takes one `get_table` call per table, which dominates the
+startup of the agent on large datasets. The descriptions are cached on disk
+with the last-modified time of their table, so that only the tables that were
+created or modified since the last run are described again, concurrently.
+
+Unless schema linking is on, the descriptions are the same as without the
+cache: the schema and example values of each table.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from google.cloud import bigquery
+
+logger = logging.getLogger(__name__)
+
+# Bump when the descriptions change format, to invalidate the existing caches.
+CACHE_VERSION = 3
+
+MAX_WORKERS = 16
+
+TableContext = dict[str, Any]
+DescribeTable = Callable[[bigquery.Client, bigquery.TableReference], TableContext]
+
+
+def default_cache_path(dataset_ref: bigquery.DatasetReference) -> str:
+    """Returns the cache file of the dataset, in the temporary directory."""
+    return os.path.join(
+        tempfile.gettempdir(),
+        "data_science_schema_cache",
+        f"{dataset_ref.project}.{dataset_ref.dataset_id}.json",
+    )
+
+
+def list_table_modified_times(
+    client: bigquery.Client, dataset_ref: bigquery.DatasetReference
+) -> Optional[dict[str, int]]:
+    """Lists the last-modified times of the tables of the dataset.
+
+    This takes a single query of the `__TABLES__` meta-table, whatever the
+    number of tables.
+
+    Returns:
+      The last-modified time, in milliseconds since the epoch, by table id, or
+      None if the meta-table can't be queried.
+    """
+    query = (
+        "SELECT table_id, last_modified_time FROM"
+        f" `{dataset_ref.project}.{dataset_ref.dataset_id}.__TABLES__`"
+    )
+    try:
+        rows = client.query(query).result()
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.warning(
+            "Could not list the modification times of %s, describing all its"
+            " tables.",
+            dataset_ref,
+            exc_info=True,
+        )
+        return None
+    return {row.table_id: int(row.last_modified_time) for row in rows}
+
+
+def table_context(
+    table_info: bigquery.Table, example_values: Any, with_metadata: bool = False
+) -> TableContext:
+    """Describes a table for the prompts.
+
+    Args:
+      table_info: The table, as returned by `get_table`.
+      example_values: Sample values, by column name.
+      with_metadata: Whether to add the descriptions of the table and its
+        columns, and its foreign keys, which schema linking uses.
+
+    Returns:
+      The schema of the table, as (name, type) tuples, and the example values;
+      and with metadata, the descriptions and foreign keys that are set.
+    """
+    context = {
+        "table_schema": [
+            (schema_field.name, schema_field.field_type)
+            for schema_field in table_info.schema
+        ],
+        "example_values": example_values,
+    }
+    if not with_metadata:
+        return context
+    if table_info.description:
+        context["description"] = table_info.description
+    column_descriptions = {
+        schema_field.name: schema_field.description
+        for schema_field in table_info.schema
+        if schema_field.description
+    }
+    if column_descriptions:
+        context["column_descriptions"] = column_descriptions
+    constraints = table_info.table_constraints
+    if constraints and constraints.foreign_keys:
+        context["foreign_keys"] = [
+            {
+                "columns": [
+                    reference.referencing_column
+                    for reference in foreign_key.column_references
+                ],
+                "referenced_table": str(foreign_key.referenced_table),
+                "referenced_columns": [
+                    reference.referenced_column
+                    for reference in foreign_key.column_references
+                ],
+            }
+            for foreign_key in constraints.foreign_keys
+        ]
+    return context
+
+
+def _read_cache(path: str, dataset: str, variant: str) -> dict[str, dict[str, Any]]:
+    """Reads the cached tables of the dataset, or nothing if it's stale."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        logger.warning("Ignoring the unreadable schema cache %s", path)
+        return {}
+    if (
+        cache.get("version") != CACHE_VERSION
+        or cache.get("dataset") != dataset
+        or cache.get("variant") != variant
+    ):
+        return {}
+    return cache.get("tables", {})
+
+
+def _write_cache(
+    path: str, dataset: str, variant: str, tables: dict[str, dict[str, Any]]
+):
+    """Writes the cache atomically, so that concurrent readers never see a
+    partial file."""
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": CACHE_VERSION,
+                    "dataset": dataset,
+                    "variant": variant,
+                    "tables": tables,
+                },
+                f,
+            )
+        os.replace(temp_path, path)
+    except OSError:
+        logger.warning("Could not write the schema cache %s", path, exc_info=True)
+
+
+def _from_json(context: TableContext) -> TableContext:
+    """Restores the (name, type) tuples of the schema, which JSON turns into
+    lists, so that the prompts don't depend on the cache."""
+    return {
+        **context,
+        "table_schema": [tuple(field) for field in context["table_schema"]],
+    }
+
+
+def get_tables_context(
+    client: bigquery.Client,
+    dataset_ref: bigquery.DatasetReference,
+    describe_table: DescribeTable,
+    cache_path: Optional[str] = None,
+    max_workers: int = MAX_WORKERS,
+    variant: str = "",
+) -> dict[str, TableContext]:
+    """Describes the tables of the dataset, reusing the cached descriptions.
+
+    Args:
+      client: The BigQuery client.
+      dataset_ref: The dataset to describe.
+      describe_table: Describes a table; called only for the tables that aren't
+        cached or were modified since they were, and concurrently.
+      cache_path: The cache file, by default in the temporary directory.
+      max_workers: The maximum number of tables described at the same time.
+      variant: Identifies what `describe_table` describes, e.g. whether with
+        the metadata; the cached descriptions of another variant are ignored.
+
+    Returns:
+      The description of each table, by fully-qualified table name, in the
+      order of the table ids.
+    """
+    dataset = f"{dataset_ref.project}.{dataset_ref.dataset_id}"
+    cache_path = cache_path or default_cache_path(dataset_ref)
+    cached = _read_cache(cache_path, dataset, variant)
+
+    modified_times = list_table_modified_times(client, dataset_ref)
+    if modified_times is None:
+        table_ids = [table.table_id for table in client.list_tables(dataset_ref)]
+        modified_times = dict.fromkeys(table_ids)
+    stale = [
+        table_id
+        for table_id, modified in modified_times.items()
+        if modified is None
+        or table_id not in cached
+        or cached[table_id]["modified"] != modified
+    ]
+
+    if stale:
+        logger.info(
+            "Describing %d of the %d tables of %s",
+            len(stale),
+            len(modified_times),
+            dataset,
+        )
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            contexts = executor.map(
+                lambda table_id: describe_table(client, dataset_ref.table(table_id)),
+                stale,
+            )
+            for table_id, context in zip(stale, contexts):
+                cached[table_id] = {
+                    "modified": modified_times[table_id],
+                    "context": context,
+                }
+
+    # Forget the deleted tables, and only rewrite the cache if it changed.
+    tables = {table_id: cached[table_id] for table_id in sorted(modified_times)}
+    if stale or len(tables) != len(cached):
+        _write_cache(cache_path, dataset, variant, tables)
+
+    return {
+        str(dataset_ref.table(table_id)): _from_json(table["context"])
+        for table_id, table in tables.items()
+    }
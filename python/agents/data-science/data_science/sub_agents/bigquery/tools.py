@@ -15,11 +15,13 @@
 """This file contains the tools used by the database agent."""
 
 import datetime
+import functools
 import logging
 import os
 
 import numpy as np
 import pandas as pd
+from data_science.utils import schema_linking
 from data_science.utils.utils import get_env_var, USER_AGENT
 from google.adk.tools import ToolContext
 from google.adk.tools.bigquery.client import get_bigquery_client
@@ -27,6 +29,7 @@ from google.cloud import bigquery
 from google.genai import Client
 from google.genai.types import HttpOptions
 
+from . import schema_cache
 from .chase_sql import chase_constants
 from ...utils.utils import USER_AGENT
 
@@ -103,40 +106,49 @@ def update_database_settings():
     return database_settings
 
 
+def _describe_table(
+    client: bigquery.Client,
+    table_ref: bigquery.TableReference,
+    with_metadata: bool = False,
+) -> dict:
+    """Retrieves the schema and sample values of a BigQuery table."""
+    table_info = client.get_table(table_ref)
+    sample_values = []
+    if False:
+        sample_query = f"SELECT * FROM `{table_ref}` LIMIT 5"
+        sample_values = (
+            client.query(sample_query).to_dataframe().to_dict(orient="list")
+        )
+        for key in sample_values:
+            sample_values[key] = [
+                _serialize_value_for_sql(v) for v in sample_values[key]
+            ]
+    return schema_cache.table_context(table_info, sample_values, with_metadata)
+
+
 def get_bigquery_schema_and_samples():
-    """Retrieves schema and sample values for the BigQuery dataset tables."""
+    """Retrieves schema and sample values for the BigQuery dataset tables.
+
+    The tables are described concurrently, and cached on disk so that only the
+    tables modified since the last run are described again. Set
+    `BQ_SCHEMA_CACHE_PATH` to choose the cache file.
+    """
     client = get_bigquery_client(
         project=compute_project,
         credentials=None,
         user_agent=USER_AGENT,
     )
     dataset_ref = bigquery.DatasetReference(data_project, dataset_id)
-    tables_context = {}
-    for table in client.list_tables(dataset_ref):
-        table_info = client.get_table(
-            bigquery.TableReference(dataset_ref, table.table_id)
-        )
-        table_schema = [
-            (schema_field.name, schema_field.field_type)
-            for schema_field in table_info.schema
-        ]
-        table_ref = dataset_ref.table(table.table_id)
-        sample_values = []
-        if False:
-            sample_query = f"SELECT * FROM `{table_ref}` LIMIT 5"
-            sample_values = (
-                client.query(sample_query).to_dataframe().to_dict(orient="list")
-            )
-            for key in sample_values:
-                sample_values[key] = [
-                    _serialize_value_for_sql(v) for v in sample_values[key]
-                ]
-        tables_context[str(table_ref)] = {
-            "table_schema": table_schema,
-            "example_values": sample_values,
-        }
-
-    return tables_context
+    # The descriptions and foreign keys help to link the questions to the
+    # relevant tables, and are left out of the prompts otherwise.
+    with_metadata = schema_linking.pruning_enabled()
+    return schema_cache.get_tables_context(
+        client,
+        dataset_ref,
+        functools.partial(_describe_table, with_metadata=with_metadata),
+        cache_path=os.getenv("BQ_SCHEMA_CACHE_PATH"),
+        variant="metadata" if with_metadata else "",
+    )
 
 
 def bigquery_nl2sql(
@@ -207,7 +219,11 @@ best practices outlined above to generate the correct BigQuery SQL.
 
    """
 
-    schema = tool_context.state["database_settings"]["bigquery"]["schema"]
+    schema = schema_linking.prune_bigquery_schema(
+        tool_context.state["database_settings"]["bigquery"]["schema"],
+        question,
+        embed=schema_linking.embedder_from_env(),
+    )
 
     prompt = prompt_template.format(
         MAX_NUM_ROWS=MAX_NUM_ROWS, SCHEMA=schema, QUESTION=question
@@ -0,0 +1,580 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Schema linking: selects the tables and columns relevant to a question.
+
+The NL2SQL prompts embed the schema of the dataset, which on wide datasets is
+most of the prompt. A local index of the names and descriptions of the tables
+and columns ranks them against the question with BM25, optionally blended with
+embeddings, so that the prompts only embed the top tables, the tables they
+reference through foreign keys, and their relevant columns.
+
+Pruning is opt-in: the prompts embed the whole schema unless
+`NL2SQL_SCHEMA_TOP_K` is set to the number of top tables to keep.
+
+Schemas too small to be worth pruning, and questions that match nothing in
+the schema, keep the whole schema.
+"""
+
+import collections
+import dataclasses
+import functools
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# The number of top tables that `SchemaIndex.select` selects by default. The
+# tools only prune if `NL2SQL_SCHEMA_TOP_K` is set.
+TOP_K_TABLES = 5
+MAX_COLUMNS_PER_TABLE = 30
+# Schemas with fewer columns than this are always embedded whole.
+MIN_COLUMNS_TO_PRUNE = 100
+# The weight of the embedding similarity against the lexical score.
+EMBEDDING_WEIGHT = 0.5
+EMBEDDING_BATCH_SIZE = 100
+
+Embed = Callable[[Sequence[str]], np.ndarray]
+
+
+@dataclasses.dataclass
+class ForeignKey:
+    columns: list[str]
+    referenced_table: str
+    referenced_columns: list[str] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class Column:
+    name: str
+    type: str = ""
+    description: str = ""
+
+
+@dataclasses.dataclass
+class Table:
+    name: str
+    columns: list[Column]
+    description: str = ""
+    foreign_keys: list[ForeignKey] = dataclasses.field(default_factory=list)
+
+
+_WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_STOP_WORDS = frozenset(
+    "a all an and are as at be by can do does each for from give had has have"
+    " how i in is it list many me much of on or per show that the their there"
+    " these this to was were what when where which who with".split()
+)
+
+
+def _stem(word: str) -> str:
+    """Strips the plural, so that "flights" matches the "flight" column."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    """Splits names and text into stemmed lowercase words, e.g. the name
+    "departureAirport_IATA" into ["departure", "airport", "iata"]."""
+    return [
+        _stem(word)
+        for word in (match.lower() for match in _WORD.findall(text or ""))
+        if word not in _STOP_WORDS
+    ]
+
+
+class _Bm25:
+    """A BM25 index of tokenized documents."""
+
+    def __init__(self, documents: list[list[str]], k1: float = 1.2, b: float = 0.75):
+        self.postings: dict[str, list[tuple[int, float]]] = collections.defaultdict(
+            list
+        )
+        lengths = [len(document) for document in documents]
+        average_length = (sum(lengths) / len(lengths) if lengths else 0) or 1.0
+        for i, document in enumerate(documents):
+            length_norm = k1 * (1 - b + b * lengths[i] / average_length)
+            for token, count in collections.Counter(document).items():
+                self.postings[token].append(
+                    (i, count * (k1 + 1) / (count + length_norm))
+                )
+        self.idf = {
+            token: math.log(
+                1 + (len(documents) - len(postings) + 0.5) / (len(postings) + 0.5)
+            )
+            for token, postings in self.postings.items()
+        }
+
+    def scores(self, tokens: Sequence[str]) -> dict[int, float]:
+        """Returns the score of each document matching any of the tokens."""
+        scores: dict[int, float] = collections.defaultdict(float)
+        for token in set(tokens):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for i, weight in self.postings[token]:
+                scores[i] += idf * weight
+        return scores
+
+
+def _is_key(column_name: str) -> bool:
+    name = column_name.lower()
+    return name == "id" or name.endswith("_id")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class SchemaIndex:
+    """An index of the tables and columns of a schema.
+
+    Args:
+      tables: The tables of the schema.
+      embed: Embeds texts, to blend the similarity of the question to the
+        tables with their lexical score; lexical only if None.
+    """
+
+    def __init__(self, tables: Sequence[Table], embed: Optional[Embed] = None):
+        self.tables = list(tables)
+        self._by_name: dict[str, int] = {}
+        for i, table in enumerate(self.tables):
+            self._by_name[table.name] = i
+            self._by_name.setdefault(table.name.rsplit(".", 1)[-1], i)
+
+        # The columns of table i are the documents offsets[i]:offsets[i + 1].
+        self._offsets = [0]
+        column_documents = []
+        for table in self.tables:
+            column_documents.extend(
+                tokenize(f"{column.name} {column.description}")
+                for column in table.columns
+            )
+            self._offsets.append(len(column_documents))
+        self._column_tables = [
+            i for i, table in enumerate(self.tables) for _ in table.columns
+        ]
+        self._column_index = _Bm25(column_documents)
+        table_texts = [self._table_text(table) for table in self.tables]
+        self._table_index = _Bm25([tokenize(text) for text in table_texts])
+
+        self._embed = embed
+        self._table_vectors = None
+        if embed is not None and self.tables:
+            self._table_vectors = _normalize(embed(table_texts))
+
+    @staticmethod
+    def _table_text(table: Table) -> str:
+        columns = " ".join(column.name for column in table.columns)
+        return f"{table.name} {table.description} {columns}"
+
+    @property
+    def num_columns(self) -> int:
+        return self._offsets[-1]
+
+    def resolve(self, table_name: str) -> Optional[int]:
+        """Returns the index of the table, by full or unqualified name."""
+        table_name = table_name.strip('`"')
+        if table_name in self._by_name:
+            return self._by_name[table_name]
+        return self._by_name.get(table_name.rsplit(".", 1)[-1])
+
+    def _rank_tables(
+        self, question: str, column_scores: dict[int, float]
+    ) -> list[tuple[int, float]]:
+        """Returns the tables relevant to the question, most relevant first."""
+        scores = self._table_index.scores(tokenize(question))
+        # A table is also as relevant as its best matching column.
+        best_columns: dict[int, float] = {}
+        for column, score in column_scores.items():
+            table = self._column_tables[column]
+            best_columns[table] = max(best_columns.get(table, 0.0), score)
+        for table, score in best_columns.items():
+            scores[table] = scores.get(table, 0.0) + score
+
+        if self._table_vectors is not None:
+            try:
+                query_vector = _normalize(self._embed([question]))[0]
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.warning(
+                    "Could not embed the question, linking the schema" " lexically.",
+                    exc_info=True,
+                )
+            else:
+                similarities = self._table_vectors @ query_vector
+                top_score = max(scores.values(), default=0.0) or 1.0
+                scores = {
+                    i: (1 - EMBEDDING_WEIGHT) * scores.get(i, 0.0) / top_score
+                    + EMBEDDING_WEIGHT * max(float(similarity), 0.0)
+                    for i, similarity in enumerate(similarities)
+                }
+        return sorted(
+            ((i, score) for i, score in scores.items() if score > 0),
+            key=lambda item: (-item[1], item[0]),
+        )
+
+    def select(
+        self,
+        question: str,
+        top_k: int = TOP_K_TABLES,
+        max_columns: int = MAX_COLUMNS_PER_TABLE,
+        min_columns: int = MIN_COLUMNS_TO_PRUNE,
+    ) -> Optional[dict[str, list[str]]]:
+        """Selects the tables and columns relevant to the question.
+
+        Args:
+          question: The natural language question.
+          top_k: The number of most relevant tables to select. The tables they
+            reference through foreign keys are added to them, transitively,
+            then the other matching tables that reference them, up to twice as
+            many tables.
+          max_columns: The number of columns above which the columns of a
+            table are pruned. The keys and the columns that match the question
+            are kept first, then the leading columns of the table.
+          min_columns: The number of columns of the schema below which it is
+            not pruned.
+
+        Returns:
+          The names of the columns to keep, in the order of the schema, by
+          table name; or None to keep the whole schema, if it's too small or
+          nothing in it matches the question.
+        """
+        if self.num_columns < min_columns:
+            return None
+        column_scores = self._column_index.scores(tokenize(question))
+        ranked = [i for i, _ in self._rank_tables(question, column_scores)]
+        if not ranked:
+            return None
+
+        selected = ranked[:top_k]
+        queue = collections.deque(selected)
+        while queue and len(selected) < 2 * top_k:
+            for foreign_key in self.tables[queue.popleft()].foreign_keys:
+                referenced = self.resolve(foreign_key.referenced_table)
+                if referenced is not None and referenced not in selected:
+                    selected.append(referenced)
+                    queue.append(referenced)
+                    if len(selected) >= 2 * top_k:
+                        break
+        # The less relevant tables that also match the question, and reference
+        # a selected table, e.g. the facts of a selected dimension.
+        for i in ranked[top_k:]:
+            if len(selected) >= 2 * top_k:
+                break
+            if any(
+                self.resolve(foreign_key.referenced_table) in selected
+                for foreign_key in self.tables[i].foreign_keys
+            ):
+                selected.append(i)
+
+        # The columns joining the selected tables.
+        join_columns: dict[int, set[str]] = collections.defaultdict(set)
+        for i in selected:
+            for foreign_key in self.tables[i].foreign_keys:
+                referenced = self.resolve(foreign_key.referenced_table)
+                if referenced in selected:
+                    join_columns[i].update(foreign_key.columns)
+                    join_columns[referenced].update(foreign_key.referenced_columns)
+
+        question_tokens = set(tokenize(question))
+        selection = {}
+        for i in selected:
+            table = self.tables[i]
+            if len(table.columns) <= max_columns:
+                selection[table.name] = [column.name for column in table.columns]
+                continue
+            keep = join_columns[i] | {
+                column.name for column in table.columns if _is_key(column.name)
+            }
+            # The words of the table name, often repeated in the names of its
+            # columns, don't tell its columns apart.
+            table_tokens = set(tokenize(table.name.rsplit(".", 1)[-1]))
+            scores = column_scores
+            if question_tokens & table_tokens:
+                scores = self._column_index.scores(list(question_tokens - table_tokens))
+            start = self._offsets[i]
+            matches = sorted(
+                (
+                    (score, column - start)
+                    for column, score in scores.items()
+                    if start <= column < self._offsets[i + 1]
+                ),
+                reverse=True,
+            )
+            candidates = [table.columns[j].name for _, j in matches]
+            candidates += [column.name for column in table.columns]
+            for name in candidates:
+                if len(keep) >= max_columns:
+                    break
+                keep.add(name)
+            selection[table.name] = [
+                column.name for column in table.columns if column.name in keep
+            ]
+        return selection
+
+
+_MAX_INDEXES = 8
+_indexes: "collections.OrderedDict[tuple[str, Optional[Embed]], SchemaIndex]" = (
+    collections.OrderedDict()
+)
+
+
+def _get_index(
+    schema: Any,
+    to_tables: Callable[[Any], list[Table]],
+    embed: Optional[Embed],
+) -> SchemaIndex:
+    """Returns the index of the schema, built once per version of the schema."""
+    fingerprint = hashlib.sha256(
+        json.dumps(schema, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    key = (fingerprint, embed)
+    if key in _indexes:
+        _indexes.move_to_end(key)
+        return _indexes[key]
+    index = SchemaIndex(to_tables(schema), embed)
+    _indexes[key] = index
+    if len(_indexes) > _MAX_INDEXES:
+        _indexes.popitem(last=False)
+    return index
+
+
+def _top_k(top_k: Optional[int]) -> int:
+    if top_k is None:
+        return int(os.getenv("NL2SQL_SCHEMA_TOP_K", "0"))
+    return top_k
+
+
+def pruning_enabled() -> bool:
+    """Whether `NL2SQL_SCHEMA_TOP_K` turns the pruning of the schema on."""
+    return _top_k(None) > 0
+
+
+@functools.lru_cache(maxsize=None)
+def _genai_embedder(model: str) -> Embed:
+    # pylint: disable=import-outside-toplevel
+    from google.genai import Client
+
+    client = Client(
+        vertexai=True,
+        project=os.getenv("GOOGLE_CLOUD_PROJECT"),
+        location=os.getenv("GOOGLE_CLOUD_LOCATION"),
+    )
+
+    def embed(texts: Sequence[str]) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            response = client.models.embed_content(
+                model=model, contents=list(texts[start : start + EMBEDDING_BATCH_SIZE])
+            )
+            vectors.extend(embedding.values for embedding in response.embeddings)
+        return np.asarray(vectors, dtype=np.float32)
+
+    return embed
+
+
+def embedder_from_env() -> Optional[Embed]:
+    """Returns the embedder of `NL2SQL_SCHEMA_EMBEDDING_MODEL`, if it's set."""
+    model = os.getenv("NL2SQL_SCHEMA_EMBEDDING_MODEL")
+    return _genai_embedder(model) if model else None
+
+
+def bigquery_tables(tables_context: dict[str, dict[str, Any]]) -> list[Table]:
+    """Returns the tables of a schema of the BigQuery tools."""
+    tables = []
+    for name, context in tables_context.items():
+        descriptions = context.get("column_descriptions", {})
+        tables.append(
+            Table(
+                name=name,
+                columns=[
+                    Column(field[0], field[1], descriptions.get(field[0], ""))
+                    for field in context["table_schema"]
+                ],
+                description=context.get("description", ""),
+                foreign_keys=[
+                    ForeignKey(**foreign_key)
+                    for foreign_key in context.get("foreign_keys", [])
+                ],
+            )
+        )
+    return tables
+
+
+def prune_bigquery_schema(
+    tables_context: dict[str, dict[str, Any]],
+    question: str,
+    top_k: Optional[int] = None,
+    embed: Optional[Embed] = None,
+) -> dict[str, dict[str, Any]]:
+    """Prunes a schema of the BigQuery tools to what's relevant to the question.
+
+    Args:
+      tables_context: The description of each table, by table name.
+      question: The natural language question.
+      top_k: The number of most relevant tables to keep, by default
+        `NL2SQL_SCHEMA_TOP_K`; 0, or unset, to keep the whole schema.
+      embed: Embeds texts, to blend embedding similarity into the ranking.
+
+    Returns:
+      The descriptions of the selected tables, restricted to the selected
+      columns, in the same format.
+    """
+    top_k = _top_k(top_k)
+    if top_k <= 0 or not tables_context:
+        return tables_context
+    selection = _get_index(tables_context, bigquery_tables, embed).select(
+        question, top_k
+    )
+    if selection is None:
+        return tables_context
+
+    pruned = {}
+    for name, context in tables_context.items():
+        if name not in selection:
+            continue
+        keep = set(selection[name])
+        context = {
+            **context,
+            "table_schema": [
+                field for field in context["table_schema"] if field[0] in keep
+            ],
+        }
+        for key in ("example_values", "column_descriptions"):
+            if context.get(key):
+                context[key] = {
+                    column: value
+                    for column, value in context[key].items()
+                    if column in keep
+                }
+        pruned[name] = context
+    return pruned
+
+
+_FOREIGN_KEY_DEFINITION = re.compile(
+    r"FOREIGN KEY\s*\((?P<columns>[^)]*)\)\s*REFERENCES\s+(?P<table>[\w.\"]+)"
+    r"\s*(?:\((?P<referenced_columns>[^)]*)\))?",
+    re.IGNORECASE,
+)
+
+
+def _split_columns(columns: Optional[str]) -> list[str]:
+    return [
+        column.strip().strip('"')
+        for column in (columns or "").split(",")
+        if column.strip()
+    ]
+
+
+def _alloydb_details(entry: dict[str, Any]) -> dict[str, Any]:
+    details = entry.get("object_details") or {}
+    return json.loads(details) if isinstance(details, str) else details
+
+
+def alloydb_tables(entries: list[dict[str, Any]]) -> list[Table]:
+    """Returns the tables of a schema listed by the MCP Toolbox."""
+    tables = []
+    for entry in entries:
+        details = _alloydb_details(entry)
+        foreign_keys = []
+        for constraint in details.get("constraints") or []:
+            match = _FOREIGN_KEY_DEFINITION.search(
+                constraint.get("constraint_definition") or ""
+            )
+            if not match:
+                continue
+            foreign_keys.append(
+                ForeignKey(
+                    columns=_split_columns(match["columns"]),
+                    referenced_table=match["table"].strip('"'),
+                    referenced_columns=_split_columns(match["referenced_columns"]),
+                )
+            )
+        tables.append(
+            Table(
+                name=entry.get("object_name", ""),
+                columns=[
+                    Column(
+                        column.get("column_name", ""),
+                        column.get("data_type", ""),
+                        column.get("column_comment") or "",
+                    )
+                    for column in details.get("columns") or []
+                ],
+                description=details.get("comment") or "",
+                foreign_keys=foreign_keys,
+            )
+        )
+    return tables
+
+
+def prune_alloydb_schema(
+    schema: Any,
+    question: str,
+    top_k: Optional[int] = None,
+    embed: Optional[Embed] = None,
+) -> Any:
+    """Prunes a schema listed by the MCP Toolbox to what's relevant to the
+    question.
+
+    The schema is a list of tables with their `object_name` and
+    `object_details`, or its JSON. Schemas in any other format are kept whole.
+
+    Returns:
+      The selected tables, restricted to the selected columns, in the same
+      format as the schema.
+    """
+    top_k = _top_k(top_k)
+    if top_k <= 0 or not schema:
+        return schema
+    try:
+        entries = json.loads(schema) if isinstance(schema, str) else schema
+        selection = _get_index(entries, alloydb_tables, embed).select(question, top_k)
+    except (AttributeError, KeyError, TypeError, ValueError):
+        logger.debug("Not pruning the schema, in an unknown format.", exc_info=True)
+        return schema
+    if selection is None:
+        return schema
+
+    pruned = []
+    for entry in entries:
+        name = entry.get("object_name", "")
+        if name not in selection:
+            continue
+        keep = set(selection[name])
+        details = _alloydb_details(entry)
+        details = {
+            **details,
+            "columns": [
+                column
+                for column in details.get("columns") or []
+                if column.get("column_name") in keep
+            ],
+        }
+        if isinstance(entry.get("object_details"), str):
+            details = json.dumps(details)
+        pruned.append({**entry, "object_details": details})
+    return json.dumps(pruned) if isinstance(schema, str) else pruned
@@ -0,0 +1,248 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the on-disk cache of the BigQuery schema."""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import types
+import unittest
+from unittest import mock
+
+from google.cloud import bigquery
+
+# Imports the module alone, as importing the package would build the agents.
+sys.path.append(
+    os.path.abspath(
+        os.path.join(
+            os.path.dirname(__file__), "..", "data_science", "sub_agents", "bigquery"
+        )
+    )
+)
+
+import schema_cache  # pylint: disable=import-error,wrong-import-position
+
+DATASET_REF = bigquery.DatasetReference("my-project", "my_dataset")
+
+
+class FakeClient:
+    """A BigQuery client serving the last-modified times of the tables."""
+
+    def __init__(self, modified_times: dict[str, int]):
+        self.modified_times = modified_times
+        self.fail_queries = False
+
+    def query(self, query: str):
+        if self.fail_queries:
+            raise RuntimeError(f"Cannot run {query}")
+        rows = [
+            types.SimpleNamespace(table_id=table_id, last_modified_time=modified)
+            for table_id, modified in self.modified_times.items()
+        ]
+        return types.SimpleNamespace(result=lambda: rows)
+
+    def list_tables(self, dataset_ref):
+        del dataset_ref  # Unused.
+        return [
+            types.SimpleNamespace(table_id=table_id) for table_id in self.modified_times
+        ]
+
+
+class TestGetTablesContext(unittest.TestCase):
+    """Test cases for the reuse of the cached table descriptions."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.cache_path = os.path.join(temp_dir.name, "cache.json")
+        self.client = FakeClient({"flights": 1, "airports": 1, "tickets": 1})
+        self.described = []
+        self._lock = threading.Lock()
+
+    def describe_table(self, client, table_ref):
+        del client  # Unused.
+        with self._lock:
+            self.described.append(table_ref.table_id)
+        modified = self.client.modified_times[table_ref.table_id]
+        return {
+            "table_schema": [("id", "INTEGER"), (f"v{modified}", "STRING")],
+            "example_values": {},
+        }
+
+    def get_tables_context(self):
+        self.described.clear()
+        return schema_cache.get_tables_context(
+            self.client, DATASET_REF, self.describe_table, self.cache_path
+        )
+
+    def test_unchanged_tables_are_not_described_again(self):
+        first = self.get_tables_context()
+        self.assertCountEqual(self.described, ["flights", "airports", "tickets"])
+        second = self.get_tables_context()
+        self.assertEqual(self.described, [])
+        self.assertEqual(second, first)
+        self.assertEqual(
+            second["my-project.my_dataset.flights"]["table_schema"],
+            [("id", "INTEGER"), ("v1", "STRING")],
+        )
+
+    def test_modified_tables_are_described_again(self):
+        self.get_tables_context()
+        self.client.modified_times["airports"] = 2
+        tables = self.get_tables_context()
+        self.assertEqual(self.described, ["airports"])
+        self.assertEqual(
+            tables["my-project.my_dataset.airports"]["table_schema"],
+            [("id", "INTEGER"), ("v2", "STRING")],
+        )
+
+    def test_deleted_tables_are_evicted(self):
+        self.get_tables_context()
+        del self.client.modified_times["tickets"]
+        tables = self.get_tables_context()
+        self.assertEqual(self.described, [])
+        self.assertNotIn("my-project.my_dataset.tickets", tables)
+        with open(self.cache_path, encoding="utf-8") as f:
+            self.assertNotIn("tickets", json.load(f)["tables"])
+
+    def test_version_mismatch_invalidates_the_cache(self):
+        self.get_tables_context()
+        with mock.patch.object(
+            schema_cache, "CACHE_VERSION", schema_cache.CACHE_VERSION + 1
+        ):
+            self.get_tables_context()
+        self.assertCountEqual(self.described, ["flights", "airports", "tickets"])
+
+    def test_variant_mismatch_invalidates_the_cache(self):
+        self.get_tables_context()
+        self.described.clear()
+        schema_cache.get_tables_context(
+            self.client,
+            DATASET_REF,
+            self.describe_table,
+            self.cache_path,
+            variant="metadata",
+        )
+        self.assertCountEqual(self.described, ["flights", "airports", "tickets"])
+
+    def test_all_tables_are_described_without_modified_times(self):
+        self.get_tables_context()
+        self.client.fail_queries = True
+        tables = self.get_tables_context()
+        self.assertCountEqual(self.described, ["flights", "airports", "tickets"])
+        self.assertEqual(len(tables), 3)
+
+
+def make_table() -> bigquery.Table:
+    """A table with descriptions and a foreign key."""
+    table = bigquery.Table(
+        DATASET_REF.table("tickets"),
+        schema=[
+            bigquery.SchemaField("id", "INTEGER", description="The ticket id."),
+            bigquery.SchemaField("flight_id", "INTEGER"),
+            bigquery.SchemaField("price", "FLOAT"),
+        ],
+    )
+    table.description = "Tickets sold."
+    table.table_constraints = bigquery.table.TableConstraints(
+        primary_key=None,
+        foreign_keys=[
+            bigquery.table.ForeignKey(
+                name="fk_flight",
+                referenced_table=DATASET_REF.table("flights"),
+                column_references=[
+                    bigquery.table.ColumnReference(
+                        referencing_column="flight_id", referenced_column="id"
+                    )
+                ],
+            )
+        ],
+    )
+    return table
+
+
+class TestTableContext(unittest.TestCase):
+    """Test cases for the description of a table."""
+
+    def test_metadata_is_described_for_schema_linking(self):
+        self.assertEqual(
+            schema_cache.table_context(make_table(), [], with_metadata=True),
+            {
+                "table_schema": [
+                    ("id", "INTEGER"),
+                    ("flight_id", "INTEGER"),
+                    ("price", "FLOAT"),
+                ],
+                "example_values": [],
+                "description": "Tickets sold.",
+                "column_descriptions": {"id": "The ticket id."},
+                "foreign_keys": [
+                    {
+                        "columns": ["flight_id"],
+                        "referenced_table": "my-project.my_dataset.flights",
+                        "referenced_columns": ["id"],
+                    }
+                ],
+            },
+        )
+
+    def test_descriptions_are_unchanged_without_schema_linking(self):
+        client = FakeClient({"flights": 1, "tickets": 1})
+        client.get_table = lambda table_ref: make_table()
+        # How the tables were described before the cache.
+        baseline = {}
+        for table in client.list_tables(DATASET_REF):
+            table_info = client.get_table(
+                bigquery.TableReference(DATASET_REF, table.table_id)
+            )
+            table_schema = [
+                (schema_field.name, schema_field.field_type)
+                for schema_field in table_info.schema
+            ]
+            table_ref = DATASET_REF.table(table.table_id)
+            baseline[str(table_ref)] = {
+                "table_schema": table_schema,
+                "example_values": [],
+            }
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, "cache.json")
+            for _ in range(2):  # Described, then cached.
+                tables = schema_cache.get_tables_context(
+                    client,
+                    DATASET_REF,
+                    lambda client, table_ref: schema_cache.table_context(
+                        client.get_table(table_ref), []
+                    ),
+                    cache_path,
+                )
+                # The prompts embed the descriptions as strings.
+                self.assertEqual(str(tables), str(baseline))
+
+    def test_missing_metadata_is_left_out(self):
+        table = bigquery.Table(
+            DATASET_REF.table("flights"),
+            schema=[bigquery.SchemaField("id", "INTEGER")],
+        )
+        self.assertEqual(
+            schema_cache.table_context(table, [], with_metadata=True),
+            {"table_schema": [("id", "INTEGER")], "example_values": []},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
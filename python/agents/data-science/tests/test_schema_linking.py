@@ -0,0 +1,155 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the schema linking of the NL2SQL prompts."""
+
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Imports the module alone, as importing the package would build the agents.
+sys.path.append(
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "data_science", "utils")
+    )
+)
+
+import schema_linking  # pylint: disable=import-error,wrong-import-position
+from schema_linking import (  # pylint: disable=import-error,wrong-import-position
+    Column,
+    ForeignKey,
+    SchemaIndex,
+    Table,
+)
+
+
+def make_tables(num_filler_tables: int = 20) -> list[Table]:
+    """Returns orders -> customers -> regions, and unrelated filler tables."""
+    tables = [
+        Table(
+            "shop.orders",
+            [Column("order_id"), Column("customer_id"), Column("amount")],
+            foreign_keys=[
+                ForeignKey(["customer_id"], "shop.customers", ["customer_id"])
+            ],
+        ),
+        Table(
+            "shop.customers",
+            [Column("customer_id"), Column("region_id"), Column("full_name")],
+            foreign_keys=[ForeignKey(["region_id"], "regions", ["region_id"])],
+        ),
+        Table("shop.regions", [Column("region_id"), Column("label")]),
+    ]
+    for i in range(num_filler_tables):
+        tables.append(
+            Table(f"shop.misc_{i}", [Column(f"field_{i}_{j}") for j in range(5)])
+        )
+    return tables
+
+
+class TestSchemaIndex(unittest.TestCase):
+    """Test cases for the selection of the tables and columns."""
+
+    def setUp(self):
+        self.index = SchemaIndex(make_tables())
+
+    def test_select_follows_foreign_keys_transitively(self):
+        selection = self.index.select("total order amount", top_k=2, min_columns=0)
+        self.assertEqual(
+            list(selection), ["shop.orders", "shop.customers", "shop.regions"]
+        )
+
+    def test_select_caps_the_tables_at_twice_top_k(self):
+        selection = self.index.select("total order amount", top_k=1, min_columns=0)
+        self.assertEqual(list(selection), ["shop.orders", "shop.customers"])
+
+    def test_select_keeps_whole_schema_without_match(self):
+        self.assertIsNone(self.index.select("zebra giraffe", min_columns=0))
+
+    def test_select_keeps_small_schema_whole(self):
+        self.assertIsNone(self.index.select("total order amount", min_columns=1000))
+
+    def test_select_prunes_wide_tables_to_keys_and_matches(self):
+        columns = [Column("order_id"), Column("discount_rate")]
+        columns += [Column(f"extra_{j}") for j in range(40)]
+        index = SchemaIndex([Table("shop.orders", columns)])
+        selection = index.select("discount rate", max_columns=5, min_columns=0)
+        kept = selection["shop.orders"]
+        self.assertEqual(len(kept), 5)
+        self.assertEqual(kept[:2], ["order_id", "discount_rate"])
+
+
+def alloydb_entry(table: Table) -> dict:
+    """Returns the table as listed by the MCP Toolbox."""
+    details = {
+        "columns": [
+            {"column_name": column.name, "data_type": "text"}
+            for column in table.columns
+        ],
+        "constraints": [
+            {
+                "constraint_definition": (
+                    f"FOREIGN KEY ({', '.join(key.columns)}) REFERENCES"
+                    f" {key.referenced_table}"
+                    f"({', '.join(key.referenced_columns)})"
+                )
+            }
+            for key in table.foreign_keys
+        ],
+    }
+    return {"object_name": table.name, "object_details": json.dumps(details)}
+
+
+class TestPruneAlloyDbSchema(unittest.TestCase):
+    """Test cases for the pruning of the schemas listed by the MCP Toolbox."""
+
+    def test_round_trip_keeps_the_format(self):
+        entries = [alloydb_entry(table) for table in make_tables()]
+        pruned = schema_linking.prune_alloydb_schema(
+            json.dumps(entries), "total order amount", top_k=1
+        )
+        self.assertIsInstance(pruned, str)
+        pruned = json.loads(pruned)
+        self.assertEqual(
+            [entry["object_name"] for entry in pruned],
+            ["shop.orders", "shop.customers"],
+        )
+        details = json.loads(pruned[0]["object_details"])
+        self.assertEqual(
+            [column["column_name"] for column in details["columns"]],
+            ["order_id", "customer_id", "amount"],
+        )
+        self.assertEqual(
+            details["constraints"],
+            json.loads(entries[0]["object_details"])["constraints"],
+        )
+
+    def test_keeps_whole_schema_by_default(self):
+        entries = [alloydb_entry(table) for table in make_tables()]
+        with mock.patch.dict(os.environ):
+            os.environ.pop("NL2SQL_SCHEMA_TOP_K", None)
+            pruned = schema_linking.prune_alloydb_schema(entries, "total order amount")
+        self.assertIs(pruned, entries)
+
+    def test_keeps_unknown_format_whole(self):
+        self.assertEqual(
+            schema_linking.prune_alloydb_schema("not json", "orders", top_k=1),
+            "not json",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures the download-to-artifact path of a PDF.
+
+The PDF is served in chunks by a stub Fed website, fetched, saved to an
+artifact and loaded back, as download_file_from_url and
+extract_text_from_pdf_artifact do. The artifact size and the peak memory are
+reported for:
+
+* base64 (legacy): the body buffered by httpx, then base64-encoded, as older
+  versions of this agent stored it;
+* raw, buffered: the raw body buffered by httpx (no HTTP cache);
+* raw, streamed: the raw body streamed to the HTTP cache, then read back.
+
+Usage (from the fomc-research directory, with a large press conference
+transcript downloaded locally):
+
+    python -m benchmarks.benchmark_pdf_artifacts --pdf=FOMCpresconf20250319.pdf
+"""
+
+import asyncio
+import base64
+import tempfile
+import time
+import tracemalloc
+from collections.abc import AsyncIterator, Sequence
+
+import httpx
+from absl import app, flags
+from google.genai.types import Blob, Part
+
+from fomc_research.shared_libraries import file_utils, http_utils
+
+FLAGS = flags.FLAGS
+flags.DEFINE_string("pdf", None, "Path to a PDF file.", required=True)
+
+URL = "https://www.federalreserve.gov/mediacenter/files/transcript.pdf"
+
+
+class ArtifactStore:
+    """Keeps the artifacts saved by the tools in memory."""
+
+    def __init__(self):
+        self.artifacts: dict[str, Part] = {}
+
+    async def save_artifact(self, filename: str, artifact: Part) -> int:
+        self.artifacts[filename] = artifact
+        return 0
+
+    async def load_artifact(self, filename: str) -> Part:
+        return self.artifacts[filename]
+
+
+def stub_transport(pdf_bytes: bytes) -> httpx.MockTransport:
+    """Serves the PDF in chunks, as a real server would stream it."""
+
+    async def body() -> AsyncIterator[bytes]:
+        for i in range(0, len(pdf_bytes), http_utils.CHUNK_SIZE):
+            yield pdf_bytes[i : i + http_utils.CHUNK_SIZE]
+
+    return httpx.MockTransport(
+        lambda request: httpx.Response(
+            200, content=body(), headers={"Content-Type": "application/pdf"}
+        )
+    )
+
+
+async def download_to_artifact(
+    pdf_bytes: bytes, legacy: bool, streamed: bool
+) -> tuple[bytes, int, int]:
+    """Downloads the PDF to an artifact.
+
+    Returns:
+      The bytes loaded back from the artifact, the artifact size, and the
+      peak memory traced along the way.
+    """
+    cache = http_utils.HttpCache(tempfile.mkdtemp()) if streamed else None
+    fetcher = http_utils.HttpFetcher(
+        cache=cache, immutable_url_pattern=None, transport=stub_transport(pdf_bytes)
+    )
+    store = ArtifactStore()
+    # Traced from inside the event loop, so that the allocations made when
+    # tearing it down are left out.
+    tracemalloc.start()
+    try:
+        result = await fetcher.fetch(URL)
+        if legacy:
+            await store.save_artifact(
+                "transcript.pdf",
+                Part(
+                    inline_data=Blob(
+                        data=base64.b64encode(result.content),
+                        mime_type="application/pdf",
+                    )
+                ),
+            )
+        else:
+            await file_utils._save_fetch_result(  # pylint: disable=protected-access
+                result, "transcript.pdf", store
+            )
+        del result
+        artifact = await store.load_artifact("transcript.pdf")
+        data = file_utils.get_artifact_bytes(artifact)
+        _, peak = tracemalloc.get_traced_memory()
+        return data, len(artifact.inline_data.data), peak
+    finally:
+        tracemalloc.stop()
+        await fetcher.aclose()
+
+
+def main(argv: Sequence[str]) -> None:
+    if len(argv) > 1:
+        raise app.UsageError("Too many command-line arguments.")
+    with open(FLAGS.pdf, "rb") as f:
+        pdf_bytes = f.read()
+
+    for name, legacy, streamed in (
+        ("base64 (legacy)", True, False),
+        ("raw, buffered", False, False),
+        ("raw, streamed", False, True),
+    ):
+        start = time.perf_counter()
+        data, size, peak = asyncio.run(
+            download_to_artifact(pdf_bytes, legacy, streamed)
+        )
+        elapsed = time.perf_counter() - start
+        assert data == pdf_bytes
+        del data
+        print(
+            f"{name:>15}: artifact {size / 1e6:.2f} MB, "
+            f"peak memory {peak / 1e6:.2f} MB, {elapsed * 1e3:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    app.run(main)
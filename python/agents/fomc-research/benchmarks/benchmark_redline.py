@@ -0,0 +1,101 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares the character-level and word-level HTML redline implementations.
+
+Usage (from the fomc-research directory, with two press conference
+transcripts downloaded locally):
+
+    python -m benchmarks.benchmark_redline \
+        --old_pdf=FOMCpresconf20250129.pdf --new_pdf=FOMCpresconf20250319.pdf
+"""
+
+import asyncio
+import time
+from collections.abc import Callable, Sequence
+
+import diff_match_patch as dmp
+from absl import app, flags
+
+from fomc_research.shared_libraries import file_utils
+
+FLAGS = flags.FLAGS
+flags.DEFINE_string("old_pdf", None, "Path to the older PDF.", required=True)
+flags.DEFINE_string("new_pdf", None, "Path to the newer PDF.", required=True)
+flags.DEFINE_float(
+    "timeout_secs",
+    file_utils.REDLINE_DIFF_TIMEOUT_SECS,
+    "Diff timeout for the bounded redline mode.",
+)
+
+
+def legacy_html_redline(text1: str, text2: str) -> str:
+    """The previous character-level create_html_redline implementation."""
+    d = dmp.diff_match_patch()
+    diffs = d.diff_main(text2, text1)
+    d.diff_cleanupSemantic(diffs)
+
+    html_output = ""
+    for op, text in diffs:
+        if op == -1:
+            html_output += (
+                f'<del style="background-color: #ffcccc;">{text}</del>'
+            )
+        elif op == 1:
+            html_output += (
+                f'<ins style="background-color: #ccffcc;">{text}</ins>'
+            )
+        else:
+            html_output += text
+    return html_output
+
+
+def measure(redline: Callable[[], str]) -> tuple[float, int]:
+    """Returns the elapsed seconds and output size of redline()."""
+    start = time.perf_counter()
+    html = redline()
+    return time.perf_counter() - start, len(html)
+
+
+def main(argv: Sequence[str]) -> None:
+    if len(argv) > 1:
+        raise app.UsageError("Too many command-line arguments.")
+    texts = []
+    for path in (FLAGS.new_pdf, FLAGS.old_pdf):
+        with open(path, "rb") as f:
+            texts.append(
+                asyncio.run(file_utils.extract_text_from_pdf_bytes(f.read()))
+            )
+    new_text, old_text = texts
+    print(f"old: {len(old_text)} chars, new: {len(new_text)} chars")
+
+    for name, redline in (
+        ("character-level (legacy)", lambda: legacy_html_redline(*texts)),
+        (
+            "word-level, unbounded",
+            lambda: file_utils.create_html_redline(*texts, timeout_secs=0),
+        ),
+        (
+            f"word-level, {FLAGS.timeout_secs}s timeout",
+            lambda: file_utils.create_html_redline(
+                *texts, timeout_secs=FLAGS.timeout_secs
+            ),
+        ),
+    ):
+        elapsed, size = measure(redline)
+        print(f"{name:>30}: {elapsed * 1e3:.1f} ms, {size / 1e3:.1f} KB HTML")
+
+
+if __name__ == "__main__":
+    app.run(main)
@@ -15,60 +15,53 @@
 """Callback functions for FOMC Research Agent."""
 
 import logging
-import time
+import os
 
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models import LlmRequest
 
+from . import rate_limiter
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 # Adjust these values to limit the rate at which the agent
-# queries the LLM API.
-RATE_LIMIT_SECS = 60
+# queries the LLM API. The quotas are shared by every session in the process,
+# and by every process on the host if RATE_LIMIT_DB_PATH is set.
 RPM_QUOTA = 1000
+TPM_QUOTA = 4_000_000
+RATE_LIMIT_DB_PATH = os.getenv("GOOGLE_GENAI_FOMC_AGENT_RATE_LIMIT_DB")
+
+limiter = rate_limiter.create_rate_limiter(
+    rpm=RPM_QUOTA, tpm=TPM_QUOTA, db_path=RATE_LIMIT_DB_PATH
+)
 
 
-def rate_limit_callback(
+async def rate_limit_callback(
     callback_context: CallbackContext, llm_request: LlmRequest
 ) -> None:
     # pylint: disable=unused-argument
     """Callback function that implements a query rate limit.
 
+    Waits (without blocking the event loop) until the model's request and
+    token budgets allow the request.
+
     Args:
       callback_context: A CallbackContext object representing the active
               callback context.
       llm_request: A LlmRequest object representing the active LLM request.
     """
-    now = time.time()
-    if "timer_start" not in callback_context.state:
-        callback_context.state["timer_start"] = now
-        callback_context.state["request_count"] = 1
-        logger.debug(
-            "rate_limit_callback [timestamp: %i, req_count: 1, "
-            "elapsed_secs: 0]",
-            now,
-        )
-        return
-
-    request_count = callback_context.state["request_count"] + 1
-    elapsed_secs = now - callback_context.state["timer_start"]
+    model = llm_request.model or "default"
+    tokens = rate_limiter.estimate_tokens(llm_request)
+    wait_secs = await limiter.acquire(model, tokens)
+    metrics = limiter.metrics(model)
     logger.debug(
-        "rate_limit_callback [timestamp: %i, request_count: %i,"
-        " elapsed_secs: %i]",
-        now,
-        request_count,
-        elapsed_secs,
+        "rate_limit_callback [model: %s, est_tokens: %i, waited_secs: %.2f,"
+        " queue_depth: %i, mean_wait_secs: %.2f]",
+        model,
+        tokens,
+        wait_secs,
+        metrics.queue_depth,
+        metrics.mean_wait_secs,
     )
-
-    if request_count > RPM_QUOTA:
-        delay = RATE_LIMIT_SECS - elapsed_secs + 1
-        if delay > 0:
-            logger.debug("Sleeping for %i seconds", delay)
-            time.sleep(delay)
-        callback_context.state["timer_start"] = now
-        callback_context.state["request_count"] = 1
-    else:
-        callback_context.state["request_count"] = request_count
-
     return
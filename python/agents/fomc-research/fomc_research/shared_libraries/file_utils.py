@@ -14,22 +14,97 @@
 
 """File-related utility functions for fed_research_agent."""
 
+import asyncio
 import base64
 import binascii
+import concurrent.futures
+import hashlib
 import io
 import logging
 import mimetypes
-from collections.abc import Sequence
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+from collections.abc import Iterator, Sequence
+from typing import Optional
 
 import diff_match_patch as dmp
+import httpx
 import pdfplumber
-import requests
 from absl import app
 from google.adk.tools import ToolContext
 from google.genai.types import Blob, Part
 
+from . import http_utils
+
 logger = logging.getLogger(__name__)
 
+PDF_TEXT_CACHE_DIR = os.path.expanduser(
+    os.getenv(
+        "GOOGLE_GENAI_FOMC_AGENT_PDF_TEXT_CACHE_DIR",
+        "~/.cache/fomc_research/pdf_text",
+    )
+)
+# Marks the mime type of binary artifacts that hold raw bytes. Artifacts saved
+# by older versions of this agent lack it, and hold base64-encoded bytes. The
+# mime type is the only field of a Part that every artifact service keeps.
+RAW_ARTIFACT_MIME_PARAMETER = "x-fomc-encoding=raw"
+PDF_MAX_WORKERS = min(8, os.cpu_count() or 1)
+PDF_MIN_PAGES_PER_WORKER = 4
+REDLINE_TOKEN_PATTERN = re.compile(r"\w+|\s+|[^\w\s]")
+# Replaced spans up to this size are refined to character-level diffs.
+REDLINE_MAX_REFINE_CHARS = 2000
+# Bounds the time spent in each diff, as the diff library does by default.
+REDLINE_DIFF_TIMEOUT_SECS = 1.0
+
+_pdf_executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+
+async def _save_fetch_result(
+    result: http_utils.FetchResult,
+    output_filename: str,
+    tool_context: ToolContext,
+) -> str:
+    """Stores a fetched file in an artifact and returns the artifact name."""
+    mime_type = (
+        result.content_type
+        or mimetypes.guess_type(result.url)[0]
+        or "application/octet-stream"
+    )
+    artifact = Part(
+        inline_data=Blob(
+            data=result.content,
+            mime_type=f"{mime_type}; {RAW_ARTIFACT_MIME_PARAMETER}",
+        )
+    )
+    await tool_context.save_artifact(filename=output_filename, artifact=artifact)
+    logger.info(
+        "Downloaded %s to artifact %s (cached: %s)",
+        result.url,
+        output_filename,
+        result.from_cache,
+    )
+    return output_filename
+
+
+def get_artifact_bytes(artifact: Part) -> bytes:
+    """Returns the raw bytes of a binary artifact.
+
+    Artifacts whose mime type lacks RAW_ARTIFACT_MIME_PARAMETER were saved by
+    older versions of this agent, and their base64-encoded bytes are decoded.
+    """
+    blob = artifact.inline_data
+    parameters = (blob.mime_type or "").split(";")[1:]
+    if RAW_ARTIFACT_MIME_PARAMETER in (p.strip() for p in parameters):
+        return blob.data
+    try:
+        return base64.b64decode(blob.data, validate=True)
+    except (binascii.Error, ValueError):
+        logger.warning("Artifact is neither marked as raw nor base64-encoded")
+        return blob.data
+
 
 async def download_file_from_url(
     url: str, output_filename: str, tool_context: ToolContext
@@ -46,64 +121,291 @@ async def download_file_from_url(
     """
     logger.info("Downloading %s to %s", url, output_filename)
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
+        result = await http_utils.get_fetcher().fetch(url)
+    except httpx.HTTPError as e:
+        logger.error("Error downloading file from URL: %s", e)
+        return ""
+    return await _save_fetch_result(result, output_filename, tool_context)
+
 
-        file_bytes = base64.b64encode(response.content)
-        mime_type = response.headers.get(
-            "Content-Type", mimetypes.guess_type(url)
+async def download_files_from_urls(
+    urls_and_filenames: Sequence[tuple[str, str]], tool_context: ToolContext
+) -> list[str]:
+    """Downloads files concurrently and stores each one in an artifact.
+
+    Args:
+      urls_and_filenames: (URL, artifact name) pairs to download.
+      tool_context: The tool context.
+
+    Returns:
+      The artifact names, in order, with "" for files that failed to download.
+    """
+    urls = [url for url, _ in urls_and_filenames]
+    logger.info("Downloading %s", urls)
+    results = await http_utils.get_fetcher().fetch_many(urls)
+    artifact_names = []
+    for result, (url, output_filename) in zip(results, urls_and_filenames):
+        if isinstance(result, BaseException):
+            logger.error("Error downloading file from URL %s: %s", url, result)
+            artifact_names.append("")
+            continue
+        artifact_names.append(
+            await _save_fetch_result(result, output_filename, tool_context)
         )
-        artifact = Part(inline_data=Blob(data=file_bytes, mime_type=mime_type))
-        await tool_context.save_artifact(filename=output_filename, artifact=artifact)
-        logger.info("Downloaded %s to artifact %s", url, output_filename)
-        return output_filename
+    return artifact_names
 
-    except requests.exceptions.RequestException as e:
-        logger.error("Error downloading file from URL: %s", e)
-        return ""
+
+def _extract_pages_text(pdf_path: str, start: int, stop: int) -> list[str]:
+    """Extracts the text of pages [start, stop) of a PDF file."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages[start:stop]]
+
+
+def _write_and_extract_small_pdf(
+    pdf_path: str, pdf_bytes: bytes, max_pages: int
+) -> tuple[int, Optional[list[str]]]:
+    """Writes a PDF file, and extracts its text if it has few enough pages.
+
+    Returns:
+      The number of pages, and the text of each page, or None if the PDF has
+      more than max_pages pages.
+    """
+    with open(pdf_path, "wb") as f:
+        f.write(pdf_bytes)
+    with pdfplumber.open(pdf_path) as pdf:
+        if len(pdf.pages) > max_pages:
+            return len(pdf.pages), None
+        return len(pdf.pages), [page.extract_text() or "" for page in pdf.pages]
+
+
+def _get_pdf_executor() -> concurrent.futures.ProcessPoolExecutor:
+    """Returns the process pool used for page-parallel PDF extraction."""
+    global _pdf_executor
+    if _pdf_executor is None:
+        # Forking the agent's process, with its threads and event loop, is not
+        # safe, so the workers start from a fresh interpreter instead.
+        start_method = (
+            "forkserver"
+            if "forkserver" in multiprocessing.get_all_start_methods()
+            else "spawn"
+        )
+        _pdf_executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=PDF_MAX_WORKERS,
+            mp_context=multiprocessing.get_context(start_method),
+        )
+    return _pdf_executor
+
+
+def _get_pdf_text_cache_path(digest: str) -> str:
+    return os.path.join(PDF_TEXT_CACHE_DIR, digest[:2], digest + ".txt")
+
+
+async def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
+    """Extracts the text of a PDF, cached by the SHA-256 of its bytes.
+
+    The PDF is parsed in a worker thread. Large PDFs are split into page
+    ranges that are extracted in parallel in a process pool, whose workers
+    read the PDF from a temporary file rather than receiving its bytes.
+    """
+    digest = hashlib.sha256(pdf_bytes).hexdigest()
+    cache_path = _get_pdf_text_cache_path(digest)
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            logger.info("PDF text cache hit for %s", digest)
+            return f.read()
+    except OSError:
+        pass
+
+    fd, pdf_path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    try:
+        # PDFs too small to split in two chunks are extracted in one go.
+        max_small_pages = (
+            2 * PDF_MIN_PAGES_PER_WORKER - 1
+            if PDF_MAX_WORKERS > 1
+            else sys.maxsize
+        )
+        num_pages, pages_text = await asyncio.to_thread(
+            _write_and_extract_small_pdf, pdf_path, pdf_bytes, max_small_pages
+        )
+        if pages_text is None:
+            num_chunks = min(
+                PDF_MAX_WORKERS, num_pages // PDF_MIN_PAGES_PER_WORKER
+            )
+            loop = asyncio.get_running_loop()
+            executor = _get_pdf_executor()
+            bounds = [num_pages * i // num_chunks for i in range(num_chunks + 1)]
+            chunks = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        executor, _extract_pages_text, pdf_path, start, stop
+                    )
+                    for start, stop in zip(bounds[:-1], bounds[1:])
+                )
+            )
+            pages_text = [text for chunk in chunks for text in chunk]
+    finally:
+        os.unlink(pdf_path)
+    pdf_text = "".join(pages_text)
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(pdf_text)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning("Could not cache PDF text for %s: %s", digest, e)
+    return pdf_text
 
 
 async def extract_text_from_pdf_artifact(
     pdf_path: str, tool_context: ToolContext
 ) -> str:
-    """Extracts text from a PDF file stored in an artifact"""
+    """Extracts text from a PDF file stored in an artifact.
+
+    The text is also stored in a "<pdf_path>.txt" artifact, and the state key
+    "pdf_text_digests" records which PDF content it was extracted from, so the
+    same PDF is never parsed twice in a session.
+    """
     try:
         pdf_artifact = await tool_context.load_artifact(pdf_path)
         if pdf_artifact and pdf_artifact.inline_data:
+            pdf_bytes = get_artifact_bytes(pdf_artifact)
+            digest = hashlib.sha256(pdf_bytes).hexdigest()
+            text_path = f"{pdf_path}.txt"
+            text_digests = tool_context.state.get("pdf_text_digests", {})
+            if text_digests.get(text_path) == digest:
+                text_artifact = await tool_context.load_artifact(text_path)
+                if text_artifact and text_artifact.text is not None:
+                    logger.info("Reusing text artifact %s", text_path)
+                    return text_artifact.text
+
             logger.info("Extracting text from PDF artifact %s", pdf_path)
-            with io.BytesIO(
-                base64.b64decode(pdf_artifact.inline_data.data)
-            ) as pdf_file_obj:
-                pdf_text = ""
-                with pdfplumber.open(pdf_file_obj) as pdf:
-                    for page in pdf.pages:
-                        pdf_text += page.extract_text()
+            pdf_text = await extract_text_from_pdf_bytes(pdf_bytes)
+            await tool_context.save_artifact(
+                filename=text_path, artifact=Part(text=pdf_text)
+            )
+            # Other PDFs may have been extracted concurrently, so the digests
+            # are read again rather than reusing the ones read above.
+            tool_context.state["pdf_text_digests"] = {
+                **tool_context.state.get("pdf_text_digests", {}),
+                text_path: digest,
+            }
             return pdf_text
     except ValueError as e:
         logger.error("Error loading PDF artifact: %s", e)
         return ""
 
 
-def create_html_redline(text1: str, text2: str) -> str:
-    """Creates an HTML redline doc of differences between text1 and text2."""
-    d = dmp.diff_match_patch()
-    diffs = d.diff_main(text2, text1)
-    d.diff_cleanupSemantic(diffs)
+def _tokenize(text: str) -> list[str]:
+    """Splits text into word, whitespace and punctuation tokens."""
+    return REDLINE_TOKEN_PATTERN.findall(text)
 
-    html_output = ""
+
+def _diff_tokens(
+    d: dmp.diff_match_patch, tokens1: list[str], tokens2: list[str]
+) -> list[tuple[int, str]]:
+    """Diffs two token lists, returning (op, text) chunks.
+
+    Each distinct token is mapped to a single character so that
+    diff_match_patch runs over tokens rather than characters. All whitespace
+    runs map to the same character, so that text reflowed across lines (as
+    happens when extracting text from PDFs) still matches; unchanged chunks
+    keep the whitespace of tokens2.
+    """
+    token_chars: dict[str, str] = {}
+
+    def encode(tokens: list[str]) -> str:
+        chars = []
+        for token in tokens:
+            if token.isspace():
+                token = " "
+            char = token_chars.get(token)
+            if char is None:
+                # Skip the surrogate range, which is not valid on its own.
+                code_point = len(token_chars) + 1
+                if code_point >= 0xD800:
+                    code_point += 0x800
+                char = chr(code_point)
+                token_chars[token] = char
+            chars.append(char)
+        return "".join(chars)
+
+    diffs = d.diff_main(encode(tokens1), encode(tokens2), False)
+    token_diffs = []
+    pos1 = pos2 = 0
     for op, text in diffs:
+        if op == dmp.diff_match_patch.DIFF_DELETE:
+            token_diffs.append((op, "".join(tokens1[pos1 : pos1 + len(text)])))
+            pos1 += len(text)
+        else:
+            token_diffs.append((op, "".join(tokens2[pos2 : pos2 + len(text)])))
+            pos2 += len(text)
+            if op == dmp.diff_match_patch.DIFF_EQUAL:
+                pos1 += len(text)
+    return token_diffs
+
+
+def _iter_redline_diffs(
+    d: dmp.diff_match_patch, old_text: str, new_text: str
+) -> Iterator[tuple[int, str]]:
+    """Yields word-level diffs, refined to characters inside changed spans."""
+    diffs = _diff_tokens(d, _tokenize(old_text), _tokenize(new_text))
+    i = 0
+    while i < len(diffs):
+        op, text = diffs[i]
+        if (
+            op == dmp.diff_match_patch.DIFF_DELETE
+            and i + 1 < len(diffs)
+            and diffs[i + 1][0] == dmp.diff_match_patch.DIFF_INSERT
+            and len(text) + len(diffs[i + 1][1]) <= REDLINE_MAX_REFINE_CHARS
+        ):
+            # A replaced span: show the character-level edits within it.
+            char_diffs = d.diff_main(text, diffs[i + 1][1], False)
+            d.diff_cleanupSemantic(char_diffs)
+            yield from char_diffs
+            i += 2
+            continue
+        yield op, text
+        i += 1
+
+
+def create_html_redline(
+    text1: str, text2: str, timeout_secs: float = REDLINE_DIFF_TIMEOUT_SECS
+) -> str:
+    """Creates an HTML redline doc of differences between text1 and text2.
+
+    The texts are diffed word by word first, and only replaced spans are
+    refined to character level, which keeps long documents fast.
+
+    Args:
+      text1: The new text.
+      text2: The old text.
+      timeout_secs: Bounds the time spent in each diff; once it runs out, the
+        remaining differences are reported at a coarser granularity. 0 leaves
+        the diffs unbounded.
+
+    Returns:
+      The HTML redline.
+    """
+    d = dmp.diff_match_patch()
+    d.Diff_Timeout = timeout_secs
+
+    html_output = io.StringIO()
+    for op, text in _iter_redline_diffs(d, text2, text1):
         if op == -1:  # Deletion
-            html_output += (
+            html_output.write(
                 f'<del style="background-color: #ffcccc;">{text}</del>'
             )
         elif op == 1:  # Insertion
-            html_output += (
+            html_output.write(
                 f'<ins style="background-color: #ccffcc;">{text}</ins>'
             )
         else:  # Unchanged
-            html_output += text
+            html_output.write(text)
 
-    return html_output
+    return html_output.getvalue()
 
 
 async def save_html_to_artifact(
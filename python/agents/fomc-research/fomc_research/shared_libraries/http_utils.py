@@ -0,0 +1,246 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Async HTTP fetch layer with connection pooling and an on-disk cache."""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import urllib.parse
+from collections.abc import AsyncIterator, Sequence
+from typing import Optional, Union
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+FED_HOSTNAME = os.getenv(
+    "GOOGLE_GENAI_FOMC_AGENT_FED_HOSTNAME", "https://www.federalreserve.gov"
+)
+# Hosts of the absolute links on the Fed website, which FED_HOSTNAME overrides.
+FED_NETLOCS = frozenset(("www.federalreserve.gov", "federalreserve.gov"))
+CACHE_DIR = os.path.expanduser(
+    os.getenv("GOOGLE_GENAI_FOMC_AGENT_HTTP_CACHE_DIR", "~/.cache/fomc_research/http")
+)
+# Published statements, minutes and transcripts never change, so cached copies
+# of these URLs are served without revalidating them with the server.
+IMMUTABLE_URL_PATTERN = re.compile(
+    r"(\.pdf$|/monetarypolicy/fomcminutes\d{8}\.htm$"
+    r"|/newsevents/pressreleases/monetary\d{8}a\.htm$)"
+)
+CHUNK_SIZE = 64 * 1024
+MAX_CONNECTIONS = 10
+TIMEOUT_SECS = 30
+USER_AGENT = "Mozilla/5.0"
+
+
+@dataclasses.dataclass
+class FetchResult:
+    """Result of fetching a URL."""
+
+    url: str
+    content: bytes
+    content_type: Optional[str]
+    from_cache: bool
+
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+
+class HttpCache:
+    """On-disk HTTP cache keyed by URL, storing bodies and validators."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + ".body", base + ".json"
+
+    def get(self, url: str) -> Optional[tuple[dict, bytes]]:
+        """Returns the cached metadata and body for the URL, if any."""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    async def put_stream(
+        self, url: str, meta: dict, chunks: AsyncIterator[bytes]
+    ) -> bytes:
+        """Streams the body for the URL to disk and returns it.
+
+        The body is written as it arrives and read back in one allocation, so
+        it is held in memory once rather than as chunks plus their join.
+        """
+        body_path, meta_path = self._paths(url)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(body_path))
+        try:
+            with os.fdopen(fd, "w+b") as f:
+                async for chunk in chunks:
+                    f.write(chunk)
+                f.seek(0)
+                body = f.read()
+            os.replace(tmp_path, body_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+        return body
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class HttpFetcher:
+    """Fetches URLs with a shared keep-alive connection pool and a disk cache.
+
+    Cached responses are revalidated with a conditional GET (ETag /
+    Last-Modified), except for URLs matching `immutable_url_pattern`, which
+    are served from the cache without any network round trip.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[HttpCache] = None,
+        immutable_url_pattern: Optional[re.Pattern] = IMMUTABLE_URL_PATTERN,
+        max_connections: int = MAX_CONNECTIONS,
+        timeout_secs: float = TIMEOUT_SECS,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.cache = cache
+        self.immutable_url_pattern = immutable_url_pattern
+        self._max_connections = max_connections
+        self._timeout_secs = timeout_secs
+        self._transport = transport
+        self._clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+    def _client(self) -> httpx.AsyncClient:
+        # httpx clients are bound to the event loop they were first used on.
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(
+                    max_connections=self._max_connections,
+                    max_keepalive_connections=self._max_connections,
+                ),
+                timeout=self._timeout_secs,
+                follow_redirects=True,
+                transport=self._transport,
+            )
+            self._clients[loop] = client
+        return client
+
+    def _is_immutable(self, url: str) -> bool:
+        return bool(
+            self.immutable_url_pattern
+            and self.immutable_url_pattern.search(urllib.parse.urlsplit(url).path)
+        )
+
+    async def fetch(self, url: str) -> FetchResult:
+        """Fetches the URL, raising httpx.HTTPError on failure."""
+        cached = self.cache.get(url) if self.cache else None
+        headers = {}
+        if cached:
+            meta, body = cached
+            if self._is_immutable(url):
+                logger.debug("Cache hit (immutable): %s", url)
+                return FetchResult(url, body, meta.get("content_type"), True)
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        logger.debug("Fetching %s", url)
+        async with self._client().stream("GET", url, headers=headers) as response:
+            if cached and response.status_code == 304:
+                logger.debug("Cache hit (not modified): %s", url)
+                meta, body = cached
+                return FetchResult(url, body, meta.get("content_type"), True)
+            response.raise_for_status()
+
+            content_type = response.headers.get("Content-Type")
+            if self.cache:
+                content = await self.cache.put_stream(
+                    url,
+                    {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                        "content_type": content_type,
+                    },
+                    response.aiter_bytes(CHUNK_SIZE),
+                )
+            else:
+                content = await response.aread()
+        return FetchResult(url, content, content_type, False)
+
+    async def fetch_many(
+        self, urls: Sequence[str]
+    ) -> list[Union[FetchResult, BaseException]]:
+        """Fetches the URLs concurrently, returning results or errors in order."""
+        return await asyncio.gather(
+            *(self.fetch(url) for url in urls), return_exceptions=True
+        )
+
+    async def aclose(self) -> None:
+        """Closes the connection pools."""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+_fetcher: Optional[HttpFetcher] = None
+
+
+def get_fetcher() -> HttpFetcher:
+    """Returns the process-wide HttpFetcher."""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = HttpFetcher(cache=HttpCache(CACHE_DIR))
+    return _fetcher
+
+
+def absolute_url(url: str) -> str:
+    """Resolves a (possibly relative) Fed website URL against FED_HOSTNAME.
+
+    Absolute links to the Fed website are redirected to FED_HOSTNAME too, so
+    that the links found on fetched pages follow the override.
+    """
+    parts = urllib.parse.urlsplit(urllib.parse.urljoin(FED_HOSTNAME, url))
+    if parts.netloc.lower() in FED_NETLOCS:
+        fed = urllib.parse.urlsplit(FED_HOSTNAME)
+        parts = parts._replace(scheme=fed.scheme, netloc=fed.netloc)
+    return urllib.parse.urlunsplit(parts)
@@ -0,0 +1,206 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local SQLite cache of the BigQuery timeseries_data table."""
+
+import csv
+import dataclasses
+import datetime
+import logging
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from google.cloud import bigquery
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime.date(1900, 1, 1)
+
+
+def last_complete_day() -> datetime.date:
+    """Returns the last day whose prices are final, i.e. yesterday."""
+    return datetime.date.today() - datetime.timedelta(days=1)
+
+
+@dataclasses.dataclass(frozen=True)
+class TimeseriesRow:
+    """A row of the timeseries_data table."""
+
+    timeseries_code: str
+    date: datetime.date
+    value: float
+
+
+class LocalBigQueryClient:
+    """Offline stand-in for bigquery.Client serving timeseries_data rows.
+
+    Only supports the queries issued by PriceCache: rows are filtered by the
+    "timeseries_codes", "dates" and "since" query parameters.
+    """
+
+    def __init__(self, rows: Iterable[TimeseriesRow]):
+        self.rows = list(rows)
+        self.num_queries = 0
+
+    @classmethod
+    def from_csv(cls, csv_filepath: str) -> "LocalBigQueryClient":
+        """Loads rows from a CSV file like deployment/sample_timeseries_data.csv."""
+        with open(csv_filepath, encoding="utf-8") as csvfile:
+            return cls(
+                TimeseriesRow(
+                    row["timeseries_code"],
+                    datetime.date.fromisoformat(row["date"]),
+                    float(row["value"]),
+                )
+                for row in csv.DictReader(csvfile)
+            )
+
+    def query(self, query: str, job_config: bigquery.QueryJobConfig) -> Any:
+        # pylint: disable=unused-argument
+        self.num_queries += 1
+        params = {p.name: p for p in job_config.query_parameters}
+        codes = set(params["timeseries_codes"].values)
+        dates = set(params["dates"].values) if "dates" in params else None
+        since = params["since"].value if "since" in params else None
+        rows = [
+            row
+            for row in self.rows
+            if row.timeseries_code in codes
+            and (dates is None or row.date in dates)
+            and (since is None or row.date > since)
+        ]
+        return _LocalQueryJob(rows)
+
+
+@dataclasses.dataclass
+class _LocalQueryJob:
+    rows: list[TimeseriesRow]
+
+    def result(self) -> list[TimeseriesRow]:
+        return self.rows
+
+
+class PriceCache:
+    """Incrementally refreshed local copy of the timeseries_data table.
+
+    Rows are stored in SQLite, keyed by (timeseries_code, date). A lookup only
+    queries BigQuery when a requested date is later than the day a timeseries
+    was last refreshed through, and then only fetches the rows after the
+    newest cached date. A timeseries is refreshed through the last complete
+    day, yesterday, so that the rows of the current day are fetched again once
+    it is over, and requests for later dates are treated as requests for it.
+    """
+
+    def __init__(self, db_path: str, client: Any, dataset_name: str):
+        self.client = client
+        self.dataset_name = dataset_name
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS timeseries_data ("
+                " timeseries_code TEXT NOT NULL,"
+                " date TEXT NOT NULL,"
+                " value REAL NOT NULL,"
+                " PRIMARY KEY (timeseries_code, date))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS refresh_state ("
+                " timeseries_code TEXT PRIMARY KEY,"
+                " refreshed_through TEXT NOT NULL)"
+            )
+
+    def _refreshed_through(self, code: str) -> datetime.date:
+        row = self._conn.execute(
+            "SELECT refreshed_through FROM refresh_state"
+            " WHERE timeseries_code = ?",
+            (code,),
+        ).fetchone()
+        return datetime.date.fromisoformat(row[0]) if row else EPOCH
+
+    def _latest_cached_date(self, code: str) -> datetime.date:
+        row = self._conn.execute(
+            "SELECT MAX(date) FROM timeseries_data WHERE timeseries_code = ?",
+            (code,),
+        ).fetchone()
+        return datetime.date.fromisoformat(row[0]) if row[0] else EPOCH
+
+    def refresh(self, timeseries_codes: Sequence[str]) -> None:
+        """Fetches the rows newer than the cached ones for each timeseries."""
+        since = min(self._latest_cached_date(code) for code in timeseries_codes)
+        logger.debug(
+            "PriceCache.refresh: codes: %s, since: %s", timeseries_codes, since
+        )
+        query = f"""
+SELECT DISTINCT timeseries_code, date, value
+FROM {self.dataset_name}.timeseries_data
+WHERE timeseries_code IN UNNEST(@timeseries_codes)
+  AND date > @since
+"""
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ArrayQueryParameter(
+                    "timeseries_codes", "STRING", list(timeseries_codes)
+                ),
+                bigquery.ScalarQueryParameter("since", "DATE", since),
+            ]
+        )
+        rows = [
+            (row.timeseries_code, row.date.isoformat(), row.value)
+            for row in self.client.query(query, job_config=job_config).result()
+        ]
+        refreshed_through = last_complete_day().isoformat()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO timeseries_data VALUES (?, ?, ?)", rows
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO refresh_state VALUES (?, ?)",
+                [(code, refreshed_through) for code in timeseries_codes],
+            )
+        logger.debug("PriceCache.refresh: cached %i new rows", len(rows))
+
+    def get_prices(
+        self,
+        timeseries_codes: Sequence[str],
+        dates: Sequence[datetime.date],
+    ) -> dict[str, dict[datetime.date, float]]:
+        """Returns {timeseries_code: {date: price}} for the requested dates."""
+        with self._lock:
+            # Future days can't have prices yet, so don't refresh for them.
+            latest = min(max(dates), last_complete_day())
+            stale = [
+                code
+                for code in timeseries_codes
+                if self._refreshed_through(code) < latest
+            ]
+            if stale:
+                self.refresh(stale)
+            code_marks = ",".join("?" * len(timeseries_codes))
+            date_marks = ",".join("?" * len(dates))
+            rows = self._conn.execute(
+                "SELECT timeseries_code, date, value FROM timeseries_data"
+                f" WHERE timeseries_code IN ({code_marks})"
+                f" AND date IN ({date_marks})",
+                [*timeseries_codes, *(d.isoformat() for d in dates)],
+            ).fetchall()
+        prices = {}
+        for code, date, value in rows:
+            prices.setdefault(code, {})[datetime.date.fromisoformat(date)] = value
+        return prices
@@ -15,15 +15,19 @@
 """Price-related utility functions for FOMC Research Agent."""
 
 import datetime
+import functools
 import logging
 import math
 import os
 from collections.abc import Sequence
+from typing import Any, Optional
 
+import numpy as np
 from absl import app
 from google.cloud import bigquery
 
-bqclient = bigquery.Client()
+from . import price_cache
+
 logger = logging.getLogger(__name__)
 
 MOVE_SIZE_BP = 25
@@ -31,56 +35,28 @@ DATASET_NAME = os.getenv("GOOGLE_CLOUD_BQ_DATASET", "fomc_research_agent")
 TIMESERIES_CODES = os.getenv(
     "GOOGLE_GENAI_FOMC_AGENT_TIMESERIES_CODES",
     "SFRH5,SFRZ5")
+PRICE_CACHE_PATH = os.path.expanduser(
+    os.getenv(
+        "GOOGLE_GENAI_FOMC_AGENT_PRICE_CACHE_PATH",
+        "~/.cache/fomc_research/prices.sqlite",
+    )
+)
+# If set, prices are read from this CSV file instead of BigQuery.
+LOCAL_TIMESERIES_CSV = os.getenv("GOOGLE_GENAI_FOMC_AGENT_LOCAL_TIMESERIES_CSV")
 
 
-def fetch_prices_from_bq(
-    timeseries_codes: list[str], dates: list[datetime.date]
-) -> dict[dict[datetime.date, float]]:
-    """Fetches prices from Bigquery.
-
-    Args:
-      timeseries_codes: List of timeseries codes to fetch.
-      dates: List of dates to fetch.
+@functools.cache
+def get_bq_client() -> Any:
+    """Returns the BigQuery client, or its local stand-in if configured."""
+    if LOCAL_TIMESERIES_CSV:
+        return price_cache.LocalBigQueryClient.from_csv(LOCAL_TIMESERIES_CSV)
+    return bigquery.Client()
 
-    Returns:
-      Dictionary of timeseries codes to dictionaries of dates to prices.
-    """
-
-    logger.debug("fetch_prices_from_bq: timeseries_codes: %s", timeseries_codes)
-    logger.debug("fetch_prices_from_bq: dates: %s", dates)
-
-    query = f"""
-SELECT DISTINCT timeseries_code, date, value
-FROM {DATASET_NAME}.timeseries_data
-WHERE timeseries_code IN UNNEST(@timeseries_codes)
-  AND date IN UNNEST(@dates)
-"""
-
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ArrayQueryParameter(
-                "timeseries_codes", "STRING", timeseries_codes
-            ),
-            bigquery.ArrayQueryParameter("dates", "DATE", dates),
-        ]
-    )
-
-    prices = {}
-    query_job = bqclient.query(query, job_config=job_config)
-    results = query_job.result()
-    for row in results:
-        logger.debug(
-            "code: %s, date: %s, value: %s",
-            row.timeseries_code,
-            row.date,
-            row.value,
-        )
-        if row.timeseries_code not in prices:
-            prices[row.timeseries_code] = {row.date: row.value}
-        else:
-            prices[row.timeseries_code][row.date] = row.value
 
-    return prices
+@functools.cache
+def get_price_cache() -> price_cache.PriceCache:
+    """Returns the process-wide local price cache."""
+    return price_cache.PriceCache(PRICE_CACHE_PATH, get_bq_client(), DATASET_NAME)
 
 
 def number_of_moves(
@@ -95,6 +71,8 @@ def number_of_moves(
     Returns:
       Number of moves.
 
+    Also works element-wise on NumPy arrays of prices.
+
     For calculation details see
     https://www.biancoresearch.com/bianco/samples/SR2v1.pdf
 
@@ -125,75 +103,144 @@ def fed_meeting_probabilities(nmoves: float) -> dict:
     return output
 
 
-def compute_probabilities(meeting_date_str: str) -> dict:
-    """Computes the probabilities of a rate move for a specific date.
+def fed_meeting_probabilities_many(nmoves: np.ndarray) -> list[dict]:
+    """Vectorized fed_meeting_probabilities over an array of move counts."""
+    abs_moves = np.abs(nmoves)
+    max_expected_move_bp = np.ceil(abs_moves).astype(int) * MOVE_SIZE_BP
+    move_odds = np.round(np.modf(abs_moves)[0], 2)
+    no_move_odds = np.round(1 - move_odds, 2)
+    move_texts = np.where(nmoves > 0, "hike", "cut")
+    move_texts = np.where(nmoves > 1, np.char.add(move_texts, "s"), move_texts)
+
+    return [
+        {
+            f"odds of {bp}bp {text}": float(odds),
+            f"odds of no {text}": float(no_odds),
+        }
+        for bp, text, odds, no_odds in zip(
+            max_expected_move_bp.tolist(),
+            move_texts.tolist(),
+            move_odds,
+            no_move_odds,
+        )
+    ]
+
+
+def _missing_prices_error(
+    prices: dict[str, dict[datetime.date, float]],
+    timeseries_codes: Sequence[str],
+    meeting_date: datetime.date,
+    day_before: datetime.date,
+    last_complete_day: datetime.date,
+) -> Optional[str]:
+    """Returns why the prices around a meeting are missing, if they are."""
+    if meeting_date > last_complete_day:
+        # Prices are only cached for complete days, and the odds after the
+        # meeting are computed from the prices of the meeting day.
+        return (
+            f"Prices for {meeting_date} are not available until the day is"
+            " over; the odds of a rate move can be computed from"
+            f" {meeting_date + datetime.timedelta(days=1)} on"
+        )
+    for code in timeseries_codes:
+        if code not in prices:
+            return f"No data for {code}"
+        if meeting_date not in prices[code]:
+            return f"No data for {code} on {meeting_date}"
+        if day_before not in prices[code]:
+            return f"No data for {code} on {day_before}"
+    return None
+
+
+def compute_probabilities_many(meeting_date_strs: Sequence[str]) -> dict:
+    """Computes the probabilities of a rate move for many meeting dates.
+
+    Prices for all meetings are looked up in the local price cache at once,
+    and the probabilities are computed over NumPy arrays.
 
     Args:
-      meeting_date_str: Date of the Fed meeting.
+      meeting_date_strs: Dates of the Fed meetings.
 
     Returns:
-      Dictionary of probabilities.
+      Dictionary of meeting date string to the compute_probabilities result.
     """
-    meeting_date = datetime.date.fromisoformat(meeting_date_str)
-    meeting_date_day_before = meeting_date - datetime.timedelta(days=1)
+    meeting_dates = [datetime.date.fromisoformat(d) for d in meeting_date_strs]
+    days_before = [d - datetime.timedelta(days=1) for d in meeting_dates]
     timeseries_codes = [x.strip() for x in TIMESERIES_CODES.split(",")]
 
-    prices = fetch_prices_from_bq(
-        timeseries_codes, [meeting_date, meeting_date_day_before]
+    prices = get_price_cache().get_prices(
+        timeseries_codes, sorted(set(meeting_dates + days_before))
     )
+    logger.debug("compute_probabilities_many: found prices: %s", prices)
+
+    results = {}
+    valid = []
+    last_complete_day = price_cache.last_complete_day()
+    for date_str, meeting_date, day_before in zip(
+        meeting_date_strs, meeting_dates, days_before
+    ):
+        error = _missing_prices_error(
+            prices, timeseries_codes, meeting_date, day_before, last_complete_day
+        )
+        if error:
+            results[date_str] = {"status": "ERROR", "message": error}
+        else:
+            valid.append((date_str, meeting_date, day_before))
 
-    error = None
-    for code in timeseries_codes:
-        if code not in prices:
-            error = f"No data for {code}"
-            break
-        elif meeting_date not in prices[code]:
-            error = f"No data for {code} on {meeting_date}"
-            break
-        elif meeting_date_day_before not in prices[code]:
-            error = f"No data for {code} on {meeting_date_day_before}"
-            break
-
-    logger.debug("compute_probabilities: found prices: %s", prices)
-
-    if error:
-        return {"status": "ERROR", "message": error}
-
-    near_code = timeseries_codes[0]
-    far_code = timeseries_codes[1]
+    if not valid:
+        return {date_str: results[date_str] for date_str in meeting_date_strs}
+
+    near_prices = prices[timeseries_codes[0]]
+    far_prices = prices[timeseries_codes[1]]
     num_moves_post = number_of_moves(
-        prices[near_code][meeting_date], prices[far_code][meeting_date]
+        np.array([near_prices[post] for _, post, _ in valid]),
+        np.array([far_prices[post] for _, post, _ in valid]),
     )
     num_moves_pre = number_of_moves(
-        prices[near_code][meeting_date_day_before],
-        prices[far_code][meeting_date_day_before],
+        np.array([near_prices[pre] for _, _, pre in valid]),
+        np.array([far_prices[pre] for _, _, pre in valid]),
     )
 
-    probs_pre = fed_meeting_probabilities(num_moves_pre)
-    probs_post = fed_meeting_probabilities(num_moves_post)
+    probs_pre = fed_meeting_probabilities_many(num_moves_pre)
+    probs_post = fed_meeting_probabilities_many(num_moves_post)
 
-    output = {
-        (
-            "Odds of a rate move within the next year ",
-            "(computed before Fed meeting):",
-        ): (probs_pre),
-        (
-            "Odds of a rate move within the next year ",
-            "(computed after Fed meeting)",
-        ): (probs_post),
-    }
+    for (date_str, _, _), pre, post in zip(valid, probs_pre, probs_post):
+        output = {
+            (
+                "Odds of a rate move within the next year ",
+                "(computed before Fed meeting):",
+            ): (pre),
+            (
+                "Odds of a rate move within the next year ",
+                "(computed after Fed meeting)",
+            ): (post),
+        }
+        results[date_str] = {"status": "OK", "output": output}
+
+    return {date_str: results[date_str] for date_str in meeting_date_strs}
 
-    return {"status": "OK", "output": output}
+
+def compute_probabilities(meeting_date_str: str) -> dict:
+    """Computes the probabilities of a rate move for a specific date.
+
+    Args:
+      meeting_date_str: Date of the Fed meeting.
+
+    Returns:
+      Dictionary of probabilities.
+    """
+    return compute_probabilities_many([meeting_date_str])[meeting_date_str]
 
 
 def main(argv: Sequence[str]) -> None:
-    if len(argv) > 2:
-        raise app.UsageError("Too many command-line arguments.")
+    if len(argv) < 2:
+        raise app.UsageError("Expected one or more meeting dates.")
 
-    meeting_date = argv[1]
-    print("meeting_date: ", meeting_date)
+    meeting_dates = argv[1:]
+    print("meeting_dates: ", meeting_dates)
 
-    print(compute_probabilities(meeting_date))
+    for meeting_date, result in compute_probabilities_many(meeting_dates).items():
+        print(meeting_date, result)
 
 
 if __name__ == "__main__":
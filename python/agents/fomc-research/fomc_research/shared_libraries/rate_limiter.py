@@ -0,0 +1,260 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide async token-bucket rate limiter for LLM requests.
+
+Each agent of this repository is packaged and deployed on its own, so this
+module is copied into the agents that use it (customer-service and
+fomc-research). The customer-service tests check that the copies are
+identical.
+"""
+
+import asyncio
+import dataclasses
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Protocol
+
+from google.adk.models import LlmRequest
+
+# Rough number of characters per token, used to estimate request sizes.
+CHARS_PER_TOKEN = 4
+
+
+class BucketBackend(Protocol):
+    """Stores token-bucket state and reserves tokens from it."""
+
+    # Whether `reserve` may block, e.g. on I/O or another process' lock, in
+    # which case it runs in a worker thread rather than on the event loop.
+    may_block: bool
+
+    def reserve(
+        self, key: str, amount: float, rate: float, capacity: float
+    ) -> float:
+        """Takes `amount` tokens from bucket `key`, possibly going into debt.
+
+        Args:
+          key: Name of the bucket.
+          amount: Number of tokens to take.
+          rate: Refill rate of the bucket, in tokens per second.
+          capacity: Maximum number of tokens in the bucket.
+
+        Returns:
+          The number of seconds the caller must wait before proceeding.
+        """
+
+
+def _refill_and_take(
+    tokens: float,
+    updated_at: float,
+    now: float,
+    amount: float,
+    rate: float,
+    capacity: float,
+) -> tuple[float, float]:
+    """Returns the bucket's new token count and the wait for `amount`."""
+    tokens = min(capacity, tokens + (now - updated_at) * rate) - amount
+    wait_secs = -tokens / rate if tokens < 0 else 0.0
+    return tokens, wait_secs
+
+
+class InMemoryBucketBackend:
+    """Bucket state shared by all sessions and event loops of this process."""
+
+    may_block = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def reserve(
+        self, key: str, amount: float, rate: float, capacity: float
+    ) -> float:
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens, wait_secs = _refill_and_take(
+                tokens, updated_at, now, amount, rate, capacity
+            )
+            self._buckets[key] = (tokens, now)
+        return wait_secs
+
+
+class SqliteBucketBackend:
+    """Bucket state shared by all processes on a host through SQLite."""
+
+    # Waiting for another process' write lock can take up to the timeout.
+    may_block = True
+
+    def __init__(self, db_path: str):
+        self._db_path = db_path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " key TEXT PRIMARY KEY,"
+                " tokens REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self._db_path, timeout=30, isolation_level=None
+            )
+            self._local.conn = conn
+        return conn
+
+    def reserve(
+        self, key: str, amount: float, rate: float, capacity: float
+    ) -> float:
+        conn = self._connect()
+        # Wall-clock time, since monotonic clocks differ between processes.
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated_at = row if row else (capacity, now)
+            tokens, wait_secs = _refill_and_take(
+                tokens, updated_at, now, amount, rate, capacity
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait_secs
+
+
+@dataclasses.dataclass
+class RateLimiterMetrics:
+    """Counters describing how requests were throttled."""
+
+    requests: int = 0
+    throttled_requests: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    total_wait_secs: float = 0.0
+    max_wait_secs: float = 0.0
+
+    @property
+    def mean_wait_secs(self) -> float:
+        return self.total_wait_secs / self.requests if self.requests else 0.0
+
+
+class RateLimiter:
+    """Token-bucket limiter enforcing per-model RPM and TPM budgets.
+
+    Each model gets one bucket refilled at `rpm / 60` requests per second and,
+    if `tpm` is set, one refilled at `tpm / 60` tokens per second. Callers
+    reserve from both buckets, in a worker thread if the backend may block,
+    and then `await asyncio.sleep()` for the resulting wait, so throttling
+    never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        rpm: float,
+        tpm: Optional[float] = None,
+        backend: Optional[BucketBackend] = None,
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.backend = backend or InMemoryBucketBackend()
+        self._metrics: dict[str, RateLimiterMetrics] = {}
+        self._metrics_lock = threading.Lock()
+
+    def _reserve(self, model: str, tokens: int) -> float:
+        wait_secs = self.backend.reserve(
+            f"{model}:requests", 1, self.rpm / 60, self.rpm
+        )
+        if self.tpm:
+            # A request larger than the whole budget can never fit; cap it.
+            wait_secs = max(
+                wait_secs,
+                self.backend.reserve(
+                    f"{model}:tokens",
+                    min(tokens, self.tpm),
+                    self.tpm / 60,
+                    self.tpm,
+                ),
+            )
+        return wait_secs
+
+    async def acquire(self, model: str, tokens: int = 0) -> float:
+        """Waits until a request of `tokens` tokens to `model` is allowed.
+
+        Returns:
+          The number of seconds waited.
+        """
+        if getattr(self.backend, "may_block", True):
+            wait_secs = await asyncio.to_thread(self._reserve, model, tokens)
+        else:
+            wait_secs = self._reserve(model, tokens)
+        with self._metrics_lock:
+            metrics = self._metrics.setdefault(model, RateLimiterMetrics())
+            metrics.requests += 1
+            metrics.total_wait_secs += wait_secs
+            metrics.max_wait_secs = max(metrics.max_wait_secs, wait_secs)
+            if wait_secs > 0:
+                metrics.throttled_requests += 1
+                metrics.queue_depth += 1
+                metrics.max_queue_depth = max(
+                    metrics.max_queue_depth, metrics.queue_depth
+                )
+        if wait_secs > 0:
+            try:
+                await asyncio.sleep(wait_secs)
+            finally:
+                with self._metrics_lock:
+                    metrics.queue_depth -= 1
+        return wait_secs
+
+    def metrics(self, model: str) -> RateLimiterMetrics:
+        """Returns a snapshot of the metrics for `model`."""
+        with self._metrics_lock:
+            return dataclasses.replace(
+                self._metrics.get(model, RateLimiterMetrics())
+            )
+
+
+def estimate_tokens(llm_request: LlmRequest) -> int:
+    """Roughly estimates the number of input tokens of an LLM request."""
+    num_chars = 0
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                num_chars += len(part.text)
+    if llm_request.config and llm_request.config.system_instruction:
+        num_chars += len(str(llm_request.config.system_instruction))
+    return num_chars // CHARS_PER_TOKEN + 1
+
+
+def create_rate_limiter(
+    rpm: float, tpm: Optional[float], db_path: Optional[str] = None
+) -> RateLimiter:
+    """Creates a limiter, shared across processes if `db_path` is set."""
+    backend = None
+    if db_path:
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        backend = SqliteBucketBackend(db_path)
+    return RateLimiter(rpm=rpm, tpm=tpm, backend=backend)
@@ -21,7 +21,7 @@ Follow these steps in order (be sure to tell the user what you're doing at each
 step, but without giving technical details):
 
 1) Call the fetch_page tool to retrieve this web page:
-   url = "https://www.federalreserve.gov/monetarypolicy/fomccalendars.htm"
+   url = "/monetarypolicy/fomccalendars.htm"
 
 2) Call the extract_page_data_agent Tool with this argument:
 "<DATA_TO_EXTRACT>
@@ -42,14 +42,9 @@ step, but without giving technical details):
   from the previous fed meeting.
 </DATA_TO_EXTRACT>"
 
-3) Call the fetch_page tool to retrieve the meeting web page. If the value
-of requested_meeting_url you find in the last step starts with
-"https://www.federalreserve.gov", just pass the value of "requested_meeting_url"
-to the fetch_page tool. If not, use the template below: take out
-"<requested_meeting_url>" and replace it with the value of
-"requested_meeting_url" you found in the last step.
-
-  url template = "https://www.federalreserve.gov/<requested_meeting_url>"
+3) Call the fetch_page tool to retrieve the meeting web page. Pass the value
+of "requested_meeting_url" you found in the last step to the fetch_page tool
+exactly as you found it, whether it is a full URL or a path on the Fed website.
 
 4) Call the extract_page_data_agent Tool again. This time pass it this argument:
 "<DATA_TO_EXTRACT>
@@ -14,12 +14,13 @@
 
 """'compare_statements' tool for FOMC Research sample agent."""
 
+import asyncio
 import logging
 
 from google.adk.tools import ToolContext
 from google.genai.types import Part
 
-from ..shared_libraries import file_utils
+from ..shared_libraries import file_utils, http_utils
 
 logger = logging.getLogger(__name__)
 
@@ -33,39 +34,29 @@ async def compare_statements_tool(tool_context: ToolContext) -> dict[str, str]:
     Returns:
       A dict with "status" and (optional) "error_message" keys.
     """
-    fed_hostname = "https://www.federalreserve.gov"
-
-    reqd_statement_url = tool_context.state[
-        "requested_meeting_statement_pdf_url"
-    ]
-    if not reqd_statement_url.startswith("https"):
-        reqd_statement_url = fed_hostname + reqd_statement_url
-    prev_statement_url = tool_context.state[
-        "previous_meeting_statement_pdf_url"
-    ]
-    if not prev_statement_url.startswith("https"):
-        prev_statement_url = fed_hostname + prev_statement_url
+    reqd_statement_url = http_utils.absolute_url(
+        tool_context.state["requested_meeting_statement_pdf_url"]
+    )
+    prev_statement_url = http_utils.absolute_url(
+        tool_context.state["previous_meeting_statement_pdf_url"]
+    )
 
     # Download PDFs from URLs to artifacts
-    reqd_pdf_path = await file_utils.download_file_from_url(
-        reqd_statement_url, "curr.pdf", tool_context
-    )
-    prev_pdf_path = await file_utils.download_file_from_url(
-        prev_statement_url, "prev.pdf", tool_context
+    reqd_pdf_path, prev_pdf_path = await file_utils.download_files_from_urls(
+        [(reqd_statement_url, "curr.pdf"), (prev_statement_url, "prev.pdf")],
+        tool_context,
     )
 
-    if reqd_pdf_path is None or prev_pdf_path is None:
+    if not reqd_pdf_path or not prev_pdf_path:
         logger.error("Failed to download files, aborting")
         return {
             "status": "error",
             "error_message": "Failed to download statement files",
         }
 
-    reqd_pdf_text = await file_utils.extract_text_from_pdf_artifact(
-        reqd_pdf_path, tool_context
-    )
-    prev_pdf_text = await file_utils.extract_text_from_pdf_artifact(
-        prev_pdf_path, tool_context
+    reqd_pdf_text, prev_pdf_text = await asyncio.gather(
+        file_utils.extract_text_from_pdf_artifact(reqd_pdf_path, tool_context),
+        file_utils.extract_text_from_pdf_artifact(prev_pdf_path, tool_context),
     )
 
     if reqd_pdf_text is None or prev_pdf_text is None:
@@ -84,7 +75,10 @@ async def compare_statements_tool(tool_context: ToolContext) -> dict[str, str]:
         artifact=Part(text=prev_pdf_text),
     )
 
-    redline_html = file_utils.create_html_redline(reqd_pdf_text, prev_pdf_text)
+    # Diffing is CPU-bound, so keep it off the event loop.
+    redline_html = await asyncio.to_thread(
+        file_utils.create_html_redline, reqd_pdf_text, prev_pdf_text
+    )
     await file_utils.save_html_to_artifact(
         redline_html, "statement_redline", tool_context
     )
@@ -15,14 +15,16 @@
 """'fetch_page' tool for FOMC Research sample agent"""
 
 import logging
-import urllib.request
 
+import httpx
 from google.adk.tools import ToolContext
 
+from ..shared_libraries import http_utils
+
 logger = logging.getLogger(__name__)
 
 
-def fetch_page_tool(url: str, tool_context: ToolContext) -> dict[str, str]:
+async def fetch_page_tool(url: str, tool_context: ToolContext) -> dict[str, str]:
     """Retrieves the content of 'url' and stores it in the ToolContext.
 
     Args:
@@ -32,15 +34,12 @@ def fetch_page_tool(url: str, tool_context: ToolContext) -> dict[str, str]:
     Returns:
       A dict with "status" and (optional) "error_message" keys.
     """
-    opener = urllib.request.build_opener()
-    opener.addheaders = [("User-Agent", "Mozilla/5.0")]
-    urllib.request.install_opener(opener)
     logger.debug("Fetching page: %s", url)
     try:
-        page = urllib.request.urlopen(url)
-        page_text = page.read().decode("utf-8")
-    except urllib.error.HTTPError as err:
-        errmsg = "Failed to fetch page %s: %s", url, err
+        result = await http_utils.get_fetcher().fetch(http_utils.absolute_url(url))
+        page_text = result.text()
+    except httpx.HTTPError as err:
+        errmsg = f"Failed to fetch page {url}: {err}"
         logger.error(errmsg)
         return {"status": "ERROR", "message": errmsg}
     tool_context.state.update({"page_contents": page_text})
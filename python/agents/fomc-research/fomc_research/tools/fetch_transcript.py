@@ -19,7 +19,7 @@ import logging
 from google.adk.tools import ToolContext
 from google.genai.types import Part
 
-from ..shared_libraries import file_utils
+from ..shared_libraries import file_utils, http_utils
 
 logger = logging.getLogger(__name__)
 
@@ -33,14 +33,11 @@ async def fetch_transcript_tool(tool_context: ToolContext) -> dict:
     Returns:
       A dict with "status" and (optional) "error_message" keys.
     """
-    fed_hostname = "https://www.federalreserve.gov"
-    transcript_url = tool_context.state["transcript_url"]
-    if not transcript_url.startswith("https"):
-        transcript_url = fed_hostname + transcript_url
+    transcript_url = http_utils.absolute_url(tool_context.state["transcript_url"])
     pdf_path = await file_utils.download_file_from_url(
         transcript_url, "transcript.pdf", tool_context
     )
-    if pdf_path is None:
+    if not pdf_path:
         logger.error("Failed to download PDF from URLs, aborting")
         return {
             "status": "error",
@@ -0,0 +1,115 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the PDF artifact helpers."""
+
+import asyncio
+import base64
+import hashlib
+
+from google.genai.types import Blob, Part
+
+from fomc_research.shared_libraries import file_utils, http_utils
+
+
+class FakeToolContext:
+    """A tool context keeping the state and artifacts in memory."""
+
+    def __init__(self):
+        self.state = {}
+        self.artifacts = {}
+
+    async def load_artifact(self, filename):
+        await asyncio.sleep(0)
+        return self.artifacts.get(filename)
+
+    async def save_artifact(self, filename, artifact):
+        await asyncio.sleep(0)
+        self.artifacts[filename] = artifact
+        return 0
+
+
+def test_raw_artifacts_are_returned_as_is():
+    # Valid base64, which must not be decoded as the artifact is marked raw.
+    data = b"abcd"
+    artifact = Part(
+        inline_data=Blob(
+            data=data,
+            mime_type=f"text/html; {file_utils.RAW_ARTIFACT_MIME_PARAMETER}",
+        )
+    )
+    assert file_utils.get_artifact_bytes(artifact) == data
+
+
+def test_legacy_artifacts_are_decoded():
+    artifact = Part(
+        inline_data=Blob(data=base64.b64encode(b"<html></html>"), mime_type="text/html")
+    )
+    assert file_utils.get_artifact_bytes(artifact) == b"<html></html>"
+
+
+def test_saved_artifacts_are_marked_raw():
+    tool_context = FakeToolContext()
+    result = http_utils.FetchResult(
+        url="https://www.federalreserve.gov/statement.pdf",
+        content=b"abcd",
+        content_type=None,
+        from_cache=False,
+    )
+    asyncio.run(
+        file_utils._save_fetch_result(  # pylint: disable=protected-access
+            result, "curr.pdf", tool_context
+        )
+    )
+    artifact = tool_context.artifacts["curr.pdf"]
+    assert artifact.inline_data.mime_type.startswith("application/pdf;")
+    assert file_utils.get_artifact_bytes(artifact) == b"abcd"
+
+
+def test_concurrent_extractions_record_every_digest(monkeypatch):
+    extracted = []
+
+    async def extract_text_from_pdf_bytes(pdf_bytes):
+        extracted.append(pdf_bytes)
+        # Lets the other extraction run while this one is in flight.
+        await asyncio.sleep(0.01 * len(extracted))
+        return pdf_bytes.decode("utf-8")
+
+    monkeypatch.setattr(
+        file_utils, "extract_text_from_pdf_bytes", extract_text_from_pdf_bytes
+    )
+    tool_context = FakeToolContext()
+    for name in ("curr.pdf", "prev.pdf"):
+        tool_context.artifacts[name] = Part(
+            inline_data=Blob(
+                data=f"%PDF-{name}".encode(),
+                mime_type=f"application/pdf; {file_utils.RAW_ARTIFACT_MIME_PARAMETER}",
+            )
+        )
+
+    async def extract_both():
+        return await asyncio.gather(
+            file_utils.extract_text_from_pdf_artifact("curr.pdf", tool_context),
+            file_utils.extract_text_from_pdf_artifact("prev.pdf", tool_context),
+        )
+
+    assert asyncio.run(extract_both()) == ["%PDF-curr.pdf", "%PDF-prev.pdf"]
+    assert tool_context.state["pdf_text_digests"] == {
+        "curr.pdf.txt": hashlib.sha256(b"%PDF-curr.pdf").hexdigest(),
+        "prev.pdf.txt": hashlib.sha256(b"%PDF-prev.pdf").hexdigest(),
+    }
+
+    # Both texts are reused from their artifacts on the next run.
+    assert asyncio.run(extract_both()) == ["%PDF-curr.pdf", "%PDF-prev.pdf"]
+    assert len(extracted) == 2
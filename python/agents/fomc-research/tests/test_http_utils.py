@@ -0,0 +1,136 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the HTTP fetcher, against a stub Fed website."""
+
+import asyncio
+import hashlib
+
+import httpx
+import pytest
+
+from fomc_research.shared_libraries import http_utils
+
+CALENDAR_URL = "https://www.federalreserve.gov/monetarypolicy/fomccalendars.htm"
+STATEMENT_URL = (
+    "https://www.federalreserve.gov/monetarypolicy/files/monetary20250129a1.pdf"
+)
+
+
+class StubFedWebsite:
+    """Serves a calendar page with an ETag, and an immutable statement PDF."""
+
+    def __init__(self):
+        self.requests: list[httpx.Request] = []
+        self.calendar = b"<html>calendar v1</html>"
+
+    @property
+    def etag(self) -> str:
+        return f'"{hashlib.sha256(self.calendar).hexdigest()}"'
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if str(request.url) == CALENDAR_URL:
+            if request.headers.get("If-None-Match") == self.etag:
+                return httpx.Response(304)
+            return httpx.Response(
+                200,
+                content=self.calendar,
+                headers={"ETag": self.etag, "Content-Type": "text/html"},
+            )
+        if str(request.url) == STATEMENT_URL:
+            return httpx.Response(
+                200,
+                content=b"%PDF-1.4 statement",
+                headers={"Content-Type": "application/pdf"},
+            )
+        return httpx.Response(404)
+
+
+@pytest.fixture
+def website():
+    return StubFedWebsite()
+
+
+@pytest.fixture
+def fetcher(tmp_path, website):
+    return http_utils.HttpFetcher(
+        cache=http_utils.HttpCache(str(tmp_path)),
+        transport=httpx.MockTransport(website.handle),
+    )
+
+
+def fetch(fetcher: http_utils.HttpFetcher, url: str) -> http_utils.FetchResult:
+    async def run():
+        try:
+            return await fetcher.fetch(url)
+        finally:
+            await fetcher.aclose()
+
+    return asyncio.run(run())
+
+
+def test_cached_pages_are_revalidated(fetcher, website):
+    first = fetch(fetcher, CALENDAR_URL)
+    assert first.text() == "<html>calendar v1</html>"
+    assert not first.from_cache
+    assert "If-None-Match" not in website.requests[0].headers
+
+    second = fetch(fetcher, CALENDAR_URL)
+    assert second.from_cache
+    assert second.content == first.content
+    assert second.content_type == "text/html"
+    assert website.requests[1].headers["If-None-Match"] == website.etag
+
+
+def test_modified_pages_are_fetched_again(fetcher, website):
+    fetch(fetcher, CALENDAR_URL)
+    website.calendar = b"<html>calendar v2</html>"
+    result = fetch(fetcher, CALENDAR_URL)
+    assert not result.from_cache
+    assert result.text() == "<html>calendar v2</html>"
+    assert fetch(fetcher, CALENDAR_URL).from_cache
+
+
+def test_immutable_pdfs_are_not_revalidated(fetcher, website):
+    first = fetch(fetcher, STATEMENT_URL)
+    second = fetch(fetcher, STATEMENT_URL)
+    assert second.from_cache
+    assert second.content == first.content == b"%PDF-1.4 statement"
+    assert len(website.requests) == 1
+
+
+def test_errors_are_raised_and_not_cached(fetcher, website):
+    url = "https://www.federalreserve.gov/missing.htm"
+    with pytest.raises(httpx.HTTPStatusError):
+        fetch(fetcher, url)
+    with pytest.raises(httpx.HTTPStatusError):
+        fetch(fetcher, url)
+    assert len(website.requests) == 2
+
+
+def test_absolute_url_follows_the_hostname_override(monkeypatch):
+    monkeypatch.setattr(http_utils, "FED_HOSTNAME", "http://localhost:8080")
+    assert (
+        http_utils.absolute_url("/monetarypolicy/fomccalendars.htm")
+        == "http://localhost:8080/monetarypolicy/fomccalendars.htm"
+    )
+    assert (
+        http_utils.absolute_url(STATEMENT_URL)
+        == "http://localhost:8080/monetarypolicy/files/monetary20250129a1.pdf"
+    )
+    assert (
+        http_utils.absolute_url("https://example.com/page.htm")
+        == "https://example.com/page.htm"
+    )
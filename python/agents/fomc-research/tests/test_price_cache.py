@@ -0,0 +1,134 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the local price cache, with the offline BigQuery stand-in."""
+
+import datetime
+
+import pytest
+
+from fomc_research.shared_libraries import price_cache, price_utils
+from fomc_research.shared_libraries.price_cache import (
+    LocalBigQueryClient,
+    PriceCache,
+    TimeseriesRow,
+)
+
+TODAY = datetime.date(2025, 2, 1)
+
+
+def date(day: int) -> datetime.date:
+    return datetime.date(2025, 1, day)
+
+
+def make_rows(days: range) -> list[TimeseriesRow]:
+    rows = []
+    for day in days:
+        rows.append(TimeseriesRow("SFRH5", date(day), 95.0 + day / 100))
+        rows.append(TimeseriesRow("SFRZ5", date(day), 96.0 - day / 100))
+    return rows
+
+
+@pytest.fixture(autouse=True)
+def today(monkeypatch):
+    monkeypatch.setattr(
+        price_cache, "last_complete_day", lambda: TODAY - datetime.timedelta(days=1)
+    )
+
+
+@pytest.fixture
+def client():
+    return LocalBigQueryClient(make_rows(range(1, 21)))
+
+
+@pytest.fixture
+def cache(tmp_path, client):
+    return PriceCache(str(tmp_path / "prices.sqlite"), client, "dataset")
+
+
+def test_get_prices_refreshes_once(cache, client):
+    prices = cache.get_prices(["SFRH5", "SFRZ5"], [date(2), date(3)])
+    assert prices == {
+        "SFRH5": {date(2): 95.02, date(3): 95.03},
+        "SFRZ5": {date(2): 95.98, date(3): 95.97},
+    }
+    assert client.num_queries == 1
+    cache.get_prices(["SFRH5", "SFRZ5"], [date(10), date(20)])
+    assert client.num_queries == 1
+
+
+def test_cache_persists_on_disk(tmp_path, cache, client):
+    cache.get_prices(["SFRH5"], [date(5)])
+    reopened = PriceCache(str(tmp_path / "prices.sqlite"), client, "dataset")
+    assert reopened.get_prices(["SFRH5"], [date(5)]) == {"SFRH5": {date(5): 95.05}}
+    assert client.num_queries == 1
+
+
+def test_new_rows_are_fetched_incrementally(monkeypatch, cache, client):
+    monkeypatch.setattr(price_cache, "last_complete_day", lambda: date(20))
+    cache.get_prices(["SFRH5"], [date(5)])
+    # Five days later, BigQuery has their rows.
+    client.rows += make_rows(range(21, 26))
+    monkeypatch.setattr(price_cache, "last_complete_day", lambda: date(26))
+    assert cache.get_prices(["SFRH5"], [date(25)]) == {"SFRH5": {date(25): 95.25}}
+    assert client.num_queries == 2
+    # Only the rows after the newest cached one were queried.
+    assert cache._conn.execute(  # pylint: disable=protected-access
+        "SELECT COUNT(*) FROM timeseries_data"
+    ).fetchone() == (25,)
+
+
+def test_future_dates_do_not_refresh_again(cache, client):
+    cache.get_prices(["SFRH5"], [date(5)])
+    cache.get_prices(["SFRH5"], [TODAY, TODAY + datetime.timedelta(days=30)])
+    assert client.num_queries == 1
+
+
+@pytest.fixture
+def prices(monkeypatch, cache):
+    monkeypatch.setattr(price_utils, "TIMESERIES_CODES", "SFRH5, SFRZ5")
+    monkeypatch.setattr(price_utils, "get_price_cache", lambda: cache)
+
+
+def test_compute_probabilities_many_matches_the_scalar_version(prices, client):
+    results = price_utils.compute_probabilities_many(
+        ["2025-01-10", "2025-01-15", "2025-01-20"]
+    )
+    assert client.num_queries == 1
+    for date_str, result in results.items():
+        assert result["status"] == "OK"
+        meeting_date = datetime.date.fromisoformat(date_str)
+        for day, probs in zip(
+            (meeting_date - datetime.timedelta(days=1), meeting_date),
+            result["output"].values(),
+        ):
+            nmoves = price_utils.number_of_moves(
+                95.0 + day.day / 100, 96.0 - day.day / 100
+            )
+            assert probs == price_utils.fed_meeting_probabilities(nmoves)
+
+
+def test_compute_probabilities_reports_missing_prices(prices):
+    assert price_utils.compute_probabilities("2025-01-01") == {
+        "status": "ERROR",
+        "message": "No data for SFRH5 on 2024-12-31",
+    }
+
+
+def test_compute_probabilities_for_a_meeting_today(prices, client):
+    result = price_utils.compute_probabilities(TODAY.isoformat())
+    assert result["status"] == "ERROR"
+    assert "not available until the day is over" in result["message"]
+    assert "2025-02-02" in result["message"]
+    assert client.num_queries == 1
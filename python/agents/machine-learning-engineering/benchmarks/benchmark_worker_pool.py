@@ -0,0 +1,62 @@
+"""Benchmarks the per-run startup overhead of MLE script execution.
+
+Compares a fresh `python` process per run (before) with children forked from
+the warm worker pool (after). Run from the `machine-learning-engineering`
+directory:
+
+    python benchmarks/benchmark_worker_pool.py --num_runs 20
+"""
+
+import argparse
+import statistics
+import tempfile
+
+from machine_learning_engineering.shared_libraries import code_util
+from machine_learning_engineering.shared_libraries import worker_pool
+
+
+def get_script() -> str:
+    """Gets a script that only imports the heavy ML libraries."""
+    lines = []
+    for name in worker_pool.PRELOAD_MODULES:
+        lines.append(f"try:\n    import {name}\nexcept ImportError:\n    pass")
+    lines.append("print('Final Validation Performance: 0.0')")
+    return "\n".join(lines) + "\n"
+
+
+def benchmark(num_runs: int, use_worker_pool: bool) -> list[float]:
+    """Returns the execution time of each run."""
+    execution_times = []
+    with tempfile.TemporaryDirectory() as run_cwd:
+        for _ in range(num_runs):
+            result_dict = code_util.run_python_code(
+                code_text=get_script(),
+                run_cwd=run_cwd,
+                py_filepath="startup.py",
+                exec_timeout=600,
+                use_worker_pool=use_worker_pool,
+            )
+            if result_dict["returncode"] != 0:
+                raise RuntimeError(result_dict["stderr"])
+            execution_times.append(result_dict["execution_time"])
+    return execution_times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num_runs", type=int, default=10)
+    args = parser.parse_args()
+    # The first pool run pays for starting the fork server; report it apart.
+    pool_warmup_time = benchmark(1, use_worker_pool=True)[0]
+    for name, use_worker_pool in (("fresh process", False), ("worker pool", True)):
+        times = benchmark(args.num_runs, use_worker_pool=use_worker_pool)
+        print(
+            f"{name:>13}: mean {statistics.mean(times):.3f}s, "
+            f"median {statistics.median(times):.3f}s, "
+            f"max {max(times):.3f}s over {args.num_runs} runs"
+        )
+    print(f"worker pool warm-up (one-off): {pool_warmup_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
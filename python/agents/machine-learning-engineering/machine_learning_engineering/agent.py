@@ -12,18 +12,22 @@ from machine_learning_engineering.sub_agents.refinement import agent as refineme
 from machine_learning_engineering.sub_agents.ensemble import agent as ensemble_agent_module
 from machine_learning_engineering.sub_agents.submission import agent as submission_agent_module
 
+from machine_learning_engineering.shared_libraries import artifact_util
+
 from machine_learning_engineering import prompt
 
 
 def save_state(
     callback_context: callback_context_module.CallbackContext
 ) -> Optional[types.Content]:
-    """Prints the current state of the callback context."""
-    workspace_dir = callback_context.state.get("workspace_dir", "")
-    task_name = callback_context.state.get("task_name", "")
-    run_cwd = os.path.join(workspace_dir, task_name)
+    """Saves the final state of the callback context."""
+    state = callback_context.state.to_dict()
+    run_cwd = artifact_util.get_task_dir(callback_context)
+    artifact_util.save_snapshot(
+        state, os.path.join(run_cwd, artifact_util.SNAPSHOT_FILENAME)
+    )
     with open(os.path.join(run_cwd, "final_state.json"), "w") as f:
-        json.dump(callback_context.state.to_dict(), f, indent=2)
+        json.dump(state, f, separators=(",", ":"))
     return None
 
 
@@ -0,0 +1,125 @@
+"""Artifact store and state snapshot utility functions."""
+
+from typing import Any
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+
+from google.adk.agents import callback_context as callback_context_module
+
+
+SNAPSHOT_MAGIC = b"MLESNAP1"
+SNAPSHOT_FILENAME = "checkpoint.bin"
+
+
+class ArtifactStore:
+    """Content-addressed store for large text blobs such as code and logs.
+
+    Blobs are zlib-compressed and stored under `objects/<aa>/<rest>` where
+    `<aa><rest>` is the SHA-256 digest of the text, so identical blobs are
+    written only once.
+    """
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+
+    def _get_path(self, digest: str) -> str:
+        return os.path.join(self.root_dir, "objects", digest[:2], digest[2:])
+
+    def put(self, text: str) -> str:
+        """Stores the text and returns its digest."""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._get_path(digest)
+        if not os.path.exists(path):
+            _atomic_write(path, zlib.compress(data))
+        return digest
+
+    def get(self, digest: str) -> str:
+        """Gets the text stored under the digest."""
+        with open(self._get_path(digest), "rb") as f:
+            return zlib.decompress(f.read()).decode("utf-8")
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    """Writes the data so that readers never observe a partial file."""
+    dir_name = os.path.dirname(path)
+    os.makedirs(dir_name, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def get_task_dir(
+    context: callback_context_module.ReadonlyContext,
+) -> str:
+    """Gets the workspace directory shared by all the parallel tasks."""
+    workspace_dir = context.state.get("workspace_dir", "")
+    task_name = context.state.get("task_name", "")
+    return os.path.join(workspace_dir, task_name)
+
+
+def get_artifact_store(
+    context: callback_context_module.ReadonlyContext,
+) -> ArtifactStore:
+    """Gets the artifact store of the current task."""
+    return ArtifactStore(os.path.join(get_task_dir(context), "artifacts"))
+
+
+def put_text(
+    context: callback_context_module.ReadonlyContext,
+    text: str,
+) -> str:
+    """Stores the text in the artifact store and returns its digest."""
+    return get_artifact_store(context).put(text)
+
+
+def get_text(
+    context: callback_context_module.ReadonlyContext,
+    digest: str,
+) -> str:
+    """Gets the text stored under the digest from the artifact store."""
+    if not digest:
+        return ""
+    return get_artifact_store(context).get(digest)
+
+
+def save_snapshot(state: dict[str, Any], filepath: str) -> None:
+    """Saves the state as a compact, compressed binary snapshot."""
+    payload = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    _atomic_write(filepath, SNAPSHOT_MAGIC + zlib.compress(payload))
+
+
+def load_snapshot(filepath: str) -> dict[str, Any]:
+    """Loads a state snapshot saved by `save_snapshot`."""
+    with open(filepath, "rb") as f:
+        data = f.read()
+    if not data.startswith(SNAPSHOT_MAGIC):
+        raise ValueError(f"Not a state snapshot: {filepath}.")
+    payload = zlib.decompress(data[len(SNAPSHOT_MAGIC):])
+    return json.loads(payload.decode("utf-8"))
+
+
+def get_snapshot_path(
+    context: callback_context_module.ReadonlyContext,
+) -> str:
+    """Gets the path of the state checkpoint of the current task."""
+    return os.path.join(get_task_dir(context), SNAPSHOT_FILENAME)
+
+
+def save_checkpoint(
+    callback_context: callback_context_module.CallbackContext,
+) -> None:
+    """Saves the current state as the checkpoint of the current task."""
+    save_snapshot(
+        callback_context.state.to_dict(),
+        get_snapshot_path(callback_context),
+    )
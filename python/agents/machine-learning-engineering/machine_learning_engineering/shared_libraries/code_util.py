@@ -1,12 +1,17 @@
 """Code related utility functions."""
 
-from typing import Any
+from typing import Any, Callable
 import subprocess
 import os
+import re
+import threading
 import time
 
 from google.adk.agents import callback_context as callback_context_module
 
+from machine_learning_engineering.shared_libraries import artifact_util
+from machine_learning_engineering.shared_libraries import worker_pool
+
 
 class Result:
     def __init__(self, returncode, stdout, stderr):
@@ -15,26 +20,194 @@ class Result:
         self.stderr = stderr
 
 
+_EPOCH_PATTERN = re.compile(r"\bepoch\b\s*[:=#]?\s*(\d+)", re.IGNORECASE)
+_VALIDATION_PATTERN = re.compile(
+    r"(?<!Final )Validation Performance\s*:\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+)
+_MAX_PROGRESS_EVENTS = 200
+_MEMORY_POLL_INTERVAL = 1.0
+
+
+def _read_peak_memory_mb(pid: int) -> float | None:
+    """Reads the peak resident memory of a process in MB (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def parse_progress_line(line: str) -> dict[str, Any] | None:
+    """Parses a progress event (epoch or intermediate metric) from a line."""
+    if "Final Validation Performance" in line:
+        return None
+    event = {}
+    epoch_match = _EPOCH_PATTERN.search(line)
+    if epoch_match:
+        event["epoch"] = int(epoch_match.group(1))
+    metric_match = _VALIDATION_PATTERN.search(line)
+    if metric_match:
+        try:
+            event["validation_score"] = float(metric_match.group(1))
+        except ValueError:
+            pass
+    return event or None
+
+
+def is_far_worse(
+    score: float,
+    best_score: float,
+    lower: bool,
+    tolerance: float,
+) -> bool:
+    """Checks if the score is worse than the best score beyond the tolerance."""
+    margin = tolerance * abs(best_score)
+    if lower:
+        return score > best_score + margin
+    return score < best_score - margin
+
+
 def run_python_code(
     code_text: str,
     run_cwd: str,
     py_filepath: str,
     exec_timeout: int,
+    best_score: float | None = None,
+    lower: bool = True,
+    early_stop_tolerance: float | None = None,
+    early_stop_patience: int = 0,
+    progress_callback: Callable[[dict[str, Any]], None] | None = None,
+    use_worker_pool: bool = False,
 ) -> dict[str, Any]:
+    """Runs the code, streaming its stdout and tracking training progress.
+
+    If `best_score`, `early_stop_tolerance` and `early_stop_patience` are
+    set, the run is killed once `early_stop_patience` consecutive
+    intermediate validation scores are far worse than `best_score`. Such a
+    run is flagged with `early_stopped`, and `early_stop_score` holds the
+    last intermediate validation score it reported.
+    If `use_worker_pool` is set, the code runs in a child forked from a warm
+    interpreter with the heavy ML libraries already imported.
+    """
     start_time = time.time()
     output_filepath = os.path.join(run_cwd, py_filepath)
     with open(output_filepath, "w", encoding="utf-8") as f:
         f.write(code_text)
+    early_stop_enabled = (
+        best_score is not None
+        and early_stop_tolerance is not None
+        and early_stop_patience > 0
+    )
+    stdout_lines = []
+    stderr_chunks = []
+    progress_events = []
+    peak_memory_mb = None
+    first_output_time = None
+    num_epochs = 0
+    num_bad_reports = 0
+    early_stopped = False
+    last_score = None
+    timed_out = False
+    pool = worker_pool.get_worker_pool() if use_worker_pool else None
     try:
-        result = subprocess.run(
-            ["python", py_filepath],
-            cwd=run_cwd,
-            capture_output=True,
-            text=True,
-            timeout=exec_timeout,
-        )
+        if pool is not None:
+            process = pool.popen(py_filepath=py_filepath, run_cwd=run_cwd)
+        else:
+            process = subprocess.Popen(
+                ["python", py_filepath],
+                cwd=run_cwd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+                env={**os.environ, "PYTHONUNBUFFERED": "1"},
+            )
     except Exception as e:
         result = Result(returncode=1, stdout="", stderr=str(e))
+    else:
+        finished = threading.Event()
+
+        def drain_stderr() -> None:
+            stderr_chunks.append(process.stderr.read())
+
+        def poll_memory() -> None:
+            nonlocal peak_memory_mb
+            while not finished.wait(_MEMORY_POLL_INTERVAL):
+                memory_mb = _read_peak_memory_mb(process.pid)
+                if memory_mb is not None:
+                    peak_memory_mb = max(peak_memory_mb or 0.0, memory_mb)
+
+        def kill_on_timeout() -> None:
+            nonlocal timed_out
+            if process.poll() is None:
+                timed_out = True
+                process.kill()
+
+        stderr_thread = threading.Thread(target=drain_stderr, daemon=True)
+        memory_thread = threading.Thread(target=poll_memory, daemon=True)
+        timer = threading.Timer(exec_timeout, kill_on_timeout)
+        stderr_thread.start()
+        memory_thread.start()
+        timer.start()
+        try:
+            for line in process.stdout:
+                stdout_lines.append(line)
+                if first_output_time is None:
+                    first_output_time = time.time() - start_time
+                event = parse_progress_line(line)
+                if event is None:
+                    continue
+                event["elapsed_time"] = time.time() - start_time
+                memory_mb = _read_peak_memory_mb(process.pid)
+                if memory_mb is not None:
+                    peak_memory_mb = max(peak_memory_mb or 0.0, memory_mb)
+                    event["peak_memory_mb"] = memory_mb
+                if "epoch" in event:
+                    num_epochs = max(num_epochs, event["epoch"])
+                if len(progress_events) < _MAX_PROGRESS_EVENTS:
+                    progress_events.append(event)
+                if progress_callback is not None:
+                    progress_callback(event)
+                if early_stop_enabled and "validation_score" in event:
+                    last_score = event["validation_score"]
+                    if is_far_worse(
+                        score=event["validation_score"],
+                        best_score=best_score,
+                        lower=lower,
+                        tolerance=early_stop_tolerance,
+                    ):
+                        num_bad_reports += 1
+                    else:
+                        num_bad_reports = 0
+                    if num_bad_reports >= early_stop_patience:
+                        early_stopped = True
+                        process.kill()
+                        break
+            process.wait()
+        finally:
+            timer.cancel()
+            finished.set()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            stderr_thread.join()
+            memory_thread.join()
+            process.stdout.close()
+            process.stderr.close()
+        stderr = "".join(stderr_chunks)
+        if timed_out:
+            if stderr and not stderr.endswith("\n"):
+                stderr += "\n"
+            stderr += f"TimeoutExpired: the script exceeded {exec_timeout} seconds."
+        returncode = 1 if timed_out else process.returncode
+        result = Result(
+            returncode=returncode,
+            stdout="".join(stdout_lines),
+            stderr=stderr,
+        )
     end_time = time.time()
     execution_time = end_time - start_time
     result_dict = {
@@ -42,10 +215,29 @@ def run_python_code(
         "stdout": result.stdout,
         "stderr": result.stderr,
         "execution_time": execution_time,
+        "early_stopped": early_stopped,
+        "early_stop_score": last_score if early_stopped else None,
+        "progress_events": progress_events,
+        "run_metrics": {
+            "time_to_first_output": first_output_time,
+            "num_stdout_lines": len(stdout_lines),
+            "num_epochs": num_epochs,
+            "epochs_per_second": (
+                num_epochs / execution_time if execution_time > 0 else 0.0
+            ),
+            "peak_memory_mb": peak_memory_mb,
+        },
     }
     return result_dict
 
 
+def is_bug_free(result_dict: dict[str, Any]) -> bool:
+    """Checks if the code ran without errors, or was stopped early."""
+    return result_dict.get("returncode", 1) == 0 or result_dict.get(
+        "early_stopped", False
+    )
+
+
 def extract_performance_from_text(text: str) -> float | None:
     """Extracts the final validation performance score from the text."""
     lines = text.splitlines()
@@ -184,6 +376,28 @@ def get_run_code_condition(
     return False
 
 
+def get_branch_best_score(
+    callback_context: callback_context_module.CallbackContext,
+    agent_name: str,
+    task_id: str,
+) -> float | None:
+    """Gets the best score so far on the branch the code is improving on."""
+    lower = callback_context.state.get("lower", True)
+    if agent_name.startswith("merger"):
+        best_score = callback_context.state.get(f"best_score_{task_id}", None)
+    elif agent_name.startswith("plan_implement"):
+        step = callback_context.state.get(f"refine_step_{task_id}", 0)
+        prev_exec_result = callback_context.state.get(
+            f"train_code_exec_result_{step}_{task_id}", {}
+        )
+        best_score = prev_exec_result.get("score", None)
+    else:
+        best_score = None
+    if best_score is None or best_score == (1e9 if lower else 0):
+        return None
+    return best_score
+
+
 def evaluate_code(
     callback_context: callback_context_module.CallbackContext,
 ) -> None:
@@ -237,15 +451,30 @@ def evaluate_code(
             run_cwd=run_cwd,
             py_filepath=py_filepath,
             exec_timeout=exec_timeout,
+            best_score=get_branch_best_score(
+                callback_context=callback_context,
+                agent_name=agent_name,
+                task_id=task_id,
+            ),
+            lower=lower,
+            early_stop_tolerance=callback_context.state.get("early_stop_tolerance", None),
+            early_stop_patience=callback_context.state.get("early_stop_patience", 0),
+            use_worker_pool=callback_context.state.get("use_warm_worker_pool", False),
         )
         if agent_name.startswith("ablation"):
             if result_dict["returncode"] == 0:
                 ablation_result = result_dict.get("stdout", "None")
             else:
                 ablation_result = "None"
-            result_dict["ablation_result"] = ablation_result
+            result_dict["ablation_result_hash"] = artifact_util.put_text(
+                callback_context, ablation_result
+            )
         else:
-            if result_dict.get("returncode", 1) == 0:
+            if result_dict["early_stopped"]:
+                # The run was killed for being far worse than the branch's best
+                # score, so it is ranked by the last score it reported.
+                score = result_dict["early_stop_score"]
+            elif result_dict.get("returncode", 1) == 0:
                 try:
                     score = extract_performance_from_text(result_dict.get("stdout", ""))
                     score = float(score)
@@ -254,6 +483,11 @@ def evaluate_code(
             else:
                 score = 1e9 if lower else 0
             result_dict["score"] = score
+        # Keep only the digests of the (potentially huge) logs in the state.
+        for field in ("stdout", "stderr"):
+            result_dict[f"{field}_hash"] = artifact_util.put_text(
+                callback_context, result_dict.pop(field)
+            )
     else:
         result_dict = {}
     code_execution_result_state_key = get_code_execution_result_state_key(
@@ -261,4 +495,17 @@ def evaluate_code(
         suffix=suffix,
     )
     callback_context.state[code_execution_result_state_key] = result_dict
+    if result_dict:
+        artifact_util.save_checkpoint(callback_context)
     return None
+
+
+def get_result_text(
+    context: callback_context_module.ReadonlyContext,
+    result_dict: dict[str, Any],
+    field: str,
+) -> str:
+    """Gets a text field of the code execution result from the artifact store."""
+    if field in result_dict:
+        return result_dict[field]
+    return artifact_util.get_text(context, result_dict.get(f"{field}_hash", ""))
@@ -1,5 +1,6 @@
 """Configuration for Machine Learning Engineering Agent."""
 
+from typing import Optional
 import dataclasses
 import os
 
@@ -18,6 +19,8 @@ class DefaultConfig:
     start_time: float = 0.0  # Timestamp indicating the start time of the task. Typically represented in seconds since the epoch.
     seed: int = 42  # The random seed value used to ensure reproducibility of experiments.
     exec_timeout: int = 600  # The maximum time in seconds allowed to complete the task.
+    early_stop_tolerance: Optional[float] = None  # Opt-in: relative margin by which an intermediate validation score must be worse than the branch's best score to count against a run (None disables early stopping).
+    early_stop_patience: int = 3  # The number of consecutive far-worse intermediate validation scores after which a run is killed (0 disables early stopping).
     num_solutions: int = 2  # The number of different solutions to generate or attempt for the given task.
     num_model_candidates: int = 2  # The number of different model architectures or hyperparameter sets to consider as candidates.
     max_retry: int = 10  # The maximum number of times to retry a failed operation.
@@ -29,6 +32,8 @@ class DefaultConfig:
     num_top_plans: int = 2  # The number of highest-scoring plans or strategies to select or retain.
     use_data_leakage_checker: bool = False  # Enable (`True`) or disable (`False`) a check for data leakage in the machine learning pipeline.
     use_data_usage_checker: bool = False  # Enable (`True`) or disable (`False`) a check for how data is being used, potentially for compliance or best practices.
+    use_warm_worker_pool: bool = False  # Opt-in: run the scripts in children forked from a warm interpreter with the ML libraries preloaded, instead of a fresh `python` process.
+    resume_from_checkpoint: bool = False  # Resume from the last state checkpoint (`checkpoint.bin` in the task workspace) if it exists.
 
 
 CONFIG = DefaultConfig()
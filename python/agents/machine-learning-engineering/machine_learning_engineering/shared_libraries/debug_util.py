@@ -67,7 +67,7 @@ def skip_bug_summary(
         suffix=suffix,
     )
     result_dict = callback_context.state.get(code_execution_result_state_key, {})
-    if result_dict and result_dict.get("returncode", 1) == 0:
+    if result_dict and code_util.is_bug_free(result_dict):
         key_name = code_util.get_name_with_prefix_and_suffix(
             base_name="bug_summary",
             prefix=prefix,
@@ -90,7 +90,7 @@ def check_bug_existence(
         suffix=suffix,
     )
     result_dict = callback_context.state.get(code_execution_result_state_key, {})
-    if result_dict and result_dict.get("returncode", 1) == 0:
+    if result_dict and code_util.is_bug_free(result_dict):
         return llm_response_module.LlmResponse()
     return None
 
@@ -129,7 +129,7 @@ def get_bug_summary_agent_instruction(
         filename = "final_solution.py"
     else:
         raise ValueError(f"Unexpected agent name: {agent_name}.")
-    bug = result_dict.get("stderr", "")
+    bug = code_util.get_result_text(context, result_dict, "stderr")
     return debug_prompt.BUG_SUMMARY_INSTR.format(
         bug=bug,
         filename=filename,
@@ -15,6 +15,7 @@ from google.genai import types
 from google.adk.tools.google_search_tool import google_search
 
 from machine_learning_engineering.sub_agents.initialization import prompt
+from machine_learning_engineering.shared_libraries import artifact_util
 from machine_learning_engineering.shared_libraries import debug_util
 from machine_learning_engineering.shared_libraries import common_util
 from machine_learning_engineering.shared_libraries import config
@@ -144,27 +145,36 @@ def rank_candidate_solutions(
     for k in range(num_model_candidates):
         model_id = k + 1
         init_code = callback_context.state.get(f"init_code_{task_id}_{model_id}", "")
+        init_code_exec_result_key = f"init_code_exec_result_{task_id}_{model_id}"
         init_code_exec_result = callback_context.state.get(
-            f"init_code_exec_result_{task_id}_{model_id}", {}
+            init_code_exec_result_key, {}
         )
         if init_code_exec_result:
+            # Only the score, the code digest and the result key are kept in the state.
             performance_results.append(
-                (init_code_exec_result.get("score", 0.0), init_code, init_code_exec_result)
+                (
+                    init_code_exec_result.get("score", 0.0),
+                    artifact_util.put_text(callback_context, init_code),
+                    init_code_exec_result_key,
+                )
             )
     if callback_context.state.get("lower", True):
         performance_results.sort(key=lambda x: x[0])
     else:
         performance_results.sort(key=lambda x: x[0], reverse=True)
     best_score = performance_results[0][0]
-    base_solution = performance_results[0][1].replace("```python", "").replace("```", "")
+    best_code = artifact_util.get_text(callback_context, performance_results[0][1])
+    base_solution = best_code.replace("```python", "").replace("```", "")
     callback_context.state[f"performance_results_{task_id}"] = performance_results
     callback_context.state[f"best_score_{task_id}"] = best_score
     callback_context.state[f"base_solution_{task_id}"] = base_solution
     callback_context.state[f"best_idx_{task_id}"] = 0
     with open(f"{run_cwd}/train0_0.py", "w", encoding="utf-8") as f:
         f.write(base_solution)
-    callback_context.state[f"merger_code_{task_id}_0"] = performance_results[0][1]
-    callback_context.state[f"merger_code_exec_result_{task_id}_0"] = performance_results[0][2]
+    callback_context.state[f"merger_code_{task_id}_0"] = best_code
+    callback_context.state[f"merger_code_exec_result_{task_id}_0"] = callback_context.state.get(
+        performance_results[0][2], {}
+    )
     return None
 
 
@@ -231,6 +241,13 @@ def prepare_task(
     for key in config_dict:
         callback_context.state[key] = config_dict[key]
     callback_context.state["start_time"] = time.time()
+    snapshot_path = artifact_util.get_snapshot_path(callback_context)
+    if config.CONFIG.resume_from_checkpoint and os.path.exists(snapshot_path):
+        # Restored results make the finished steps skip themselves.
+        snapshot = artifact_util.load_snapshot(snapshot_path)
+        for key in snapshot:
+            callback_context.state[key] = snapshot[key]
+        callback_context.state["resumed_from_checkpoint"] = True
     # fix randomness
     common_util.set_random_seed(callback_context.state["seed"])
     task_name = callback_context.state.get("task_name", "")
@@ -252,7 +269,8 @@ def create_workspace(
     task_name = callback_context.state.get("task_name", "")
     task_id = callback_context.agent_name.split("_")[-1]
     run_cwd = os.path.join(workspace_dir, task_name, task_id)
-    if os.path.exists(run_cwd):
+    resumed = callback_context.state.get("resumed_from_checkpoint", False)
+    if os.path.exists(run_cwd) and not resumed:
       shutil.rmtree(run_cwd)
     # make required directories
     os.makedirs(os.path.join(workspace_dir, task_name, task_id), exist_ok=True)
@@ -265,6 +283,7 @@ def create_workspace(
             shutil.copytree(
                 os.path.join(data_dir, task_name, file),
                 os.path.join(workspace_dir, task_name, task_id, "input", file),
+                dirs_exist_ok=True,
             )
         else:
             if "answer" not in file:
@@ -313,9 +332,9 @@ def get_merger_agent_instruction(
     performance_results = context.state.get(f"performance_results_{task_id}", [])
     base_solution = context.state.get(f"base_solution_{task_id}", "")
     if reference_idx < len(performance_results):
-        reference_solution = performance_results[reference_idx][1].replace(
-            "```python", ""
-        ).replace("```", "")
+        reference_solution = artifact_util.get_text(
+            context, performance_results[reference_idx][1]
+        ).replace("```python", "").replace("```", "")
     else:
         reference_solution = ""
     return prompt.CODE_INTEGRATION_INSTR.format(
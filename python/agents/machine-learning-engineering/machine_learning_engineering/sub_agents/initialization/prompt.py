@@ -51,6 +51,7 @@ MODEL_EVAL_INSTR = """# Introduction
 # Required
 - There should be no additional headings or text in your response.
 - Print out or return a final performance metric in your answer in a clear format with the exact words: 'Final Validation Performance: {{final_validation_score}}'.
+- If the model is trained iteratively, print 'Validation Performance: {{validation_score}}' after each epoch or boosting round so that training progress can be monitored.
 - The code should be a single-file Python program that is self-contained and can be executed as-is.
 - Your response should only contain a single code block.
 - Do not use exit() function in the Python code.
@@ -113,6 +114,7 @@ CODE_INTEGRATION_INSTR = """# Introduction
 # Required
 - There should be no additional headings or text in your response.
 - Print out or return a final performance metric in your answer in a clear format with the exact words: 'Final Validation Performance: {{final_validation_score}}'.
+- If the model is trained iteratively, print 'Validation Performance: {{validation_score}}' after each epoch or boosting round so that training progress can be monitored.
 - The code should be a single-file Python program that is self-contained and can be executed as-is.
 - Your response should only contain a single code block.
 - Do not use exit() function in the Python code.
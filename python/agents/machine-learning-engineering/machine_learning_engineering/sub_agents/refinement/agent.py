@@ -15,6 +15,7 @@ from machine_learning_engineering.sub_agents.refinement import prompt
 from machine_learning_engineering.shared_libraries import debug_util
 from machine_learning_engineering.shared_libraries import check_leakage_util
 from machine_learning_engineering.shared_libraries import common_util
+from machine_learning_engineering.shared_libraries import code_util
 from machine_learning_engineering.shared_libraries import config
 
 
@@ -146,7 +147,7 @@ def get_ablation_summary_agent_instruction(
     result_dict = context.state.get(f"ablation_code_exec_result_{step}_{task_id}", {})
     return prompt.SUMMARIZE_ABLATION_INSTR.format(
         code=code,
-        result=result_dict["ablation_result"],
+        result=code_util.get_result_text(context, result_dict, "ablation_result"),
     )
 
 
@@ -0,0 +1,50 @@
+"""Entry point of the scripts run by the warm worker pool.
+
+This module is deliberately outside of the `machine_learning_engineering`
+package: the fork server imports it, and importing anything in the package
+would also import the agent and ADK into every forked script.
+"""
+
+import os
+import runpy
+import sys
+import traceback
+
+from multiprocessing import connection as connection_module
+
+
+def run_script(
+    py_filepath: str,
+    run_cwd: str,
+    stdout_conn: connection_module.Connection,
+    stderr_conn: connection_module.Connection,
+) -> None:
+    """Runs the script in a forked child like `python <py_filepath>` would."""
+    os.dup2(stdout_conn.fileno(), 1)
+    os.dup2(stderr_conn.fileno(), 2)
+    stdout_conn.close()
+    stderr_conn.close()
+    sys.stdout = open(1, "w", encoding="utf-8", buffering=1, closefd=False)
+    sys.stderr = open(2, "w", encoding="utf-8", buffering=1, closefd=False)
+    os.chdir(run_cwd)
+    sys.argv = [py_filepath]
+    sys.path[0] = os.path.abspath(run_cwd)
+    exitcode = 0
+    try:
+        runpy.run_path(py_filepath, run_name="__main__")
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            exitcode = e.code
+        elif e.code is not None:
+            print(e.code, file=sys.stderr)
+            exitcode = 1
+    except BaseException:
+        traceback.print_exc()
+        exitcode = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    # Exits through multiprocessing, which joins the non-daemon threads and
+    # then calls `os._exit`. The atexit handlers are not run, as the child
+    # inherits those registered in the fork server too.
+    sys.exit(exitcode)
@@ -0,0 +1,95 @@
+"""Test cases for running the generated scripts."""
+
+import os
+import sys
+import textwrap
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from machine_learning_engineering.shared_libraries import code_util
+
+# Reports steadily improving scores, which start far worse than the final one.
+SCRIPT = textwrap.dedent(
+    """
+    import sys
+    import time
+
+    for epoch, score in enumerate([{scores}]):
+        print(f"Epoch {{epoch + 1}}: Validation Performance: {{score}}", flush=True)
+        time.sleep({delay})
+    print("Final Validation Performance: 1.0", flush=True)
+    """
+)
+
+
+def run(tmp_path, scores, delay=0.0, **kwargs):
+    code = SCRIPT.format(scores=", ".join(map(str, scores)), delay=delay)
+    return code_util.run_python_code(
+        code_text=code,
+        run_cwd=str(tmp_path),
+        py_filepath="train.py",
+        exec_timeout=60,
+        **kwargs,
+    )
+
+
+def test_progress_is_recorded(tmp_path):
+    result = run(tmp_path, [4.0, 2.0, 1.5])
+    assert result["returncode"] == 0
+    assert not result["early_stopped"]
+    assert result["early_stop_score"] is None
+    assert [event["validation_score"] for event in result["progress_events"]] == [
+        4.0,
+        2.0,
+        1.5,
+    ]
+    assert result["run_metrics"]["num_epochs"] == 3
+    assert code_util.extract_performance_from_text(result["stdout"]) == 1.0
+
+
+def test_early_stopping_is_disabled_by_default(tmp_path):
+    result = run(tmp_path, [9.0, 9.0, 9.0, 9.0], best_score=1.0, early_stop_patience=3)
+    assert result["returncode"] == 0
+    assert not result["early_stopped"]
+
+
+def test_far_worse_runs_are_stopped(tmp_path):
+    result = run(
+        tmp_path,
+        [9.0, 8.0, 7.0, 6.0] * 10,
+        delay=0.5,
+        best_score=1.0,
+        early_stop_tolerance=0.5,
+        early_stop_patience=3,
+    )
+    assert result["early_stopped"]
+    assert result["early_stop_score"] == 7.0
+    # The run was killed, and is not reported as a successful one.
+    assert result["returncode"] != 0
+    assert "Final Validation Performance" not in result["stdout"]
+    assert result["execution_time"] < 10
+    assert code_util.is_bug_free(result)
+
+
+def test_runs_close_to_the_best_score_are_not_stopped(tmp_path):
+    result = run(
+        tmp_path,
+        [1.4, 9.0, 9.0, 1.2, 9.0, 9.0, 1.0],
+        best_score=1.0,
+        early_stop_tolerance=0.5,
+        early_stop_patience=3,
+    )
+    assert result["returncode"] == 0
+    assert not result["early_stopped"]
+
+
+def test_failed_runs_are_not_bug_free(tmp_path):
+    result = code_util.run_python_code(
+        code_text="raise ValueError('boom')",
+        run_cwd=str(tmp_path),
+        py_filepath="train.py",
+        exec_timeout=60,
+    )
+    assert result["returncode"] == 1
+    assert "ValueError: boom" in result["stderr"]
+    assert not code_util.is_bug_free(result)
@@ -0,0 +1,78 @@
+"""Test cases for running the generated scripts in the warm worker pool."""
+
+import multiprocessing
+import os
+import sys
+import textwrap
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from machine_learning_engineering.shared_libraries import code_util
+from machine_learning_engineering.shared_libraries import worker_pool
+
+pytestmark = pytest.mark.skipif(
+    "forkserver" not in multiprocessing.get_all_start_methods(),
+    reason="The warm worker pool needs the forkserver start method.",
+)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    return worker_pool.WarmWorkerPool(preload_modules=())
+
+
+def test_popen_runs_the_script(tmp_path, pool):
+    script = textwrap.dedent(
+        """
+        import os
+        import sys
+
+        print("cwd:", os.getcwd())
+        print("oops", file=sys.stderr)
+        sys.exit(3)
+        """
+    )
+    (tmp_path / "train.py").write_text(script, encoding="utf-8")
+    process = pool.popen(py_filepath="train.py", run_cwd=str(tmp_path))
+    stdout = process.stdout.read()
+    stderr = process.stderr.read()
+    assert process.wait() == 3
+    assert process.returncode == 3
+    assert stdout == f"cwd: {tmp_path}\n"
+    assert stderr == "oops\n"
+
+
+def test_uncaught_exceptions_fail_the_script(tmp_path, pool):
+    (tmp_path / "train.py").write_text("raise ValueError('boom')", encoding="utf-8")
+    process = pool.popen(py_filepath="train.py", run_cwd=str(tmp_path))
+    assert "ValueError: boom" in process.stderr.read()
+    assert process.wait() == 1
+
+
+def test_run_python_code_in_the_pool(tmp_path):
+    result = code_util.run_python_code(
+        code_text="print('Final Validation Performance: 0.25')",
+        run_cwd=str(tmp_path),
+        py_filepath="train.py",
+        exec_timeout=60,
+        use_worker_pool=True,
+    )
+    assert result["returncode"] == 0
+    assert result["stdout"] == "Final Validation Performance: 0.25\n"
+    assert code_util.extract_performance_from_text(result["stdout"]) == 0.25
+
+
+def test_run_python_code_kills_the_script_on_timeout(tmp_path):
+    result = code_util.run_python_code(
+        code_text="import time\nprint('started', flush=True)\ntime.sleep(60)",
+        run_cwd=str(tmp_path),
+        py_filepath="train.py",
+        exec_timeout=1,
+        use_worker_pool=True,
+    )
+    assert result["returncode"] == 1
+    assert result["stdout"] == "started\n"
+    assert "TimeoutExpired" in result["stderr"]
+    assert result["execution_time"] < 30
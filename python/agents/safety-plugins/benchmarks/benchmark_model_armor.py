@@ -0,0 +1,124 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures Model Armor plugin callback latency under concurrent sessions.
+
+The plugin runs against a local fake of the Model Armor API, in two setups:
+"blocking" emulates the synchronous client (each call blocks the event loop
+and long responses are sent whole), and "async" is the plugin's default.
+Identical prompts are coalesced into one request in both setups.
+
+Usage (from the safety-plugins directory):
+
+    python -m benchmarks.benchmark_model_armor --sessions=200
+"""
+
+import asyncio
+import statistics
+import time
+import types as pytypes
+from collections.abc import Sequence
+
+from absl import app, flags
+from google.adk.models import llm_response
+from google.genai import types
+
+from safety_plugins.fake_model_armor import FakeModelArmorClient
+from safety_plugins.plugins.model_armor import ModelArmorSafetyFilterPlugin
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer("sessions", 200, "Number of concurrent sessions.")
+flags.DEFINE_integer(
+    "distinct_prompts", 20, "Number of distinct user prompts sent."
+)
+flags.DEFINE_integer(
+    "response_chars", 50_000, "Length of each model response."
+)
+flags.DEFINE_float("latency_secs", 0.02, "Fake Model Armor base latency.")
+flags.DEFINE_float(
+    "latency_secs_per_char", 2e-6, "Fake Model Armor latency per character."
+)
+
+
+async def run_session(
+    session_id: int,
+    plugin: ModelArmorSafetyFilterPlugin,
+    latencies: list[float],
+) -> None:
+    prompt = f"Tell me about topic {session_id % FLAGS.distinct_prompts}."
+    response_text = f"Session {session_id}. " + "Lorem ipsum. " * (
+        FLAGS.response_chars // 13
+    )
+    invocation_context = pytypes.SimpleNamespace(
+        session=pytypes.SimpleNamespace(state={})
+    )
+
+    start = time.perf_counter()
+    await plugin.on_user_message_callback(
+        invocation_context=invocation_context,
+        user_message=types.Content(
+            role="user", parts=[types.Part.from_text(text=prompt)]
+        ),
+    )
+    latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await plugin.after_model_callback(
+        callback_context=None,
+        llm_response=llm_response.LlmResponse(
+            content=types.Content(
+                role="model", parts=[types.Part.from_text(text=response_text)]
+            )
+        ),
+    )
+    latencies.append(time.perf_counter() - start)
+
+
+async def run(blocking: bool) -> tuple[list[float], int, float]:
+    client = FakeModelArmorClient(
+        latency_secs=FLAGS.latency_secs,
+        latency_secs_per_char=FLAGS.latency_secs_per_char,
+        blocking=blocking,
+    )
+    plugin = ModelArmorSafetyFilterPlugin(
+        client=client,
+        # The synchronous plugin sent every text whole.
+        max_chunk_chars=FLAGS.response_chars if blocking else 10_000,
+    )
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_session(session_id, plugin, latencies)
+            for session_id in range(FLAGS.sessions)
+        )
+    )
+    return latencies, client.num_requests, time.perf_counter() - start
+
+
+def main(argv: Sequence[str]) -> None:
+    if len(argv) > 1:
+        raise app.UsageError("Too many command-line arguments.")
+    for name, blocking in (("blocking", True), ("async", False)):
+        latencies, num_requests, elapsed = asyncio.run(run(blocking))
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"{name:>8}: {num_requests} requests in {elapsed:.2f}s,"
+            f" callback p50={quantiles[49] * 1e3:.1f}ms"
+            f" p99={quantiles[98] * 1e3:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    app.run(main)
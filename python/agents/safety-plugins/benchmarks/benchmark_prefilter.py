@@ -0,0 +1,96 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Reports the accuracy and latency of the local pre-filter on a corpus.
+
+The corpus is a JSON lines file of {"text": ..., "content_type": ...,
+"unsafe": true/false} records, where the content type is a value of
+`ContentType`. Texts the pre-filter finds ambiguous would go to the expensive
+check, so precision and recall are reported for the texts it decides alone.
+
+Usage (from the safety-plugins directory):
+
+    python -m benchmarks.benchmark_prefilter
+"""
+
+import json
+import os
+import statistics
+import time
+from collections.abc import Sequence
+
+from absl import app, flags
+
+from safety_plugins.prefilter import ContentType, PreFilter, Verdict
+
+FLAGS = flags.FLAGS
+flags.DEFINE_string(
+    "corpus",
+    os.path.join(os.path.dirname(__file__), "prefilter_corpus.jsonl"),
+    "Path to the labeled corpus.",
+)
+flags.DEFINE_integer("repeats", 100, "Times to classify each text.")
+
+
+def main(argv: Sequence[str]) -> None:
+    if len(argv) > 1:
+        raise app.UsageError("Too many command-line arguments.")
+    with open(FLAGS.corpus, encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+
+    prefilter = PreFilter()
+    outcomes = {
+        (verdict, unsafe): 0 for verdict in Verdict for unsafe in (True, False)
+    }
+    latencies = []
+    for record in corpus:
+        start = time.perf_counter()
+        for _ in range(FLAGS.repeats):
+            result = prefilter.classify(
+                record["text"], ContentType(record["content_type"])
+            )
+        latencies.append((time.perf_counter() - start) / FLAGS.repeats)
+        outcomes[result.verdict, record["unsafe"]] += 1
+        if (result.verdict == Verdict.UNSAFE) != record["unsafe"] and (
+            result.verdict != Verdict.AMBIGUOUS
+        ):
+            print(f"Misclassified as {result.verdict.value}: {record['text']!r}")
+
+    true_unsafe = outcomes[Verdict.UNSAFE, True]
+    flagged = true_unsafe + outcomes[Verdict.UNSAFE, False]
+    num_unsafe = sum(record["unsafe"] for record in corpus)
+    passed = outcomes[Verdict.SAFE, False] + outcomes[Verdict.SAFE, True]
+    decided = flagged + passed
+    print(f"{len(corpus)} texts, {num_unsafe} unsafe")
+    print(
+        f"decided locally: {decided} ({decided / len(corpus):.0%}),"
+        f" escalated: {len(corpus) - decided}"
+    )
+    print(
+        f"unsafe verdicts: precision {true_unsafe / max(flagged, 1):.2f},"
+        f" recall {true_unsafe / max(num_unsafe, 1):.2f}"
+    )
+    print(
+        f"safe verdicts: {passed}, of which unsafe (missed):"
+        f" {outcomes[Verdict.SAFE, True]}"
+    )
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"latency per text: p50={quantiles[49] * 1e6:.1f}us"
+        f" p99={quantiles[98] * 1e6:.1f}us"
+    )
+
+
+if __name__ == "__main__":
+    app.run(main)
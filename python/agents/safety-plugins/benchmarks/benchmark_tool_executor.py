@@ -0,0 +1,141 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures safety plugin latency while CPU-bound tools run.
+
+Runs a batch of `fib_tool` calls while sessions keep sending model responses
+through the Model Armor plugin (against its local fake), and reports the
+latency of the plugin's callback. The tools run in one of three ways: "inline"
+on the event loop, in a "thread", or in a worker "process" through
+`ToolExecutor`. A last run shows a tool being killed by the timeout.
+
+Usage (from the safety-plugins directory):
+
+    python -m benchmarks.benchmark_tool_executor --tool_calls=8
+"""
+
+import asyncio
+import statistics
+import time
+from collections.abc import Sequence
+
+from absl import app, flags
+from google.adk.models import llm_response
+from google.genai import types
+
+from safety_plugins import tools
+from safety_plugins.fake_model_armor import FakeModelArmorClient
+from safety_plugins.plugins.model_armor import ModelArmorSafetyFilterPlugin
+from safety_plugins.tool_executor import ToolExecutor
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer("tool_calls", 8, "Number of fib_tool calls.")
+flags.DEFINE_integer("fib_n", 27, "Argument of each fib_tool call.")
+flags.DEFINE_integer("sessions", 20, "Number of sessions running checks.")
+flags.DEFINE_float("latency_secs", 0.02, "Fake Model Armor latency.")
+flags.DEFINE_integer("max_workers", 2, "Worker processes for the tools.")
+
+
+async def check_until(
+    session_id: int,
+    plugin: ModelArmorSafetyFilterPlugin,
+    done: asyncio.Event,
+    latencies: list[float],
+) -> None:
+    """Sends model responses through the plugin until the tools are done."""
+    turn = 0
+    while not done.is_set():
+        turn += 1
+        start = time.perf_counter()
+        await plugin.after_model_callback(
+            callback_context=None,
+            llm_response=llm_response.LlmResponse(
+                content=types.Content(
+                    role="model",
+                    parts=[
+                        types.Part.from_text(
+                            text=f"Session {session_id}, turn {turn}."
+                        )
+                    ],
+                )
+            ),
+        )
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(mode: str) -> tuple[list[float], float, str]:
+    plugin = ModelArmorSafetyFilterPlugin(
+        client=FakeModelArmorClient(latency_secs=FLAGS.latency_secs)
+    )
+    executor = ToolExecutor(max_workers=FLAGS.max_workers)
+    if mode == "inline":
+
+        async def fib_tool(n: int) -> str:
+            return tools.fib_tool(n)
+
+    elif mode == "thread":
+
+        async def fib_tool(n: int) -> str:
+            return await asyncio.to_thread(tools.fib_tool, n)
+
+    else:
+        await executor.start()
+        fib_tool = executor.offload(tools.fib_tool)
+
+    done = asyncio.Event()
+    latencies = []
+    checks = [
+        asyncio.create_task(check_until(session_id, plugin, done, latencies))
+        for session_id in range(FLAGS.sessions)
+    ]
+    # Let the checks warm up before the tools start.
+    await asyncio.sleep(0.1)
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(fib_tool(FLAGS.fib_n) for _ in range(FLAGS.tool_calls))
+    )
+    elapsed = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*checks)
+    executor.shutdown()
+    return latencies, elapsed, executor.report()
+
+
+async def run_with_timeout() -> str:
+    executor = ToolExecutor(timeout_secs=0.5)
+    # fib(40) takes far longer than the timeout.
+    result = await executor.offload(tools.fib_tool)(40)
+    executor.shutdown()
+    return f"{result}\n{executor.report()}"
+
+
+def main(argv: Sequence[str]) -> None:
+    if len(argv) > 1:
+        raise app.UsageError("Too many command-line arguments.")
+    for mode in ("inline", "thread", "process"):
+        latencies, elapsed, report = asyncio.run(run(mode))
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"{mode:>8}: tools took {elapsed:.2f}s, {len(latencies)} checks,"
+            f" callback p50={quantiles[49] * 1e3:.1f}ms"
+            f" p99={quantiles[98] * 1e3:.1f}ms"
+            f" max={max(latencies) * 1e3:.1f}ms"
+        )
+        if report:
+            print(f"          {report}")
+    print(f" timeout: {asyncio.run(run_with_timeout())}")
+
+
+if __name__ == "__main__":
+    app.run(main)
@@ -0,0 +1,85 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local fake of the Model Armor API for tests and benchmarks."""
+
+import asyncio
+import time
+
+from google.cloud import modelarmor_v1
+
+FilterMatchState = modelarmor_v1.FilterMatchState
+
+DEFAULT_BLOCKED_PHRASES = ("ignore all previous instructions", "undesired output")
+
+
+class FakeModelArmorClient:
+    """Stands in for `modelarmor_v1.ModelArmorAsyncClient`.
+
+    Flags texts containing any of `blocked_phrases` as a prompt injection, after
+    simulating a round trip of `latency_secs` plus `latency_secs_per_char` for
+    each character of the text. With `blocking=True`, the round trip blocks the
+    event loop, like the synchronous client does.
+    """
+
+    def __init__(
+        self,
+        latency_secs: float = 0.05,
+        latency_secs_per_char: float = 0.0,
+        blocked_phrases: tuple[str, ...] = DEFAULT_BLOCKED_PHRASES,
+        blocking: bool = False,
+    ):
+        self.latency_secs = latency_secs
+        self.latency_secs_per_char = latency_secs_per_char
+        self.blocked_phrases = tuple(phrase.lower() for phrase in blocked_phrases)
+        self.blocking = blocking
+        self.num_requests = 0
+
+    async def _sanitize(self, text: str) -> modelarmor_v1.SanitizationResult:
+        self.num_requests += 1
+        latency_secs = self.latency_secs + self.latency_secs_per_char * len(text)
+        if self.blocking:
+            time.sleep(latency_secs)
+        else:
+            await asyncio.sleep(latency_secs)
+        if not any(phrase in text.lower() for phrase in self.blocked_phrases):
+            return modelarmor_v1.SanitizationResult(
+                filter_match_state=FilterMatchState.NO_MATCH_FOUND
+            )
+        return modelarmor_v1.SanitizationResult(
+            filter_match_state=FilterMatchState.MATCH_FOUND,
+            filter_results={
+                "pi_and_jailbreak": modelarmor_v1.FilterResult(
+                    pi_and_jailbreak_filter_result=modelarmor_v1.PiAndJailbreakFilterResult(
+                        match_state=FilterMatchState.MATCH_FOUND
+                    )
+                )
+            },
+        )
+
+    async def sanitize_user_prompt(
+        self, request: modelarmor_v1.SanitizeUserPromptRequest
+    ) -> modelarmor_v1.SanitizeUserPromptResponse:
+        return modelarmor_v1.SanitizeUserPromptResponse(
+            sanitization_result=await self._sanitize(request.user_prompt_data.text)
+        )
+
+    async def sanitize_model_response(
+        self, request: modelarmor_v1.SanitizeModelResponseRequest
+    ) -> modelarmor_v1.SanitizeModelResponseResponse:
+        return modelarmor_v1.SanitizeModelResponseResponse(
+            sanitization_result=await self._sanitize(
+                request.model_response_data.text
+            )
+        )
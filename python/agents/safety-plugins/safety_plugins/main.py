@@ -20,12 +20,15 @@ from dotenv import load_dotenv
 from absl import app, flags
 from google.adk import runners
 from google.adk.agents import llm_agent
+from google.adk.agents import run_config
 from google.genai import types
 
 # Load environment variables before loading the plugins.
 load_dotenv()
 
 from .plugins import agent_as_a_judge, model_armor
+from . import prefilter
+from . import tool_executor
 from . import tools
 from . import prompts
 from . import util
@@ -35,24 +38,31 @@ Agent = llm_agent.LlmAgent
 LlmAsAJudge = agent_as_a_judge.LlmAsAJudge
 ModelArmorSafetyFilter = model_armor.ModelArmorSafetyFilterPlugin
 InMemoryRunner = runners.InMemoryRunner
+RunConfig = run_config.RunConfig
+StreamingMode = run_config.StreamingMode
+JudgeOn = agent_as_a_judge.JudgeOn
 
 
 USER_ID = "user"
 APP_NAME = "test_app_with_plugin"
 AGENT_MODEL = "gemini-2.5-flash"
 
+# Runs the CPU-bound tools in worker processes, so that they don't stall the
+# plugins' safety checks and other invocations sharing the event loop.
+executor = tool_executor.ToolExecutor()
+
 sub_agent = Agent(
     model=AGENT_MODEL,
     instruction=prompts.SUB_AGENT_SI,
     name="sub_agent",
-    tools=[tools.fib_tool, tools.io_bound_tool],
+    tools=executor.wrap_tools([tools.fib_tool, tools.io_bound_tool]),
 )
 
 root_agent = Agent(
     model=AGENT_MODEL,
     instruction=prompts.ROOT_AGENT_SI,
     name="main_agent",
-    tools=[tools.short_sum_tool, tools.long_sum_tool],
+    tools=executor.wrap_tools([tools.short_sum_tool, tools.long_sum_tool]),
     sub_agents=[sub_agent],
 )
 
@@ -64,19 +74,61 @@ flags.DEFINE_enum(
     ["llm_judge", "model_armor", "none"],
     "Specify the safety plugin to enable.",
 )
+flags.DEFINE_bool(
+    "speculative_screening",
+    False,
+    "Screen user messages while the model call runs instead of before it.",
+)
+flags.DEFINE_bool(
+    "local_prefilter",
+    False,
+    "Classify content locally first and only send ambiguous content to the"
+    " safety plugin's judge or Model Armor.",
+)
+flags.DEFINE_bool(
+    "stream_output",
+    False,
+    "Stream the model's responses, and check them in windows as they stream"
+    " in. With the llm_judge plugin, this also judges the model's output.",
+)
+flags.DEFINE_float(
+    "tool_timeout_secs",
+    300,
+    "Time after which a CPU-bound tool running in a worker process is killed.",
+)
 
 
 async def main():
     """Runs a multiturn conversation with the agent and the attached plugin."""
     # You can now access the flag's value via FLAGS.plugin.
     plugin_name = FLAGS.plugin
+    executor.timeout_secs = FLAGS.tool_timeout_secs
+    await executor.start()
 
+    local_prefilter = prefilter.PreFilter() if FLAGS.local_prefilter else None
     plugins = []
     if plugin_name == "llm_judge":
-        plugins.append(LlmAsAJudge())
+        plugins.append(
+            LlmAsAJudge(
+                judge_on=(
+                    {JudgeOn.USER_MESSAGE, JudgeOn.TOOL_OUTPUT, JudgeOn.MODEL_OUTPUT}
+                    if FLAGS.stream_output
+                    else {JudgeOn.USER_MESSAGE, JudgeOn.TOOL_OUTPUT}
+                ),
+                speculative_screening=FLAGS.speculative_screening,
+                local_prefilter=local_prefilter,
+                stream_model_output=FLAGS.stream_output,
+            )
+        )
         print("Using LlmAsAJudge plugin.")
     elif plugin_name == "model_armor":
-        plugins.append(ModelArmorSafetyFilter())
+        plugins.append(
+            ModelArmorSafetyFilter(
+                speculative_screening=FLAGS.speculative_screening,
+                local_prefilter=local_prefilter,
+                stream_model_output=FLAGS.stream_output,
+            )
+        )
         print("Using ModelArmorSafetyFilter plugin.")
     else:
         print("No plugin activated.")
@@ -101,11 +153,18 @@ async def main():
             runner,
             types.Content(role="user", parts=[types.Part.from_text(text=user_input)]),
             session_id=session.id,
+            run_config=RunConfig(
+                streaming_mode=(
+                    StreamingMode.SSE if FLAGS.stream_output else StreamingMode.NONE
+                )
+            ),
         )
         print(f"[{author}]: {message}")
 
         user_input = input(f"[{USER_ID}]: ")
 
+    print(f"CPU-bound tool metrics:\n{executor.report()}")
+
 
 if __name__ == "__main__":
     app.run(lambda _: asyncio.run(main()))
@@ -16,20 +16,26 @@
 
 import enum
 import logging
+import time
 from typing import Any, Callable
 
 from google.adk import runners
 from google.adk.agents import invocation_context
 from google.adk.agents import llm_agent
 from google.adk.events import event
+from google.adk.models import llm_request
 from google.adk.models import llm_response
 from google.adk.plugins import base_plugin
 from google.adk.tools import base_tool
 from google.adk.tools import tool_context
 from google.genai import types
 
+from .. import prefilter
 from .. import prompts
+from .. import speculative
+from .. import streaming
 from .. import util
+from .. import verdict_cache
 
 Event = event.Event
 InMemoryRunner = runners.InMemoryRunner
@@ -38,6 +44,7 @@ ToolContext = tool_context.ToolContext
 InvocationContext = invocation_context.InvocationContext
 LlmAgent = llm_agent.LlmAgent
 BasePlugin = base_plugin.BasePlugin
+LlmRequest = llm_request.LlmRequest
 LlmResponse = llm_response.LlmResponse
 BaseTool = base_tool.BaseTool
 
@@ -76,6 +83,13 @@ class LlmAsAJudge(BasePlugin):
         judge_agent: LlmAgent = default_jailbreak_safety_agent,
         analysis_parser: Callable[[str], bool] = default_safety_analysis_parser,
         judge_on: set[str] = set({JudgeOn.USER_MESSAGE, JudgeOn.TOOL_OUTPUT}),
+        cache_max_entries: int = 4096,
+        cache_ttl_secs: float = 600,
+        speculative_screening: bool = False,
+        local_prefilter: prefilter.PreFilter | None = None,
+        stream_model_output: bool = False,
+        stream_window_chars: int = 2000,
+        stream_overlap_chars: int = 200,
     ) -> None:
         """Initialize the plugin.
 
@@ -87,6 +101,20 @@ class LlmAsAJudge(BasePlugin):
           analysis_parser: A function to parse the judge's analysis and return a
             boolean indicating if the message is unsafe or not. True indicates
             unsafe, False indicates safe.
+          cache_max_entries: The maximum number of verdicts to cache.
+          cache_ttl_secs: How long a cached verdict stays valid, in seconds.
+          speculative_screening: If True, user messages are judged while the
+            model call runs instead of before it, and model responses are held
+            back until the verdict is in.
+          local_prefilter: If set, messages are first classified locally, and
+            only the ones it finds ambiguous are sent to the judge.
+          stream_model_output: If True, streamed model output is judged in
+            overlapping windows as partial responses arrive, and the stream
+            is cut off as soon as a window is unsafe. Requires 'model_output'
+            in `judge_on`.
+          stream_window_chars: The size of the windows of streamed output.
+          stream_overlap_chars: The number of characters shared by consecutive
+            windows.
         """
         super().__init__(name="judge_agent")
 
@@ -102,24 +130,98 @@ class LlmAsAJudge(BasePlugin):
         self._judge_on = judge_on
         self._analysis_parser = analysis_parser
 
-    async def _is_unsafe(self, message: str) -> bool:
+        self._verdict_cache = verdict_cache.VerdictCache(
+            max_entries=cache_max_entries, ttl_secs=cache_ttl_secs
+        )
+        self.metrics = verdict_cache.SafetyCheckMetrics()
+        # A failed judge run is judged by the analysis parser, which finds its
+        # error safe, so a failed speculative screening is safe too.
+        self._screening = (
+            speculative.SpeculativeScreening(fail_closed=False)
+            if speculative_screening
+            else None
+        )
+        self._prefilter = local_prefilter
+        self._streaming = (
+            streaming.StreamingChecks(
+                self._is_model_output_unsafe,
+                window_chars=stream_window_chars,
+                overlap_chars=stream_overlap_chars,
+            )
+            if stream_model_output
+            else None
+        )
+
+    async def _is_unsafe(
+        self, message: str, content_type: prefilter.ContentType
+    ) -> bool:
         """Runs the LLM as a judge on the given message."""
+        if self._prefilter:
+            result = self._prefilter.classify(message, content_type)
+            if result.verdict != prefilter.Verdict.AMBIGUOUS:
+                logging.debug(
+                    "[prefilter]: %s %s", result.verdict.value, result.reasons
+                )
+                return result.verdict == prefilter.Verdict.UNSAFE
+
+        key = verdict_cache.message_key(message)
+        is_unsafe = self._verdict_cache.get(key)
+        if is_unsafe is not None:
+            self.metrics.cache_hits += 1
+            return is_unsafe
+
+        start = time.perf_counter()
+        # Every message is judged in a fresh session, so that earlier messages
+        # don't sway the verdict, and the session is deleted right after so
+        # that the judge's sessions don't pile up in memory.
+        session = None
+        try:
+            session = await self._runner.session_service.create_session(
+                user_id=self._judge_user_id,
+                app_name=self._judge_app_name,
+            )
+            author, judge_analysis = await util.run_prompt(
+                user_id=self._judge_user_id,
+                app_name=self._judge_app_name,
+                runner=self._runner,
+                message=types.Content(
+                    role="user",
+                    parts=[
+                        types.Part.from_text(text=message),
+                    ],
+                ),
+                session_id=session.id,
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Report the failure like `util.run_prompt` does.
+            author, judge_analysis = "SYSTEM", str(e)
+        finally:
+            if session is not None:
+                await self._runner.session_service.delete_session(
+                    app_name=self._judge_app_name,
+                    user_id=self._judge_user_id,
+                    session_id=session.id,
+                )
+        self.metrics.record_check(time.perf_counter() - start)
 
-        author, judge_analysis = await util.run_prompt(
-            user_id=self._judge_user_id,
-            app_name=self._judge_app_name,
-            runner=self._runner,
-            message=types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_text(text=message),
-                ],
-            ),
-        )
         is_unsafe = self._analysis_parser(judge_analysis)
+        # Don't cache the outcome of failed judge runs.
+        if author != "SYSTEM":
+            self._verdict_cache.put(key, is_unsafe)
         logging.debug("[%s]: `%s` (is_unsafe: %s)", author, judge_analysis, is_unsafe)
+        logging.debug(
+            "Judge metrics: hit_rate=%.2f, mean_check_secs=%.3f",
+            self.metrics.hit_rate,
+            self.metrics.mean_check_secs,
+        )
         return is_unsafe
 
+    async def _is_model_output_unsafe(self, model_output: str) -> bool:
+        return await self._is_unsafe(
+            f"<model_output>\n{model_output}\n</model_output>",
+            prefilter.ContentType.MODEL_OUTPUT,
+        )
+
     async def on_user_message_callback(
         self,
         invocation_context: InvocationContext,
@@ -128,7 +230,14 @@ class LlmAsAJudge(BasePlugin):
         if JudgeOn.USER_MESSAGE not in self._judge_on:
             return None
         message = f"<user_message>\n{user_message.parts[0].text}\n</user_message>"
-        if await self._is_unsafe(message):
+        if self._screening:
+            self._screening.start(
+                invocation_context.invocation_id,
+                user_message.parts[0].text,
+                self._is_unsafe(message, prefilter.ContentType.USER_MESSAGE),
+            )
+            return None
+        if await self._is_unsafe(message, prefilter.ContentType.USER_MESSAGE):
             # Set the state to false if the user prompt is unsafe and return a
             # modified user prompt. This will be consumed by the before_run_callback
             # to halt the runner and end the invocation before the user prompt is
@@ -157,6 +266,36 @@ class LlmAsAJudge(BasePlugin):
                 ],
             )
 
+    async def before_model_callback(
+        self,
+        callback_context: CallbackContext,
+        llm_request: LlmRequest,
+    ) -> LlmResponse | None:
+        if not self._screening:
+            return None
+        self._screening.redact(
+            llm_request, callback_context.state, _USER_PROMPT_REMOVED_MESSAGE
+        )
+        # Skip the model call if the user message is already known to be unsafe.
+        if self._screening.peek(
+            callback_context.invocation_id, callback_context.state
+        ):
+            return LlmResponse(
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part.from_text(text=_USER_PROMPT_REMOVED_MESSAGE)],
+                )
+            )
+
+    async def after_run_callback(
+        self,
+        invocation_context: InvocationContext,
+    ) -> None:
+        if self._screening:
+            self._screening.finish(invocation_context.invocation_id)
+        if self._streaming:
+            await self._streaming.discard(invocation_context.invocation_id)
+
     async def before_tool_callback(
         self,
         tool: BaseTool,
@@ -166,7 +305,7 @@ class LlmAsAJudge(BasePlugin):
         if JudgeOn.BEFORE_TOOL_CALL not in self._judge_on:
             return None
         message = f"<tool_call>\nTool call: {tool.name}({str(tool_args)})\n</tool_call>"
-        if await self._is_unsafe(message):
+        if await self._is_unsafe(message, prefilter.ContentType.TOOL_CALL):
             return {"error": _UNSAFE_TOOL_INPUT_MESSAGE}
 
     async def after_tool_callback(
@@ -179,7 +318,7 @@ class LlmAsAJudge(BasePlugin):
         if JudgeOn.TOOL_OUTPUT not in self._judge_on:
             return None
         message = f"<tool_output>\n{str(result)}\n</tool_output>"
-        if await self._is_unsafe(message):
+        if await self._is_unsafe(message, prefilter.ContentType.TOOL_OUTPUT):
             return {"error": _UNSAFE_TOOL_OUTPUT_MESSAGE}
 
     async def after_model_callback(
@@ -187,21 +326,41 @@ class LlmAsAJudge(BasePlugin):
         callback_context: CallbackContext,
         llm_response: LlmResponse,
     ) -> LlmResponse | None:
+        # Hold the response back until the speculative screening is done.
+        if self._screening and await self._screening.verdict(
+            callback_context.invocation_id, callback_context.state
+        ):
+            return LlmResponse(
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part.from_text(text=_USER_PROMPT_REMOVED_MESSAGE)],
+                )
+            )
         if JudgeOn.MODEL_OUTPUT not in self._judge_on:
             return None
         llm_content = llm_response.content
-        if not llm_content or not llm_content.parts:
-            return None
-        # Support for multiple parts and different types of LLM responses
-        # (e.g. function calls etc.).
-        model_output = "\n".join(
-            [part.text or "" for part in llm_content.parts]
-        ).strip()
-        if not model_output:
-            return None
-        message = f"<model_output>\n{model_output}\n</model_output>"
-        if await self._is_unsafe(message):
-            return types.Content(
-                role="model",
-                parts=[types.Part.from_text(text=_MODEL_RESPONSE_REMOVED_MESSAGE)],
+        parts = (llm_content and llm_content.parts) or []
+        if self._streaming:
+            model_output = "".join(part.text or "" for part in parts)
+            if llm_response.partial:
+                if self._streaming.add(callback_context.invocation_id, model_output):
+                    # Cut the stream off; the final response is replaced below.
+                    return LlmResponse(content=types.Content(role="model", parts=[]))
+                return None
+            is_unsafe = await self._streaming.finish(
+                callback_context.invocation_id, model_output
+            )
+        else:
+            # Support for multiple parts and different types of LLM responses
+            # (e.g. function calls etc.).
+            model_output = "\n".join([part.text or "" for part in parts]).strip()
+            if not model_output:
+                return None
+            is_unsafe = await self._is_model_output_unsafe(model_output)
+        if is_unsafe:
+            return LlmResponse(
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part.from_text(text=_MODEL_RESPONSE_REMOVED_MESSAGE)],
+                )
             )
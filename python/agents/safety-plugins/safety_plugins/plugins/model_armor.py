@@ -17,7 +17,7 @@
 import asyncio
 import logging
 import os
-from typing import Any
+from typing import Any, Protocol
 
 from google.adk import runners
 from google.adk.agents import invocation_context
@@ -33,6 +33,9 @@ from google.genai import types
 from google.api_core.client_options import ClientOptions
 from google.cloud import modelarmor_v1
 
+from ..prefilter import ContentType, PreFilter, Verdict
+from ..speculative import SpeculativeScreening
+from ..streaming import StreamingChecks
 from ..util import parse_model_armor_response
 
 
@@ -55,6 +58,40 @@ _MODEL_RESPONSE_REMOVED_MESSAGE = (
     "A safety filter has removed the model's response as it was deemed unsafe."
 )
 
+SanitizeResponse = (
+    modelarmor_v1.SanitizeUserPromptResponse
+    | modelarmor_v1.SanitizeModelResponseResponse
+)
+
+
+class ModelArmorClient(Protocol):
+    """The subset of `modelarmor_v1.ModelArmorAsyncClient` used by the plugin."""
+
+    async def sanitize_user_prompt(
+        self, request: modelarmor_v1.SanitizeUserPromptRequest
+    ) -> modelarmor_v1.SanitizeUserPromptResponse: ...
+
+    async def sanitize_model_response(
+        self, request: modelarmor_v1.SanitizeModelResponseRequest
+    ) -> modelarmor_v1.SanitizeModelResponseResponse: ...
+
+
+def split_into_chunks(
+    text: str, max_chunk_chars: int, overlap_chars: int
+) -> list[str]:
+    """Splits the text into chunks that overlap by `overlap_chars`.
+
+    The overlap keeps content that straddles a chunk boundary whole in at
+    least one chunk, as long as it is shorter than the overlap.
+    """
+    if len(text) <= max_chunk_chars:
+        return [text]
+    step = max_chunk_chars - overlap_chars
+    return [
+        text[start : start + max_chunk_chars]
+        for start in range(0, len(text) - overlap_chars, step)
+    ]
+
 
 class ModelArmorSafetyFilterPlugin(BasePlugin):
     """Guardian plugin to run Model Armor on user prompts and model responses in ADK."""
@@ -64,20 +101,91 @@ class ModelArmorSafetyFilterPlugin(BasePlugin):
         project_id: str = os.environ.get("GOOGLE_CLOUD_PROJECT", ""),
         location_id: str = os.environ.get("GOOGLE_CLOUD_LOCATION", ""),
         template_id: str = os.environ.get("MODEL_ARMOR_TEMPLATE_ID", ""),
+        client: ModelArmorClient | None = None,
+        max_concurrent_requests: int = 16,
+        max_chunk_chars: int = 10_000,
+        chunk_overlap_chars: int = 200,
+        speculative_screening: bool = False,
+        local_prefilter: PreFilter | None = None,
+        stream_model_output: bool = False,
+        stream_window_chars: int = 2000,
+        stream_overlap_chars: int = 200,
     ) -> None:
-        """Initializes the ModelArmorPlugin."""
+        """Initializes the ModelArmorPlugin.
+
+        Args:
+          project_id: The project of the Model Armor template.
+          location_id: The location of the Model Armor template.
+          template_id: The ID of the Model Armor template.
+          client: The client to call Model Armor with. Defaults to a
+            `modelarmor_v1.ModelArmorAsyncClient` for the template's location.
+          max_concurrent_requests: The maximum number of requests to Model
+            Armor in flight at once.
+          max_chunk_chars: Texts longer than this are split into chunks that
+            are sanitized concurrently.
+          chunk_overlap_chars: The number of characters shared by consecutive
+            chunks.
+          speculative_screening: If True, user messages are sanitized while
+            the model call runs instead of before it, and model responses are
+            held back until the verdict is in.
+          local_prefilter: If set, texts are first classified locally, and
+            only the ones it finds ambiguous are sent to Model Armor.
+          stream_model_output: If True, streamed model responses are
+            sanitized in overlapping windows as partial responses arrive, and
+            the stream is cut off as soon as a window is unsafe.
+          stream_window_chars: The size of the windows of streamed responses.
+          stream_overlap_chars: The number of characters shared by consecutive
+            windows.
+        """
         super().__init__(name="ModelArmorPlugin")
         self._project_id = project_id
         self._location_id = location_id
         self._template_id = template_id
         self._model_armor_url = f"projects/{self._project_id}/locations/{self._location_id}/templates/{self._template_id}"
-        self._client = modelarmor_v1.ModelArmorClient(
-            client_options=ClientOptions(
-                api_endpoint=f"modelarmor.{self._location_id}.rep.googleapis.com"
-            ),
+        self._client = client
+        self._clients: dict[asyncio.AbstractEventLoop, ModelArmorClient] = {}
+        self._max_concurrent_requests = max_concurrent_requests
+        self._semaphores: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._max_chunk_chars = max_chunk_chars
+        self._chunk_overlap_chars = chunk_overlap_chars
+        # Requests in flight, keyed by (method, text), shared by identical texts.
+        self._in_flight: dict[tuple[str, str], asyncio.Future] = {}
+        # A failed Model Armor call fails the invocation, so a failed
+        # speculative screening holds the model's response back.
+        self._screening = (
+            SpeculativeScreening(fail_closed=True) if speculative_screening else None
+        )
+        self._prefilter = local_prefilter
+        self._streaming = (
+            StreamingChecks(
+                self._is_model_response_unsafe,
+                window_chars=stream_window_chars,
+                overlap_chars=stream_overlap_chars,
+            )
+            if stream_model_output
+            else None
         )
 
-    def _sanitize_user_prompt(
+    def _get_client(self) -> ModelArmorClient:
+        if self._client is not None:
+            return self._client
+        # Async gRPC channels are bound to the event loop they were created on.
+        loop = asyncio.get_running_loop()
+        if loop not in self._clients:
+            self._clients[loop] = modelarmor_v1.ModelArmorAsyncClient(
+                client_options=ClientOptions(
+                    api_endpoint=f"modelarmor.{self._location_id}.rep.googleapis.com"
+                ),
+            )
+        return self._clients[loop]
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self._max_concurrent_requests)
+        return self._semaphores[loop]
+
+    async def _sanitize_user_prompt(
         self, user_prompt: str
     ) -> modelarmor_v1.SanitizeUserPromptResponse:
         logging.info(f"Attempting to sanitize user message: {user_prompt}")
@@ -88,9 +196,10 @@ class ModelArmorSafetyFilterPlugin(BasePlugin):
             user_prompt_data=user_prompt_data,
         )
 
-        return self._client.sanitize_user_prompt(request=request)
+        async with self._get_semaphore():
+            return await self._get_client().sanitize_user_prompt(request=request)
 
-    def _sanitize_model_response(
+    async def _sanitize_model_response(
         self, model_response: str
     ) -> modelarmor_v1.SanitizeModelResponseResponse:
         logging.info(f"Attempting to sanitize model response: {model_response}")
@@ -101,30 +210,86 @@ class ModelArmorSafetyFilterPlugin(BasePlugin):
             model_response_data=model_response_data,
         )
 
-        return self._client.sanitize_model_response(request=request)
+        async with self._get_semaphore():
+            return await self._get_client().sanitize_model_response(
+                request=request
+            )
+
+    async def _sanitize(self, method: str, text: str) -> SanitizeResponse:
+        """Sanitizes the text, sharing one request among identical texts."""
+        key = (method, text)
+        if future := self._in_flight.get(key):
+            return await asyncio.shield(future)
 
-    def _get_model_armor_response(
-        self,
-        method: str,
-        text: str,
-    ) -> list[tuple[str, Any]]:
-        """Gets the Model Armor response for the given text and method."""
         if method == "sanitizeUserPrompt":
-            response = self._sanitize_user_prompt(text)
+            coro = self._sanitize_user_prompt(text)
         elif method == "sanitizeModelResponse":
-            response = self._sanitize_model_response(text)
+            coro = self._sanitize_model_response(text)
         else:
             raise ValueError(f"Unsupported method: {method}")
-        parsed_result = parse_model_armor_response(response)
-        return parsed_result
+        # Run the request as a task, so that it completes for the other
+        # waiters even if the caller that started it is cancelled.
+        task = asyncio.ensure_future(coro)
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _get_model_armor_response(
+        self,
+        method: str,
+        text: str,
+        content_type: ContentType,
+    ) -> list[tuple[str, Any]] | None:
+        """Gets the Model Armor response for the given text and method."""
+        if self._prefilter:
+            result = self._prefilter.classify(text, content_type)
+            if result.verdict == Verdict.SAFE:
+                return None
+            if result.verdict == Verdict.UNSAFE:
+                return [
+                    f"Known prompt injection: {reason}" for reason in result.reasons
+                ]
+        chunks = split_into_chunks(
+            text, self._max_chunk_chars, self._chunk_overlap_chars
+        )
+        responses = await asyncio.gather(
+            *(self._sanitize(method, chunk) for chunk in chunks)
+        )
+        detected_filters = []
+        for response in responses:
+            for detected_filter in parse_model_armor_response(response) or []:
+                if detected_filter not in detected_filters:
+                    detected_filters.append(detected_filter)
+        return detected_filters or None
+
+    async def _is_user_prompt_unsafe(self, user_prompt: str) -> bool:
+        return bool(
+            await self._get_model_armor_response(
+                "sanitizeUserPrompt", user_prompt, ContentType.USER_MESSAGE
+            )
+        )
+
+    async def _is_model_response_unsafe(self, model_response: str) -> bool:
+        return bool(
+            await self._get_model_armor_response(
+                "sanitizeModelResponse", model_response, ContentType.MODEL_OUTPUT
+            )
+        )
 
     async def on_user_message_callback(
         self,
         invocation_context: InvocationContext,
         user_message: types.Content,
     ) -> types.Content | None:
-        if response := self._get_model_armor_response(
-            "sanitizeUserPrompt", user_message.parts[0].text
+        if self._screening:
+            self._screening.start(
+                invocation_context.invocation_id,
+                user_message.parts[0].text,
+                self._is_user_prompt_unsafe(user_message.parts[0].text),
+            )
+            return None
+        if response := await self._get_model_armor_response(
+            "sanitizeUserPrompt", user_message.parts[0].text, ContentType.USER_MESSAGE
         ):
             # Set the state to false if the user prompt is unsafe and return a
             # modified user prompt. This will be consumed by the before_run_callback
@@ -161,22 +326,71 @@ class ModelArmorSafetyFilterPlugin(BasePlugin):
                 ],
             )
 
+    async def before_model_callback(
+        self,
+        callback_context: CallbackContext,
+        llm_request: LlmRequest,
+    ) -> LlmResponse | None:
+        if not self._screening:
+            return None
+        self._screening.redact(
+            llm_request, callback_context.state, _USER_PROMPT_REMOVED_MESSAGE
+        )
+        # Skip the model call if the user message is already known to be unsafe.
+        if self._screening.peek(
+            callback_context.invocation_id, callback_context.state
+        ):
+            return LlmResponse(
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part.from_text(text=_USER_PROMPT_REMOVED_MESSAGE)],
+                )
+            )
+
+    async def after_run_callback(
+        self,
+        invocation_context: InvocationContext,
+    ) -> None:
+        if self._screening:
+            self._screening.finish(invocation_context.invocation_id)
+        if self._streaming:
+            await self._streaming.discard(invocation_context.invocation_id)
+
     async def after_model_callback(
         self,
         callback_context: CallbackContext,
         llm_response: LlmResponse,
     ) -> LlmResponse | None:
+        # Hold the response back until the speculative screening is done.
+        if self._screening and await self._screening.verdict(
+            callback_context.invocation_id, callback_context.state
+        ):
+            return LlmResponse(
+                content=types.Content(
+                    role="model",
+                    parts=[types.Part.from_text(text=_USER_PROMPT_REMOVED_MESSAGE)],
+                )
+            )
         llm_content = llm_response.content
-        if not llm_content or not llm_content.parts:
-            return None
-        # Support for multiple parts and different types of LLM responses
-        # (e.g. function calls etc.).
-        model_output = "\n".join(
-            [part.text or "" for part in llm_content.parts]
-        ).strip()
-        if not model_output:
-            return None
-        if self._get_model_armor_response("sanitizeModelResponse", model_output):
+        parts = (llm_content and llm_content.parts) or []
+        if self._streaming:
+            model_output = "".join(part.text or "" for part in parts)
+            if llm_response.partial:
+                if self._streaming.add(callback_context.invocation_id, model_output):
+                    # Cut the stream off; the final response is replaced below.
+                    return LlmResponse(content=types.Content(role="model", parts=[]))
+                return None
+            is_unsafe = await self._streaming.finish(
+                callback_context.invocation_id, model_output
+            )
+        else:
+            # Support for multiple parts and different types of LLM responses
+            # (e.g. function calls etc.).
+            model_output = "\n".join([part.text or "" for part in parts]).strip()
+            if not model_output:
+                return None
+            is_unsafe = await self._is_model_response_unsafe(model_output)
+        if is_unsafe:
             return LlmResponse(
                 content=types.Content(
                     role="model",
@@ -195,8 +409,8 @@ class ModelArmorSafetyFilterPlugin(BasePlugin):
         tool_context: ToolContext,
         result: dict[str, Any],
     ) -> dict[str, Any] | None:
-        if response := self._get_model_armor_response(
-            "sanitizeUserPrompt", str(result)
+        if response := await self._get_model_armor_response(
+            "sanitizeUserPrompt", str(result), ContentType.TOOL_OUTPUT
         ):
             return {
                 "error": (
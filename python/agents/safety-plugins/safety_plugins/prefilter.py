@@ -0,0 +1,236 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local first-tier safety filter run before the LLM judge or Model Armor."""
+
+import ast
+import collections
+import dataclasses
+import enum
+import re
+from collections.abc import Iterable
+
+# Signatures of prompt injections, specific enough to be unsafe wherever they
+# appear: an instruction override chained to a new instruction, rather than
+# the bare phrase, which users also quote or ask about.
+DEFAULT_INJECTION_PHRASES = (
+    "ignore all previous instructions and",
+    "ignore all prior instructions and",
+    "disregard all previous instructions and",
+    "forget all previous instructions and",
+    "ignore your instructions and",
+    "disregard your instructions and",
+    "forget your instructions and",
+    "override your instructions and",
+    "developer mode enabled",
+    # The simulated injection emitted by `tools.fib_tool`.
+    "can cause undesired output",
+)
+
+# Phrases common in injections, but also in benign text, e.g. "what does
+# 'ignore previous instructions' mean?" or "can I park there without any
+# restrictions?": worth a closer look, but not unsafe by themselves.
+SUSPICIOUS_PHRASES = (
+    "ignore previous instructions",
+    "ignore all previous instructions",
+    "ignore the previous instructions",
+    "ignore all prior instructions",
+    "ignore the above instructions",
+    "disregard previous instructions",
+    "disregard all previous instructions",
+    "disregard your instructions",
+    "forget your instructions",
+    "forget all previous instructions",
+    "override your instructions",
+    "reveal your system prompt",
+    "print your system prompt",
+    "developer mode",
+    "do anything now",
+    "you are no longer bound",
+    "without any restrictions",
+    "jailbreak",
+)
+
+# Content worth a closer look, but not unsafe by itself.
+SUSPICIOUS_PATTERNS = {
+    "url": re.compile(r"\b(?:https?://|www\.)\S+", re.IGNORECASE),
+    "email": re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.-]+\b"),
+    "phone_number": re.compile(
+        r"(?<!\d)\+?\d{1,3}[\s.-]?\(?\d{3}\)?[\s.-]\d{3}[\s.-]\d{4}(?!\d)"
+    ),
+    "us_ssn": re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),
+    "credit_card": re.compile(r"\b(?:\d{4}[ -]){3}\d{4}\b|\b[3-6]\d{15}\b"),
+    # Zero-width and bidirectional control characters can hide instructions.
+    "hidden_characters": re.compile(
+        r"[\u200b-\u200f\u202a-\u202e\u2060-\u2064\ufeff]"
+    ),
+    # Long base64-like blobs can smuggle encoded instructions.
+    "encoded_blob": re.compile(r"[A-Za-z0-9+/]{80,}={0,2}"),
+}
+
+_WHITESPACE = re.compile(r"\s+")
+# The tags the plugins wrap judged messages in, e.g. <tool_output>.
+_MARKUP_TAG = re.compile(r"</?[a-z_]+>")
+_IDENTIFIER = re.compile(r"[A-Za-z_]\w{0,31}")
+
+
+class AhoCorasick:
+    """Finds all occurrences of a set of phrases in one pass over a text."""
+
+    def __init__(self, phrases: Iterable[str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[str]] = [[]]
+        for phrase in phrases:
+            state = 0
+            for char in phrase:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].append(phrase)
+
+        # Breadth-first, so that the failure links of shorter prefixes are set
+        # before the ones of longer prefixes that depend on them.
+        queue = collections.deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state].extend(
+                    self._output[self._fail[next_state]]
+                )
+
+    def find_all(self, text: str) -> list[str]:
+        """Returns the phrases found in the text, in order of their ends."""
+        matches = []
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            matches.extend(self._output[state])
+        return matches
+
+
+class Verdict(str, enum.Enum):
+    """Outcome of the local pre-filter."""
+
+    SAFE = "safe"
+    UNSAFE = "unsafe"
+    # Needs the expensive safety check.
+    AMBIGUOUS = "ambiguous"
+
+
+class ContentType(str, enum.Enum):
+    """What the classified text is."""
+
+    USER_MESSAGE = "user_message"
+    TOOL_CALL = "tool_call"
+    TOOL_OUTPUT = "tool_output"
+    MODEL_OUTPUT = "model_output"
+
+
+@dataclasses.dataclass
+class PreFilterResult:
+    verdict: Verdict
+    # The injection phrases, or suspicious phrases and patterns, that were found.
+    reasons: list[str] = dataclasses.field(default_factory=list)
+
+
+class PreFilter:
+    """Classifies text as obviously safe, obviously unsafe or ambiguous.
+
+    Text containing a known injection phrase is unsafe, and text containing a
+    suspicious phrase or pattern is ambiguous. Only structurally
+    trivial tool outputs are safe: numbers, booleans and None, or containers
+    of them keyed by identifiers, such as `{'result': 55}`. Any other text,
+    however short, is ambiguous and should go to the expensive check.
+    """
+
+    def __init__(
+        self,
+        injection_phrases: Iterable[str] = DEFAULT_INJECTION_PHRASES,
+        suspicious_phrases: Iterable[str] = SUSPICIOUS_PHRASES,
+        suspicious_patterns: dict[str, re.Pattern] = SUSPICIOUS_PATTERNS,
+    ):
+        self._injection_phrases = {
+            _normalize(phrase) for phrase in injection_phrases
+        }
+        # One automaton finds the phrases of both tiers in a single pass.
+        self._matcher = AhoCorasick(
+            self._injection_phrases
+            | {_normalize(phrase) for phrase in suspicious_phrases}
+        )
+        self._suspicious_patterns = suspicious_patterns
+        self.counts: collections.Counter[Verdict] = collections.Counter()
+
+    def classify(self, text: str, content_type: ContentType) -> PreFilterResult:
+        result = self._classify(text, content_type)
+        self.counts[result.verdict] += 1
+        return result
+
+    def _classify(self, text: str, content_type: ContentType) -> PreFilterResult:
+        phrases = list(dict.fromkeys(self._matcher.find_all(_normalize(text))))
+        if injections := [p for p in phrases if p in self._injection_phrases]:
+            return PreFilterResult(Verdict.UNSAFE, injections)
+        suspicious = phrases + [
+            name
+            for name, pattern in self._suspicious_patterns.items()
+            if pattern.search(text)
+        ]
+        if suspicious:
+            return PreFilterResult(Verdict.AMBIGUOUS, suspicious)
+        if content_type == ContentType.TOOL_OUTPUT and _is_trivial(text):
+            return PreFilterResult(Verdict.SAFE)
+        return PreFilterResult(Verdict.AMBIGUOUS)
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text.casefold())
+
+
+def _is_scalar_structure(value) -> bool:
+    """Returns if the value only holds numbers, booleans and None."""
+    if value is None or isinstance(value, (bool, int, float, complex)):
+        return True
+    if isinstance(value, (list, tuple, set)):
+        return all(_is_scalar_structure(item) for item in value)
+    if isinstance(value, dict):
+        return all(
+            isinstance(key, str)
+            and _IDENTIFIER.fullmatch(key)
+            and _is_scalar_structure(item)
+            for key, item in value.items()
+        )
+    return False
+
+
+def _is_trivial(text: str) -> bool:
+    """Returns if the text is the repr of a scalar structure, which can't
+    carry instructions."""
+    text = _MARKUP_TAG.sub(" ", text).strip()
+    if len(text) > 10_000:
+        return False
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        return False
+    return _is_scalar_structure(value)
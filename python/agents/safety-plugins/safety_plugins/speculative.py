@@ -0,0 +1,154 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Speculative screening of user messages, overlapped with the model call."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, MutableMapping
+from typing import Any
+
+from google.adk.models import llm_request
+from google.genai import types
+
+from . import verdict_cache
+
+LlmRequest = llm_request.LlmRequest
+
+# Session state key of the keys (see `verdict_cache.message_key`) of the user
+# messages found unsafe by a speculative screening.
+FLAGGED_MESSAGES_KEY = "flagged_user_messages"
+
+
+class SpeculativeScreening:
+    """Tracks user-message screenings that run alongside the agent.
+
+    Instead of holding the invocation until a user message is screened, the
+    plugin starts the screening as a task and lets the model call proceed.
+    Model responses are then held back in `after_model_callback` until the
+    verdict is in, and discarded if the message was unsafe, so nothing the
+    model produced from an unsafe message reaches the user or runs a tool.
+
+    Since an unsafe message has already been recorded in the session by then,
+    it is flagged in the session state, along with the response that replaces
+    the model's, and redacted from later model requests. The flag is
+    persisted by the session service, so it outlives this process.
+
+    Args:
+      fail_closed: The verdict of a screening that raised: True treats the
+        message as unsafe, False as safe.
+      finished_ttl_secs: How long a finished screening is kept, in case the
+        invocation never reaches `finish`, e.g. because it failed.
+    """
+
+    def __init__(self, fail_closed: bool = True, finished_ttl_secs: float = 600):
+        self._fail_closed = fail_closed
+        self._finished_ttl_secs = finished_ttl_secs
+        # invocation_id -> (screening, key of the screened message)
+        self._screenings: dict[str, tuple[asyncio.Task[bool], str]] = {}
+
+    def start(
+        self, invocation_id: str, text: str, is_unsafe: Awaitable[bool]
+    ) -> None:
+        """Starts screening the user message of the invocation."""
+        task = asyncio.ensure_future(is_unsafe)
+
+        def evict() -> None:
+            entry = self._screenings.get(invocation_id)
+            if entry and entry[0] is task:
+                del self._screenings[invocation_id]
+
+        def on_done(task: asyncio.Task[bool]) -> None:
+            if task.cancelled() or task.exception():
+                logging.warning(
+                    "Screening of invocation %s failed, treating its message"
+                    " as %s.",
+                    invocation_id,
+                    "unsafe" if self._fail_closed else "safe",
+                    exc_info=None if task.cancelled() else task.exception(),
+                )
+            asyncio.get_running_loop().call_later(self._finished_ttl_secs, evict)
+
+        task.add_done_callback(on_done)
+        self._screenings[invocation_id] = (task, verdict_cache.message_key(text))
+
+    def _verdict_of(self, task: asyncio.Task[bool]) -> bool:
+        """Returns the verdict of a finished screening."""
+        if task.cancelled() or task.exception():
+            return self._fail_closed
+        return task.result()
+
+    def _flag(self, state: MutableMapping[str, Any], key: str) -> None:
+        flagged = state.get(FLAGGED_MESSAGES_KEY) or []
+        if key not in flagged:
+            # Assigned rather than appended to, so that it is recorded in the
+            # state delta of the current event.
+            state[FLAGGED_MESSAGES_KEY] = [*flagged, key]
+
+    def peek(
+        self, invocation_id: str, state: MutableMapping[str, Any]
+    ) -> bool | None:
+        """Returns the verdict if the screening has finished, else None.
+
+        An unsafe message is flagged in `state`.
+        """
+        task, key = self._screenings.get(invocation_id, (None, None))
+        if task is None or not task.done():
+            return None
+        is_unsafe = self._verdict_of(task)
+        if is_unsafe:
+            self._flag(state, key)
+        return is_unsafe
+
+    async def verdict(
+        self, invocation_id: str, state: MutableMapping[str, Any]
+    ) -> bool:
+        """Waits for the verdict of the invocation's screening.
+
+        An unsafe message is flagged in `state`.
+
+        Returns:
+          True if the user message is unsafe, False if it is safe or was not
+          screened speculatively.
+        """
+        task, _ = self._screenings.get(invocation_id, (None, None))
+        if task is None:
+            return False
+        # Unlike awaiting the task, waiting neither raises its exception nor
+        # cancels it if the caller is cancelled.
+        await asyncio.wait([task])
+        return bool(self.peek(invocation_id, state))
+
+    def finish(self, invocation_id: str) -> None:
+        """Forgets the screening of a finished invocation."""
+        task, _ = self._screenings.pop(invocation_id, (None, None))
+        if task is not None and not task.done():
+            logging.debug(
+                "Screening of invocation %s outlived it.", invocation_id
+            )
+
+    @staticmethod
+    def redact(
+        request: LlmRequest, state: MutableMapping[str, Any], replacement: str
+    ) -> None:
+        """Replaces the user messages flagged in `state` with `replacement`."""
+        flagged = set(state.get(FLAGGED_MESSAGES_KEY) or ())
+        if not flagged:
+            return
+        for content in request.contents:
+            if content.role != "user" or not content.parts:
+                continue
+            text = content.parts[0].text
+            if text and verdict_cache.message_key(text) in flagged:
+                content.parts = [types.Part.from_text(text=replacement)]
@@ -0,0 +1,121 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Windowed safety checks of model output, as it streams in."""
+
+import asyncio
+import dataclasses
+from collections.abc import Awaitable, Callable
+
+
+@dataclasses.dataclass
+class _Stream:
+    """The output of a model call streamed so far, and its checks."""
+
+    text: str = ""
+    # The end of the last window whose check was started.
+    checked_until: int = 0
+    checks: list[asyncio.Task[bool]] = dataclasses.field(default_factory=list)
+    flagged: bool = False
+
+    def on_checked(self, task: asyncio.Task[bool]) -> None:
+        if not task.cancelled() and not task.exception() and task.result():
+            self.flagged = True
+
+
+class StreamingChecks:
+    """Checks streamed model output in overlapping windows.
+
+    As partial responses arrive, the output is cut into windows of
+    `window_chars` characters, each including the last `overlap_chars`
+    characters of the previous one, so content straddling a boundary is
+    checked whole. A window is checked in the background as soon as it is
+    complete, so checks overlap with the generation, and each window is only
+    checked once: the final response only waits for the windows still pending
+    and the text after the last complete window.
+    """
+
+    def __init__(
+        self,
+        is_unsafe: Callable[[str], Awaitable[bool]],
+        window_chars: int = 2000,
+        overlap_chars: int = 200,
+    ):
+        if not 0 <= overlap_chars < window_chars:
+            raise ValueError("overlap_chars must be in [0, window_chars).")
+        self._is_unsafe = is_unsafe
+        self._window_chars = window_chars
+        self._overlap_chars = overlap_chars
+        self._streams: dict[str, _Stream] = {}
+
+    def _check(self, stream: _Stream, end: int) -> None:
+        start = max(0, stream.checked_until - self._overlap_chars)
+        window = stream.text[start:end]
+        stream.checked_until = end
+        if not window.strip():
+            return
+        task = asyncio.ensure_future(self._is_unsafe(window))
+        task.add_done_callback(stream.on_checked)
+        stream.checks.append(task)
+
+    def add(self, stream_id: str, text: str) -> bool:
+        """Adds the text of a partial response to the stream.
+
+        Returns:
+          True if a window of the stream has been flagged so far, in which
+          case the stream should be cut off.
+        """
+        stream = self._streams.setdefault(stream_id, _Stream())
+        stream.text += text
+        step = self._window_chars - self._overlap_chars
+        while not stream.flagged and len(stream.text) - stream.checked_until >= step:
+            self._check(stream, stream.checked_until + step)
+        return stream.flagged
+
+    async def finish(self, stream_id: str, text: str) -> bool:
+        """Checks the rest of the final response, and ends the stream.
+
+        `text` is the full text of the final response. If it doesn't extend
+        the streamed text, e.g. when the response wasn't streamed, it is
+        checked from the start.
+
+        Returns:
+          True if any window of the response is unsafe.
+        """
+        stream = self._streams.pop(stream_id, None) or _Stream()
+        if not text.startswith(stream.text):
+            await self._cancel(stream)
+            stream = _Stream()
+        stream.text = text
+        step = self._window_chars - self._overlap_chars
+        while not stream.flagged and stream.checked_until < len(text):
+            self._check(stream, min(stream.checked_until + step, len(text)))
+        try:
+            for check in asyncio.as_completed(stream.checks):
+                if await check:
+                    return True
+            return False
+        finally:
+            await self._cancel(stream)
+
+    async def discard(self, stream_id: str) -> None:
+        """Drops the stream of an invocation that ended without finishing it."""
+        if stream := self._streams.pop(stream_id, None):
+            await self._cancel(stream)
+
+    async def _cancel(self, stream: _Stream) -> None:
+        pending = [check for check in stream.checks if not check.done()]
+        for check in pending:
+            check.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
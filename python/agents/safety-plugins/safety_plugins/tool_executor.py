@@ -0,0 +1,231 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Runs CPU-bound tools in worker processes, off the event loop."""
+
+import asyncio
+import dataclasses
+import functools
+import logging
+import multiprocessing
+import time
+from collections.abc import Callable, Iterable
+from multiprocessing import connection
+from typing import Any
+
+
+def cpu_bound(func: Callable) -> Callable:
+    """Marks a tool as CPU-bound, so `ToolExecutor.wrap_tools` offloads it."""
+    func.cpu_bound = True
+    return func
+
+
+def _serve_tools(conn: connection.Connection) -> None:
+    """Runs tools sent by the executor in a worker process, until closed."""
+    conn.send(None)  # Ready.
+    while True:
+        try:
+            func, args, kwargs = conn.recv()
+        except EOFError:
+            return
+        try:
+            outcome = (True, func(*args, **kwargs))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logging.exception("Tool %s failed.", func.__name__)
+            outcome = (False, f"{type(e).__name__}: {e}")
+        conn.send(outcome)
+
+
+class _Worker:
+    """A worker process and the pipe used to send it tools to run.
+
+    Blocks until the worker is ready, so the caller should start it in a thread.
+    """
+
+    def __init__(self, context: multiprocessing.context.BaseContext):
+        self.conn, worker_conn = context.Pipe()
+        self.process = context.Process(
+            target=_serve_tools, args=(worker_conn,), daemon=True
+        )
+        self.process.start()
+        worker_conn.close()
+        self.conn.recv()
+
+    def kill(self) -> None:
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+
+
+@dataclasses.dataclass
+class ToolMetrics:
+    """Counters describing the runs of an offloaded tool."""
+
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    cancellations: int = 0
+    total_queue_secs: float = 0.0
+    max_queue_secs: float = 0.0
+    total_run_secs: float = 0.0
+    max_run_secs: float = 0.0
+
+    def __str__(self) -> str:
+        calls = max(self.calls, 1)
+        return (
+            f"calls={self.calls} errors={self.errors} timeouts={self.timeouts}"
+            f" cancellations={self.cancellations}"
+            f" queue_secs(mean={self.total_queue_secs / calls:.3f},"
+            f" max={self.max_queue_secs:.3f})"
+            f" run_secs(mean={self.total_run_secs / calls:.3f},"
+            f" max={self.max_run_secs:.3f})"
+        )
+
+
+class ToolExecutor:
+    """Runs tools in worker processes so they never block the event loop.
+
+    At most `max_workers` calls run at once, each in its own worker process;
+    the others wait in a queue. Workers are started on demand and reused. A
+    call that times out or is cancelled kills its worker, without affecting
+    the other calls, and the next call starts a fresh one.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = multiprocessing.cpu_count(),
+        timeout_secs: float | None = 300,
+    ):
+        self._context = multiprocessing.get_context("forkserver")
+        self._max_workers = max_workers
+        self.timeout_secs = timeout_secs
+        self._semaphores: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._idle_workers: list[_Worker] = []
+        self.metrics: dict[str, ToolMetrics] = {}
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self._max_workers)
+        return self._semaphores[loop]
+
+    async def start(self) -> None:
+        """Starts all the workers ahead of the first calls.
+
+        Starting a worker imports the main module again, which can take
+        seconds for an agent; this keeps that out of the first tool calls.
+        """
+        num_workers = self._max_workers - len(self._idle_workers)
+        self._idle_workers.extend(
+            await asyncio.gather(
+                *(
+                    asyncio.to_thread(_Worker, self._context)
+                    for _ in range(num_workers)
+                )
+            )
+        )
+
+    async def _run_in_process(
+        self, func: Callable, args: tuple, kwargs: dict[str, Any]
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        worker = self._idle_workers.pop() if self._idle_workers else None
+        if worker is None or not worker.process.is_alive():
+            worker = await asyncio.to_thread(_Worker, self._context)
+        ready = loop.create_future()
+        loop.add_reader(
+            worker.conn.fileno(),
+            lambda: ready.done() or ready.set_result(None),
+        )
+        try:
+            worker.conn.send((func, args, kwargs))
+            await ready
+            ok, result = worker.conn.recv()
+        except BaseException as e:
+            # The tool may still be running, e.g. after a timeout: kill it,
+            # and start a fresh worker for the next call.
+            loop.remove_reader(worker.conn.fileno())
+            await asyncio.shield(asyncio.to_thread(worker.kill))
+            if isinstance(e, (EOFError, OSError)):
+                raise RuntimeError(
+                    f"Worker exited with code {worker.process.exitcode}."
+                ) from e
+            raise
+        loop.remove_reader(worker.conn.fileno())
+        self._idle_workers.append(worker)
+        if not ok:
+            raise RuntimeError(result)
+        return result
+
+    def offload(self, func: Callable, timeout_secs: float | None = None) -> Callable:
+        """Returns an async tool that runs `func` in a worker process.
+
+        The returned tool has the name, signature and docstring of `func`, so
+        the model sees the same tool declaration. `func` must be picklable,
+        i.e. defined at the top level of a module. Without `timeout_secs`, the
+        call times out after the executor's `timeout_secs`.
+        """
+        metrics = self.metrics.setdefault(func.__name__, ToolMetrics())
+
+        @functools.wraps(func)
+        async def run(*args, **kwargs):
+            timeout = timeout_secs or self.timeout_secs
+            metrics.calls += 1
+            queued_at = time.perf_counter()
+            try:
+                async with self._get_semaphore():
+                    started_at = time.perf_counter()
+                    queue_secs = started_at - queued_at
+                    metrics.total_queue_secs += queue_secs
+                    metrics.max_queue_secs = max(metrics.max_queue_secs, queue_secs)
+                    try:
+                        return await asyncio.wait_for(
+                            self._run_in_process(func, args, kwargs), timeout
+                        )
+                    finally:
+                        run_secs = time.perf_counter() - started_at
+                        metrics.total_run_secs += run_secs
+                        metrics.max_run_secs = max(metrics.max_run_secs, run_secs)
+            except asyncio.TimeoutError:
+                metrics.timeouts += 1
+                return {
+                    "error": f"{func.__name__} timed out after {timeout} seconds."
+                }
+            except asyncio.CancelledError:
+                metrics.cancellations += 1
+                raise
+            except RuntimeError as e:
+                metrics.errors += 1
+                return {"error": f"{func.__name__} failed: {e}"}
+
+        return run
+
+    def wrap_tools(self, tools: Iterable[Any]) -> list[Any]:
+        """Offloads the tools marked with `cpu_bound`, and keeps the others."""
+        return [
+            self.offload(tool) if getattr(tool, "cpu_bound", False) else tool
+            for tool in tools
+        ]
+
+    def report(self) -> str:
+        """Returns the metrics of all the offloaded tools, one per line."""
+        return "\n".join(
+            f"{name}: {metrics}" for name, metrics in self.metrics.items()
+        )
+
+    def shutdown(self) -> None:
+        """Stops the idle worker processes."""
+        while self._idle_workers:
+            self._idle_workers.pop().kill()
@@ -21,12 +21,15 @@ CPU-bound, I/O-bound, and those with potential vulnerabilities.
 import math
 import time
 
+from . import tool_executor
+
 
 def short_sum_tool() -> str:
     """A short CPU-bound task.
 
     This function performs a calculation-heavy task (summing numbers) that
-    occupies the CPU for a short duration.
+    occupies the CPU for a short duration. It is not marked `cpu_bound`, as it
+    is too short to be worth a round trip to a worker process.
 
     Returns:
         str: A message indicating the completion time and result of the task.
@@ -42,6 +45,7 @@ def short_sum_tool() -> str:
     )
 
 
+@tool_executor.cpu_bound
 def long_sum_tool() -> str:
     """A long CPU-bound task.
 
@@ -62,6 +66,7 @@ def long_sum_tool() -> str:
     )
 
 
+@tool_executor.cpu_bound
 def fib_tool(n: int) -> str:
     """A tool that calculates the nth fibonnaci number.
 
@@ -17,6 +17,7 @@
 import logging
 from typing import Any
 from google.adk import runners
+from google.adk.agents import run_config as run_config_lib
 from google.cloud.modelarmor_v1 import (
     SanitizeModelResponseResponse,
     SanitizeUserPromptResponse,
@@ -32,6 +33,7 @@ from google.cloud.modelarmor_v1.types import (
 from google.genai import types
 
 Runner = runners.Runner
+RunConfig = run_config_lib.RunConfig
 
 
 async def run_prompt(
@@ -40,6 +42,7 @@ async def run_prompt(
     runner: Runner,
     message: types.Content,
     session_id: str | None = None,
+    run_config: RunConfig | None = None,
 ) -> tuple[str, str]:
     """Runs a prompt using the provided runner and returns the response.
 
@@ -49,6 +52,7 @@ async def run_prompt(
         runner: The runner to use for running the prompt.
         message: The content of the message to send.
         session_id: The ID of an existing session.
+        run_config: The run config, e.g. to stream the model's responses.
 
     Returns:
         The response text from the agent.
@@ -67,7 +71,10 @@ async def run_prompt(
             raise ValueError("Session is None")
 
         async for event in runner.run_async(
-            user_id=user_id, session_id=session.id, new_message=message
+            user_id=user_id,
+            session_id=session.id,
+            new_message=message,
+            run_config=run_config,
         ):
             if event.is_final_response() and event.content and event.content.parts:
                 return (
@@ -0,0 +1,88 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bounded cache of safety verdicts and safety check metrics."""
+
+import collections
+import dataclasses
+import hashlib
+import re
+import time
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def message_key(message: str) -> str:
+    """Returns a hash of the message with its whitespace normalized."""
+    normalized = _WHITESPACE.sub(" ", message).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+@dataclasses.dataclass
+class SafetyCheckMetrics:
+    """Counters describing the safety checks run by a plugin."""
+
+    cache_hits: int = 0
+    cache_misses: int = 0
+    total_check_secs: float = 0.0
+    max_check_secs: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+    @property
+    def mean_check_secs(self) -> float:
+        """Mean latency of the checks that missed the cache."""
+        if not self.cache_misses:
+            return 0.0
+        return self.total_check_secs / self.cache_misses
+
+    def record_check(self, elapsed_secs: float) -> None:
+        self.cache_misses += 1
+        self.total_check_secs += elapsed_secs
+        self.max_check_secs = max(self.max_check_secs, elapsed_secs)
+
+
+class VerdictCache:
+    """LRU cache of verdicts, whose entries expire after `ttl_secs`."""
+
+    def __init__(self, max_entries: int = 4096, ttl_secs: float = 600):
+        self.max_entries = max_entries
+        self.ttl_secs = ttl_secs
+        self._entries: collections.OrderedDict[str, tuple[float, bool]] = (
+            collections.OrderedDict()
+        )
+
+    def get(self, key: str) -> bool | None:
+        """Returns the cached verdict for the key, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, verdict = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return verdict
+
+    def put(self, key: str, verdict: bool) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_secs, verdict)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
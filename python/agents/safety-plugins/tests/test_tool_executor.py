@@ -0,0 +1,30 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the selection of the tools run in worker processes."""
+
+from safety_plugins import tools
+from safety_plugins.tool_executor import ToolExecutor
+
+
+def test_only_cpu_bound_tools_are_offloaded():
+    executor = ToolExecutor(max_workers=1)
+    short_sum, long_sum, io_bound = executor.wrap_tools(
+        [tools.short_sum_tool, tools.long_sum_tool, tools.io_bound_tool]
+    )
+    assert short_sum is tools.short_sum_tool
+    assert io_bound is tools.io_bound_tool
+    assert long_sum is not tools.long_sum_tool
+    assert long_sum.__wrapped__ is tools.long_sum_tool
+    assert list(executor.metrics) == ["long_sum_tool"]
@@ -68,6 +68,7 @@ def create(env_vars: dict[str, str]) -> None:
             "absl-py (>=2.2.1,<3.0.0)",
             "pydantic (>=2.10.6,<3.0.0)",
             "requests (>=2.32.3,<3.0.0)",
+            "httpx (>=0.28.1,<1.0.0)",
         ],
         extra_packages=[
             "./travel_concierge",  # The main package
@@ -0,0 +1,121 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the batched checks of the trip_monitor agent."""
+
+import asyncio
+import json
+import os
+import time
+import types as pytypes
+import unittest
+
+from travel_concierge.shared_libraries import constants
+from travel_concierge.shared_libraries import types
+from travel_concierge.sub_agents.in_trip import monitor
+from travel_concierge.sub_agents.in_trip.tools import monitor_itinerary
+
+EXAMPLE_PATH = os.path.join(
+    os.path.dirname(__file__),
+    "../../travel_concierge/profiles/itinerary_seattle_example.json",
+)
+
+
+class SlowWeather:
+    """Takes a while to forecast, and fails for one activity."""
+
+    def __init__(self, latency_secs: float):
+        self.latency_secs = latency_secs
+
+    async def check_weather(self, activity_name, activity_date, activity_location):
+        await asyncio.sleep(self.latency_secs)
+        if activity_name == "Pike Place Market":
+            raise RuntimeError("forecast unavailable")
+        return None
+
+
+class TestTripMonitor(unittest.TestCase):
+    """Test cases for TripMonitor and the monitor_itinerary tool."""
+
+    def setUp(self):
+        super().setUp()
+        with open(EXAMPLE_PATH, "r") as file:
+            self.itinerary = json.load(file)["state"][constants.ITIN_KEY]
+
+    def test_reports_only_the_exceptions(self):
+        tool_context = pytypes.SimpleNamespace(
+            state={constants.ITIN_KEY: self.itinerary}
+        )
+        report = asyncio.run(monitor_itinerary(tool_context=tool_context))
+        # 2 flights, 2 visits requiring booking and 5 visits.
+        self.assertEqual(report["checks"], 9)
+        self.assertEqual(
+            report["exceptions"],
+            [
+                {
+                    "date": "2025-06-16",
+                    "event": "Space Needle",
+                    "check": "booking",
+                    "issue": "Space Needle is closed.",
+                }
+            ],
+        )
+
+    def test_checks_run_concurrently_and_failures_are_reported(self):
+        trip_monitor = monitor.TripMonitor(weather=SlowWeather(latency_secs=0.2))
+        start = time.perf_counter()
+        report = asyncio.run(trip_monitor.check_itinerary(self.itinerary))
+        self.assertLess(time.perf_counter() - start, 0.6)
+        issues = {item["event"]: item["issue"] for item in report["exceptions"]}
+        self.assertEqual(
+            issues["Pike Place Market"], "Could not be checked: forecast unavailable"
+        )
+
+    def test_slow_checks_time_out(self):
+        trip_monitor = monitor.TripMonitor(
+            weather=SlowWeather(latency_secs=1.0), timeout_secs=0.1
+        )
+        report = asyncio.run(trip_monitor.check_itinerary(self.itinerary))
+        timed_out = [
+            item for item in report["exceptions"] if "timed out" in item["issue"]
+        ]
+        self.assertEqual(len(timed_out), 5)
+
+    def test_accepts_an_itinerary_model(self):
+        itinerary = types.Itinerary(
+            trip_name="Test trip",
+            start_date="2025-06-15",
+            end_date="2025-06-15",
+            origin="San Diego",
+            destination="Seattle",
+            days=[
+                types.ItineraryDay(
+                    day_number=1,
+                    date="2025-06-15",
+                    events=[
+                        types.AttractionEvent(
+                            description="Space Needle",
+                            address="400 Broad St, Seattle",
+                            start_time="14:30",
+                            end_time="16:30",
+                            booking_required=True,
+                            price=None,
+                        )
+                    ],
+                )
+            ],
+        )
+        report = asyncio.run(monitor.TripMonitor().check_itinerary(itinerary))
+        self.assertEqual(report["checks"], 2)
+        self.assertEqual(report["exceptions"][0]["issue"], "Space Needle is closed.")
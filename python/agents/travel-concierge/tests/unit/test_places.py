@@ -0,0 +1,155 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the geocoding in map_tool, against a local fake Places API."""
+
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import tempfile
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from travel_concierge.tools import places
+
+
+class FakePlacesApi:
+    """Serves findplacefromtext on localhost, and counts the requests."""
+
+    def __init__(self, latency_secs: float = 0.0):
+        self.latency_secs = latency_secs
+        self.queries = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)["input"][0]
+                with api._lock:
+                    api.queries.append(query)
+                    api.in_flight += 1
+                    api.max_in_flight = max(api.max_in_flight, api.in_flight)
+                time.sleep(api.latency_secs)
+                with api._lock:
+                    api.in_flight -= 1
+                if "error" in query:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                candidates = []
+                if "nowhere" not in query.lower():
+                    candidates.append(
+                        {
+                            "place_id": f"id:{query.split(',')[0].lower()}",
+                            "name": query.split(",")[0],
+                            "formatted_address": query,
+                            "geometry": {"location": {"lat": 48.85, "lng": 2.29}},
+                        }
+                    )
+                body = json.dumps({"candidates": candidates}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def make_pois(*names_and_addresses):
+    return {
+        "places": [
+            {"place_name": name, "address": address}
+            for name, address in names_and_addresses
+        ]
+    }
+
+
+class TestMapTool(unittest.TestCase):
+    """Test cases for map_tool and the PlacesService behind it."""
+
+    def setUp(self):
+        super().setUp()
+        self.api = FakePlacesApi()
+        self.addCleanup(self.api.close)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.cache_path = os.path.join(self.tmpdir.name, "places.sqlite")
+
+    def run_map_tool(self, pois, **service_kwargs):
+        service = places.PlacesService(
+            base_url=self.api.url, cache_path=self.cache_path, **service_kwargs
+        )
+        tool_context = types.SimpleNamespace(state={"poi": pois})
+        with mock.patch.object(places, "places_service", service):
+            return asyncio.run(places.map_tool(key="poi", tool_context=tool_context))
+
+    def test_fills_pois_and_shares_requests_for_the_same_place(self):
+        result = self.run_map_tool(
+            make_pois(
+                ("Eiffel Tower", "Paris"),
+                ("eiffel tower ", " PARIS"),
+                ("Nowhere", "Atlantis"),
+            )
+        )
+        eiffel, eiffel_again, nowhere = result["places"]
+        self.assertEqual(eiffel["place_id"], "id:eiffel tower")
+        self.assertEqual(eiffel["lat"], "48.85")
+        self.assertEqual(eiffel["long"], "2.29")
+        self.assertEqual(eiffel_again["place_id"], "id:eiffel tower")
+        self.assertIsNone(nowhere["place_id"])
+        self.assertEqual(len(self.api.queries), 2)
+
+    def test_cache_persists_across_services(self):
+        pois = [("Louvre", "Paris"), ("Orsay", "Paris")]
+        self.run_map_tool(make_pois(*pois))
+        result = self.run_map_tool(make_pois(*pois))
+        self.assertEqual(len(self.api.queries), 2)
+        self.assertEqual(result["places"][1]["place_id"], "id:orsay")
+
+    def test_expired_entries_are_fetched_again(self):
+        self.run_map_tool(make_pois(("Louvre", "Paris")), cache_ttl_secs=0)
+        self.run_map_tool(make_pois(("Louvre", "Paris")), cache_ttl_secs=0)
+        self.assertEqual(len(self.api.queries), 2)
+
+    def test_requests_run_concurrently_up_to_the_limit(self):
+        self.api.latency_secs = 0.2
+        self.run_map_tool(
+            make_pois(*((f"Museum {i}", "Paris") for i in range(6))),
+            max_concurrent_requests=3,
+        )
+        self.assertEqual(len(self.api.queries), 6)
+        self.assertGreater(self.api.max_in_flight, 1)
+        self.assertLessEqual(self.api.max_in_flight, 3)
+
+    def test_errors_leave_the_poi_unverified(self):
+        result = self.run_map_tool(make_pois(("error", "Paris")))
+        self.assertIsNone(result["places"][0]["place_id"])
+        self.assertIsNone(result["places"][0]["map_url"])
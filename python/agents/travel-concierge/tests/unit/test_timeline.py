@@ -0,0 +1,100 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the itinerary timeline and the in_trip segment lookup."""
+
+import copy
+import unittest
+from unittest import mock
+
+from travel_concierge.shared_libraries import constants
+from travel_concierge.shared_libraries import timeline
+from travel_concierge.shared_libraries import trip_state
+from travel_concierge.sub_agents.in_trip.tools import find_segment
+
+PROFILE = {"home": {"event_type": "home", "address": "Home", "local_prefer_mode": "drive"}}
+
+ITINERARY = {
+    "trip_name": "Test trip",
+    "start_date": "2025-06-15",
+    "end_date": "2025-06-16",
+    "days": [
+        {
+            "day_number": 1,
+            "date": "2025-06-15",
+            "events": [
+                # Out of order on purpose.
+                {"event_type": "visit", "description": "Dinner", "start_time": "19:00", "end_time": "21:00"},
+                {"event_type": "visit", "description": "Museum", "start_time": "09:00", "end_time": "12:00"},
+            ],
+        },
+        {
+            "day_number": 2,
+            "date": "2025-06-16",
+            "events": [
+                {"event_type": "visit", "description": "Market", "start_time": "08:00", "end_time": "10:00"},
+            ],
+        },
+    ],
+}
+
+
+class TestTimeline(unittest.TestCase):
+    """Test cases for the timeline and find_segment."""
+
+    def test_events_are_sorted_by_time(self):
+        itin_timeline = timeline.build_timeline(ITINERARY)
+        self.assertEqual(
+            itin_timeline["times"],
+            ["2025-06-15T09:00:00", "2025-06-15T19:00:00", "2025-06-16T08:00:00"],
+        )
+        self.assertEqual(itin_timeline["events"], [[0, 1], [0, 0], [1, 0]])
+
+    def test_find_segment_starts_from_home(self):
+        travel_from, travel_to, _, arrive_by = find_segment(
+            PROFILE, ITINERARY, "2025-06-15 07:00"
+        )
+        self.assertEqual(travel_from, "drive from Home")
+        self.assertEqual(travel_to, "Museum ")
+        self.assertEqual(arrive_by, "09:00")
+
+    def test_find_segment_crosses_to_next_day(self):
+        # The next event is on the next day, at an earlier time of day.
+        travel_from, travel_to, leave_by, arrive_by = find_segment(
+            PROFILE, ITINERARY, "2025-06-15 22:00"
+        )
+        self.assertEqual(travel_from, "Dinner ")
+        self.assertEqual(leave_by, "21:00")
+        self.assertEqual(travel_to, "Market ")
+        self.assertEqual(arrive_by, "08:00")
+
+    def test_find_segment_after_the_trip_keeps_the_last_event(self):
+        _, travel_to, _, _ = find_segment(PROFILE, ITINERARY, "2025-06-20 10:00")
+        self.assertEqual(travel_to, "Market ")
+
+    def test_cached_timeline_is_rebuilt_when_the_itinerary_changes(self):
+        state = {constants.ITIN_KEY: copy.deepcopy(ITINERARY)}
+        timeline.refresh_timeline(state)
+        cached = state[constants.ITIN_TIMELINE]
+        with mock.patch.object(timeline, "build_timeline") as build_timeline:
+            self.assertIs(timeline.get_timeline(state), cached)
+        build_timeline.assert_not_called()
+
+        state[constants.ITIN_KEY]["days"][1]["events"][0]["start_time"] = "06:00"
+        trip_state.mark_changed(state, constants.ITIN_KEY)
+        self.assertEqual(
+            timeline.get_timeline(state)["times"][-1], "2025-06-16T06:00:00"
+        )
+        timeline.refresh_timeline(state)
+        self.assertIsNot(state[constants.ITIN_TIMELINE], cached)
@@ -14,6 +14,7 @@
 
 """Basic tests for individual tools."""
 
+import asyncio
 import unittest
 
 from dotenv import load_dotenv
@@ -72,7 +73,7 @@ class TestAgents(unittest.TestCase):
         self.tool_context.state["poi"] = {
             "places": [{"place_name": "Machu Picchu", "address": "Machu Picchu, Peru"}]
         }
-        result = map_tool(key="poi", tool_context=self.tool_context)
+        result = asyncio.run(map_tool(key="poi", tool_context=self.tool_context))
         print(result)
         self.assertIn("place_id", result["places"][0])
         self.assertEqual(
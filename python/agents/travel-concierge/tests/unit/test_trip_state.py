@@ -0,0 +1,129 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the typed trip state, its prompt snippets and list memories."""
+
+import copy
+import types as pytypes
+import unittest
+from unittest import mock
+
+from travel_concierge.shared_libraries import constants
+from travel_concierge.shared_libraries import trip_state
+from travel_concierge.tools.memory import forget, memorize, memorize_list
+
+ITINERARY = {
+    "trip_name": "Test trip",
+    "start_date": "2025-06-15",
+    "end_date": "2025-06-16",
+    "origin": "San Diego",
+    "destination": "Seattle",
+    "days": [
+        {
+            "day_number": 1,
+            "date": "2025-06-15",
+            "events": [
+                {
+                    "event_type": "visit",
+                    "description": "Museum",
+                    "address": "1 Museum Way",
+                    "start_time": "09:00",
+                    "end_time": "12:00",
+                    "price": None,
+                }
+            ],
+        },
+        {
+            "day_number": 2,
+            "date": "2025-06-16",
+            "events": [
+                {
+                    "event_type": "visit",
+                    "description": "Market",
+                    "address": "2 Market St",
+                    "start_time": "08:00",
+                    "end_time": "10:00",
+                    "price": "10",
+                }
+            ],
+        },
+    ],
+}
+
+
+class TestTripState(unittest.TestCase):
+    """Test cases for TripState."""
+
+    def test_itinerary_is_parsed_once(self):
+        state = {constants.ITIN_KEY: copy.deepcopy(ITINERARY)}
+        itinerary = trip_state.TripState(state).itinerary
+        self.assertEqual(itinerary.days[1].events[0].description, "Market")
+        self.assertIs(trip_state.TripState(state).itinerary, itinerary)
+
+        state[constants.ITIN_KEY]["trip_name"] = "Other trip"
+        itinerary = trip_state.TripState(state).itinerary
+        self.assertEqual(itinerary.trip_name, "Other trip")
+
+    def test_invalid_itinerary_is_none(self):
+        state = {constants.ITIN_KEY: {"trip_name": "No dates"}}
+        self.assertIsNone(trip_state.TripState(state).itinerary)
+
+    def test_only_changed_days_are_rendered_again(self):
+        state = {constants.ITIN_KEY: copy.deepcopy(ITINERARY)}
+        trip_state.TripState(state).refresh_prompts()
+        self.assertIn(
+            "- visit: Museum; address: 1 Museum Way", state[constants.ITIN_PROMPT]
+        )
+        self.assertNotIn("price", state[constants.ITIN_PROMPT].splitlines()[2])
+
+        # Without a write of the itinerary, nothing is rendered again.
+        with mock.patch.object(trip_state, "render_day") as render_day:
+            trip_state.TripState(state).refresh_prompts()
+        render_day.assert_not_called()
+
+        state[constants.ITIN_KEY]["days"][1]["events"][0]["start_time"] = "07:00"
+        trip_state.mark_changed(state, constants.ITIN_KEY)
+        with mock.patch.object(
+            trip_state, "render_day", wraps=trip_state.render_day
+        ) as render_day:
+            trip_state.TripState(state).refresh_prompts()
+        render_day.assert_called_once_with(state[constants.ITIN_KEY]["days"][1])
+        self.assertIn("start_time: 07:00", state[constants.ITIN_PROMPT])
+        self.assertEqual(len(state[constants.PROMPT_CACHE]), 2)
+
+    def test_memorize_invalidates_the_prompts(self):
+        tool_context = pytypes.SimpleNamespace(
+            state={constants.ITIN_KEY: copy.deepcopy(ITINERARY)}
+        )
+        trip_state.TripState(tool_context.state).refresh_prompts()
+        itinerary = copy.deepcopy(ITINERARY)
+        itinerary["trip_name"] = "Other trip"
+        memorize(constants.ITIN_KEY, itinerary, tool_context)
+        trip_state.TripState(tool_context.state).refresh_prompts()
+        self.assertIn("Trip: Other trip", tool_context.state[constants.ITIN_PROMPT])
+
+    def test_list_memories(self):
+        tool_context = pytypes.SimpleNamespace(state={})
+        for value in ["vegan", "window seat", "vegan"]:
+            memorize_list("likes", value, tool_context)
+        self.assertEqual(tool_context.state["likes"], ["vegan", "window seat"])
+
+        forget("likes", "vegan", tool_context)
+        forget("likes", "aisle seat", tool_context)
+        self.assertEqual(tool_context.state["likes"], ["window seat"])
+
+        # Lists written directly are indexed again.
+        tool_context.state["likes"] = ["vegan", "vegan", "museums"]
+        memorize_list("likes", "museums", tool_context)
+        self.assertEqual(tool_context.state["likes"], ["vegan", "museums"])
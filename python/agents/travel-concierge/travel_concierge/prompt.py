@@ -27,7 +27,7 @@ ROOT_AGENT_INSTR = """
                
 Current user:
   <user_profile>
-  {user_profile}
+  {_user_profile_prompt}
   </user_profile>
 
 Current time: {_time}
@@ -41,7 +41,7 @@ If we have a non-empty itinerary, follow the following logic to deteermine a Tri
 - if "{itinerary_datetime}" is after the end date of the trip, we are in the "post_trip" phase. 
 
 <itinerary>
-{itinerary}
+{_itinerary_prompt}
 </itinerary>
 
 Upon knowing the trip phase, delegate the control of the dialog to the respective agents accordingly: 
@@ -16,6 +16,18 @@
 
 SYSTEM_TIME = "_time"
 ITIN_INITIALIZED = "_itin_initialized"
+ITIN_TIMELINE = "_itin_timeline"
+ITIN_PROMPT = "_itinerary_prompt"
+PROF_PROMPT = "_user_profile_prompt"
+PROMPT_CACHE = "_prompt_cache"
+PROMPT_VERSIONS = "_prompt_versions"
+# Bumped on every write of the itinerary and user profile, to invalidate what
+# is derived from them.
+ITIN_VERSION = "_itin_version"
+PROF_VERSION = "_user_profile_version"
+
+# Suffix of the key of the set of values of each list memory.
+LIST_INDEX_SUFFIX = "__index"
 
 ITIN_KEY = "itinerary"
 PROF_KEY = "user_profile"
@@ -0,0 +1,85 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent cache of geocoded places, shared by all sessions."""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+
+# Places API policies allow caching coordinates for up to 30 days.
+DEFAULT_TTL_SECS = 30 * 24 * 60 * 60
+
+
+def normalize_query(query: str) -> str:
+    """Returns the cache key of a "name, address" query.
+
+    Case, Unicode forms, whitespace and spacing around commas are normalized,
+    so that the same POI suggested with small variations shares an entry.
+    """
+    query = unicodedata.normalize("NFKC", query).casefold()
+    query = re.sub(r"\s*,\s*", ", ", query)
+    return re.sub(r"\s+", " ", query).strip(" ,")
+
+
+class PlacesCache:
+    """A SQLite-backed cache of Places API candidates, with a TTL.
+
+    Entries are the raw candidates returned by the API, which hold no API key,
+    so that the cache file can be shared safely. Use `path=":memory:"` for a
+    cache that only lives as long as the process.
+    """
+
+    def __init__(self, path: str, ttl_secs: float = DEFAULT_TTL_SECS):
+        self.ttl_secs = ttl_secs
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS places ("
+                " query TEXT PRIMARY KEY,"
+                " candidate TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached candidate for a normalized query, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT candidate FROM places WHERE query = ? AND expires_at > ?",
+                (query, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, query: str, candidate: Dict[str, Any]) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO places VALUES (?, ?, ?)",
+                (query, json.dumps(candidate), time.time() + self.ttl_secs),
+            )
+
+    def evict_expired(self) -> int:
+        """Deletes the expired entries, and returns how many there were."""
+        with self._lock, self._db:
+            return self._db.execute(
+                "DELETE FROM places WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,124 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A sorted timeline of the itinerary's events, for O(log n) lookups."""
+
+import bisect
+from datetime import date, datetime, time
+import hashlib
+import json
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from travel_concierge.shared_libraries import constants
+
+# The field holding the time of each type of event, as a destination.
+EVENT_TIME_FIELDS = {
+    "flight": "boarding_time",
+    "hotel": "check_in_time",
+    "visit": "start_time",
+}
+
+
+def fingerprint(itinerary: Dict[str, Any]) -> str:
+    """Returns a hash of the itinerary, which changes with any of its fields."""
+    canonical = json.dumps(itinerary, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _event_datetime(day: date, event: Dict[str, Any]) -> datetime:
+    """Returns when the event starts, or the end of its day if it has no time."""
+    field = EVENT_TIME_FIELDS.get(event.get("event_type"))
+    try:
+        return datetime.combine(day, time.fromisoformat(event[field]))
+    except (KeyError, TypeError, ValueError):
+        return datetime.combine(day, time(23, 59, 59))
+
+
+def build_timeline(
+    itinerary: Dict[str, Any], version: int = 0
+) -> Dict[str, Any]:
+    """Builds the timeline of the itinerary, as JSON to be kept in the state.
+
+    Returns:
+      A dict of the `version` of the itinerary, the `times` of its events as
+      sorted ISO 8601 strings, which sort like the datetimes, and the
+      `(day, event)` indices of the events in the same order.
+    """
+    entries = []
+    for day_index, day in enumerate(itinerary.get("days", [])):
+        try:
+            day_date = date.fromisoformat(day["date"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        for event_index, event in enumerate(day.get("events", [])):
+            event_time = _event_datetime(day_date, event)
+            entries.append(
+                (event_time.isoformat(timespec="seconds"), day_index, event_index)
+            )
+    # The sort is stable, so events at the same time keep the itinerary order.
+    entries.sort(key=lambda entry: entry[0])
+    return {
+        "version": version,
+        "times": [entry[0] for entry in entries],
+        "events": [[entry[1], entry[2]] for entry in entries],
+    }
+
+
+def get_timeline(state: Mapping[str, Any]) -> Dict[str, Any]:
+    """Returns the timeline cached in the state, or builds it if it's stale.
+
+    The writers of the itinerary bump its version (see
+    `trip_state.mark_changed`), so checking the cached timeline is cheap.
+    """
+    version = state.get(constants.ITIN_VERSION, 0)
+    timeline = state.get(constants.ITIN_TIMELINE)
+    if timeline and timeline.get("version") == version:
+        return timeline
+    return build_timeline(state[constants.ITIN_KEY], version)
+
+
+def refresh_timeline(state: Dict[str, Any]) -> None:
+    """Caches the timeline of the itinerary in the writable state."""
+    if state.get(constants.ITIN_KEY):
+        timeline = get_timeline(state)
+        if timeline is not state.get(constants.ITIN_TIMELINE):
+            state[constants.ITIN_TIMELINE] = timeline
+
+
+def find_next_event(
+    itinerary: Dict[str, Any],
+    timeline: Dict[str, Any],
+    current_datetime: datetime,
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Finds the last event before `current_datetime` and the next one.
+
+    The next event is the first one at or after `current_datetime`; once the
+    trip is over, it is the last event of the trip.
+
+    Returns:
+      The previous and next events, either of which is None if there is none.
+    """
+    times = timeline["times"]
+    if not times:
+        return None, None
+    index = bisect.bisect_left(
+        times, current_datetime.isoformat(timespec="seconds")
+    )
+    index = min(index, len(times) - 1)
+
+    def event_at(i: int) -> Dict[str, Any]:
+        day_index, event_index = timeline["events"][i]
+        return itinerary["days"][day_index]["events"][event_index]
+
+    return (event_at(index - 1) if index else None), event_at(index)
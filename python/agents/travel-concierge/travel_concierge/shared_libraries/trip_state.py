@@ -0,0 +1,236 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A typed view of the trip in the session state, and its prompt snippets.
+
+The itinerary and user profile stay in the state as JSON, which the agents
+write to, but are only parsed into the models of `types` once per version,
+and are embedded into the prompts as compact snippets that are re-rendered
+one day at a time, only for the days that changed.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, MutableMapping, Optional, Type, TypeVar
+
+from google.adk.agents.callback_context import CallbackContext
+from pydantic import BaseModel, ValidationError
+
+from travel_concierge.shared_libraries import constants
+from travel_concierge.shared_libraries import types
+from travel_concierge.shared_libraries.timeline import fingerprint
+
+Model = TypeVar("Model", bound=BaseModel)
+
+# Parsed models by type and fingerprint, shared by the sessions of the process.
+_MAX_PARSED_MODELS = 256
+_parsed_models: "OrderedDict[tuple[str, str], Optional[BaseModel]]" = OrderedDict()
+
+
+def _parse(model_type: Type[Model], data: Any) -> Optional[Model]:
+    """Parses the JSON into the model once, or returns None if it's invalid."""
+    if not data:
+        return None
+    key = (model_type.__name__, fingerprint(data))
+    if key in _parsed_models:
+        _parsed_models.move_to_end(key)
+        return _parsed_models[key]
+    try:
+        model = model_type.model_validate(data)
+    except ValidationError:
+        model = None
+    _parsed_models[key] = model
+    if len(_parsed_models) > _MAX_PARSED_MODELS:
+        _parsed_models.popitem(last=False)
+    return model
+
+
+# The version of each memory whose derived data is cached in the state.
+VERSION_KEYS = {
+    constants.ITIN_KEY: constants.ITIN_VERSION,
+    constants.PROF_KEY: constants.PROF_VERSION,
+}
+
+
+def mark_changed(state: MutableMapping[str, Any], key: str) -> None:
+    """Bumps the version of the memory after it was written.
+
+    Everything that writes the itinerary or the user profile must call this,
+    so that the timeline and the prompt snippets derived from it are rebuilt.
+    Other keys have no version and are ignored.
+    """
+    version_key = VERSION_KEYS.get(key)
+    if version_key:
+        state[version_key] = state.get(version_key, 0) + 1
+
+
+def mark_itinerary_changed(callback_context: CallbackContext):
+    """
+    Bumps the version of the itinerary.
+    Set this as the after_agent_callback of the agents that write the
+    itinerary through their output_key.
+
+    Args:
+        callback_context: The callback context.
+    """
+    mark_changed(callback_context.state, constants.ITIN_KEY)
+
+
+def _render_fields(fields: Dict[str, Any], prefix: str = "") -> list[str]:
+    """Renders the non-empty fields as "name: value", flattening dicts."""
+    rendered = []
+    for name, value in fields.items():
+        if isinstance(value, dict):
+            rendered.extend(_render_fields(value, f"{prefix}{name}."))
+        elif isinstance(value, list):
+            if value:
+                rendered.append(f"{prefix}{name}: {', '.join(map(str, value))}")
+        elif value is not None and value != "":
+            rendered.append(f"{prefix}{name}: {value}")
+    return rendered
+
+
+def render_day(day: Dict[str, Any]) -> str:
+    """Renders a day of the itinerary, with one line per event."""
+    lines = [f"Day {day.get('day_number', '')}, {day.get('date', '')}:"]
+    for event in day.get("events", []):
+        fields = dict(event)
+        event_type = fields.pop("event_type", "event")
+        heading = f"- {event_type}: {fields.pop('description', '')}"
+        lines.append("; ".join([heading] + _render_fields(fields)))
+    return "\n".join(lines)
+
+
+def render_user_profile(profile: Dict[str, Any]) -> str:
+    """Renders the user profile, with one line per field."""
+    return "\n".join(f"- {line}" for line in _render_fields(profile))
+
+
+class TripState:
+    """A typed view of the trip in a session state.
+
+    Args:
+      state: The session state, which must be writable to memorize lists or
+        refresh the prompts.
+    """
+
+    def __init__(self, state: MutableMapping[str, Any]):
+        self.state = state
+
+    @property
+    def itinerary(self) -> Optional[types.Itinerary]:
+        """The itinerary, or None if there is none or it isn't valid."""
+        return _parse(types.Itinerary, self.state.get(constants.ITIN_KEY))
+
+    @property
+    def user_profile(self) -> Optional[types.UserProfile]:
+        """The user profile, or None if there is none or it isn't valid."""
+        return _parse(types.UserProfile, self.state.get(constants.PROF_KEY))
+
+    def _list_index(self, key: str) -> Dict[str, None]:
+        """Returns the set of the values of a list memory, as a JSON dict."""
+        values = self.state.get(key) or []
+        index_key = key + constants.LIST_INDEX_SUFFIX
+        index = self.state.get(index_key)
+        # The list can also be written to directly, which the lengths reveal.
+        if index is None or len(index) != len(values):
+            index = dict.fromkeys(values)
+            self.state[key] = list(index)
+            self.state[index_key] = index
+        return index
+
+    def add_to_list(self, key: str, value: str) -> bool:
+        """Appends the value to a list memory, and returns if it was new."""
+        index = self._list_index(key)
+        if value in index:
+            return False
+        index[value] = None
+        values = self.state[key]
+        values.append(value)
+        # Assign the updated values, so that the state records the changes.
+        self.state[key] = values
+        self.state[key + constants.LIST_INDEX_SUFFIX] = index
+        return True
+
+    def remove_from_list(self, key: str, value: str) -> bool:
+        """Removes the value from a list memory, and returns if it was there."""
+        index = self._list_index(key)
+        if value not in index:
+            return False
+        del index[value]
+        self.state[key] = list(index)
+        self.state[key + constants.LIST_INDEX_SUFFIX] = index
+        return True
+
+    def refresh_prompts(self) -> None:
+        """Updates the prompt snippets of the itinerary and user profile.
+
+        The snippets are only rendered again after the itinerary or user
+        profile was written, which bumps their versions. Each snippet is then
+        looked up by the fingerprint of its JSON, so only the days of the
+        itinerary that changed are rendered again.
+        """
+        versions = [
+            self.state.get(constants.ITIN_VERSION, 0),
+            self.state.get(constants.PROF_VERSION, 0),
+        ]
+        if (
+            self.state.get(constants.PROMPT_VERSIONS) == versions
+            and constants.ITIN_PROMPT in self.state
+        ):
+            return
+        cache = self.state.get(constants.PROMPT_CACHE) or {}
+        snippets = {}
+
+        def render(data: Dict[str, Any], renderer) -> str:
+            key = fingerprint(data)
+            snippets[key] = cache.get(key) or renderer(data)
+            return snippets[key]
+
+        itinerary = self.state.get(constants.ITIN_KEY) or {}
+        itinerary_prompt = ""
+        if isinstance(itinerary, str):
+            itinerary_prompt = itinerary
+        elif itinerary:
+            header = (
+                f"Trip: {itinerary.get('trip_name', '')}, from"
+                f" {itinerary.get('origin', '')} to"
+                f" {itinerary.get('destination', '')},"
+                f" {itinerary.get('start_date', '')} to"
+                f" {itinerary.get('end_date', '')}"
+            )
+            days = [render(day, render_day) for day in itinerary.get("days", [])]
+            itinerary_prompt = "\n".join([header] + days)
+        profile = self.state.get(constants.PROF_KEY) or {}
+        profile_prompt = render(profile, render_user_profile) if profile else ""
+
+        # Only write what changed, to keep the state deltas small.
+        if snippets.keys() != cache.keys():
+            self.state[constants.PROMPT_CACHE] = snippets
+        if self.state.get(constants.ITIN_PROMPT) != itinerary_prompt:
+            self.state[constants.ITIN_PROMPT] = itinerary_prompt
+        if self.state.get(constants.PROF_PROMPT) != profile_prompt:
+            self.state[constants.PROF_PROMPT] = profile_prompt
+        self.state[constants.PROMPT_VERSIONS] = versions
+
+
+def refresh_trip_prompts(callback_context: CallbackContext):
+    """
+    Refreshes the prompt snippets of the trip in the session state.
+    Set this as the before_agent_callback of the agents whose instruction
+    embeds them.
+
+    Args:
+        callback_context: The callback context.
+    """
+    TripState(callback_context.state).refresh_prompts()
@@ -17,12 +17,12 @@
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
 
+from travel_concierge.shared_libraries.trip_state import refresh_trip_prompts
 from travel_concierge.sub_agents.in_trip import prompt
 from travel_concierge.sub_agents.in_trip.tools import (
+    cache_itinerary_timeline,
+    monitor_itinerary,
     transit_coordination,
-    flight_status_check,
-    event_booking_check,
-    weather_impact_check,
 )
 
 from travel_concierge.tools.memory import memorize
@@ -34,6 +34,7 @@ day_of_agent = Agent(
     name="day_of_agent",
     description="Day_of agent is the agent handling the travel logistics of a trip.",
     instruction=transit_coordination,
+    before_agent_callback=cache_itinerary_timeline,
 )
 
 
@@ -42,8 +43,9 @@ trip_monitor_agent = Agent(
     name="trip_monitor_agent",
     description="Monitor aspects of a itinerary and bring attention to items that necessitate changes",
     instruction=prompt.TRIP_MONITOR_INSTR,
-    tools=[flight_status_check, event_booking_check, weather_impact_check],
+    tools=[monitor_itinerary],
     output_key="daily_checks",  # can be sent via email.
+    before_agent_callback=refresh_trip_prompts,
 )
 
 
@@ -59,4 +61,5 @@ in_trip_agent = Agent(
         AgentTool(agent=day_of_agent), 
         memorize
     ],
+    before_agent_callback=refresh_trip_prompts,
 )
@@ -0,0 +1,216 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Batched status checks of all the events of an itinerary.
+
+The checks run concurrently against pluggable providers, and only the events
+that need the user's attention are reported, so that the trip_monitor agent
+needs a single tool call whatever the length of the itinerary.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Dict, List, Optional, Protocol, Union
+
+from travel_concierge.shared_libraries import types
+
+logger = logging.getLogger(__name__)
+
+
+class FlightStatusProvider(Protocol):
+    """Looks up delays and cancellations of flights."""
+
+    async def check_flight(
+        self,
+        flight_number: str,
+        flight_date: str,
+        checkin_time: str,
+        departure_time: str,
+    ) -> Optional[str]:
+        """Returns a description of the flight's problem, or None if it's on time."""
+
+
+class BookingProvider(Protocol):
+    """Looks up the status of bookings, e.g. closures or cancellations."""
+
+    async def check_booking(
+        self, event_name: str, event_date: str, event_location: str
+    ) -> Optional[str]:
+        """Returns a description of the booking's problem, or None if it's fine."""
+
+
+class WeatherProvider(Protocol):
+    """Looks up the weather forecast for activities."""
+
+    async def check_weather(
+        self, activity_name: str, activity_date: str, activity_location: str
+    ) -> Optional[str]:
+        """Returns how the weather may impact the activity, or None if it won't."""
+
+
+class MockFlightStatusProvider:
+    """Reports all flights as on time."""
+
+    async def check_flight(
+        self,
+        flight_number: str,
+        flight_date: str,
+        checkin_time: str,
+        departure_time: str,
+    ) -> Optional[str]:
+        return None
+
+
+class MockBookingProvider:
+    """Reports the Space Needle as closed, to illustrate an exception."""
+
+    async def check_booking(
+        self, event_name: str, event_date: str, event_location: str
+    ) -> Optional[str]:
+        if event_name.startswith("Space Needle"):
+            return f"{event_name} is closed."
+        return None
+
+
+class MockWeatherProvider:
+    """Reports fair weather for all activities."""
+
+    async def check_weather(
+        self, activity_name: str, activity_date: str, activity_location: str
+    ) -> Optional[str]:
+        return None
+
+
+def _event_name(event: Dict[str, Any]) -> str:
+    location = event.get("location") or {}
+    return location.get("name") or event.get("description", "")
+
+
+def _event_location(event: Dict[str, Any], itinerary: Dict[str, Any]) -> str:
+    location = event.get("location") or {}
+    return (
+        location.get("address")
+        or event.get("address")
+        or itinerary.get("destination", "")
+    )
+
+
+class TripMonitor:
+    """Runs the status checks of all the events of an itinerary at once.
+
+    Flights get a flight status check, hotels and visits that require booking
+    get a booking check, and visits get a weather check. Up to
+    `max_concurrent_checks` checks run at the same time, and each of them
+    gives up after `timeout_secs`.
+    """
+
+    def __init__(
+        self,
+        flights: Optional[FlightStatusProvider] = None,
+        bookings: Optional[BookingProvider] = None,
+        weather: Optional[WeatherProvider] = None,
+        max_concurrent_checks: int = 16,
+        timeout_secs: float = 30.0,
+    ):
+        self.flights = flights or MockFlightStatusProvider()
+        self.bookings = bookings or MockBookingProvider()
+        self.weather = weather or MockWeatherProvider()
+        self.max_concurrent_checks = max_concurrent_checks
+        self.timeout_secs = timeout_secs
+
+    def _plan_checks(
+        self, itinerary: Dict[str, Any]
+    ) -> List[tuple[Dict[str, Any], Awaitable[Optional[str]]]]:
+        """Returns the checks of the itinerary, with what to report for each."""
+        checks = []
+        for day in itinerary.get("days", []):
+            date = day.get("date", "")
+            for event in day.get("events", []):
+                name = _event_name(event)
+                location = _event_location(event, itinerary)
+                event_type = event.get("event_type")
+                if event_type == "flight":
+                    flight_number = event.get("flight_number", "")
+                    checks.append(
+                        (
+                            {"date": date, "event": flight_number, "check": "flight"},
+                            self.flights.check_flight(
+                                flight_number,
+                                date,
+                                event.get("boarding_time", ""),
+                                event.get("departure_time", ""),
+                            ),
+                        )
+                    )
+                if event_type == "hotel" or (
+                    event_type == "visit" and event.get("booking_required")
+                ):
+                    checks.append(
+                        (
+                            {"date": date, "event": name, "check": "booking"},
+                            self.bookings.check_booking(name, date, location),
+                        )
+                    )
+                if event_type == "visit":
+                    checks.append(
+                        (
+                            {"date": date, "event": name, "check": "weather"},
+                            self.weather.check_weather(name, date, location),
+                        )
+                    )
+        return checks
+
+    async def check_itinerary(
+        self, itinerary: Union[types.Itinerary, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Checks all the events of the itinerary concurrently.
+
+        Args:
+          itinerary: The itinerary, as a types.Itinerary or its JSON.
+
+        Returns:
+          A dict of the number of `checks` run, and the `exceptions`: the date,
+          event, check and issue of each event that needs attention, including
+          those whose check failed.
+        """
+        if isinstance(itinerary, types.Itinerary):
+            itinerary = itinerary.model_dump()
+        checks = self._plan_checks(itinerary)
+        semaphore = asyncio.Semaphore(self.max_concurrent_checks)
+
+        async def run(
+            report: Dict[str, Any], check: Awaitable[Optional[str]]
+        ) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    issue = await asyncio.wait_for(check, self.timeout_secs)
+                except asyncio.TimeoutError:
+                    issue = "Could not be checked: the check timed out."
+                except Exception as e:
+                    logger.exception(
+                        "The %s check of %s failed", report["check"], report["event"]
+                    )
+                    issue = f"Could not be checked: {e}"
+            return {**report, "issue": issue} if issue else None
+
+        results = await asyncio.gather(
+            *(run(report, check) for report, check in checks)
+        )
+        return {
+            "checks": len(checks),
+            "exceptions": [result for result in results if result],
+        }
+
+
+trip_monitor = TripMonitor()
@@ -17,26 +17,23 @@
 TRIP_MONITOR_INSTR = """
 Given an itinerary: 
 <itinerary>
-{itinerary}
+{_itinerary_prompt}
 </itinerary>
 
 and the user profile:
 <user_profile>
-{user_profile}
+{_user_profile_prompt}
 </user_profile>
 
 If the itinerary is empty, inform the user that you can help once there is an itinerary, and asks to transfer the user back to the `inspiration_agent`.
 Otherwise, follow the rest of the instruction.
 
-Identify these type of events, and note their details:
-- Flights: note flight number, date, check-in time and departure time.
-- Events that requires booking: note the event name, date and location.
-- Activities or visits that may be impacted by weather: note date, location and desired weather.
+Check the status of all the events at once, by calling `monitor_itinerary` a single time. It checks:
+- flights for delays or cancelations,
+- events that requires booking,
+- outdoor activities that may be affected by weather, with weather forecasts.
 
-For each identified events, checks their status using tools:s
-- flights delays or cancelations - use `flight_status_check`
-- events that requires booking - use `event_booking_check`
-- outdoor activities that may be affected by weather, weather forecasts - use `weather_impact`
+It only reports the events that have an issue, or that could not be checked. If there are none, tell the user that everything is on track.
 
 Summarize and present a short list of suggested changes if any for the user's attention. For example:
 - Flight XX123 is cancelled, suggest rebooking.
@@ -59,7 +56,7 @@ When instructed with the command "memorize" with a datetime to be stored under a
 
 The current trip itinerary.
 <itinerary>
-{itinerary}
+{_itinerary_prompt}
 </itinerary>
 
 The current time is "{itinerary_datetime}".
@@ -15,12 +15,17 @@
 """Tools for the in_trip, trip_monitor and day_of agents."""
 
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
+from google.adk.agents.callback_context import CallbackContext
 from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools import ToolContext
 
+from travel_concierge.sub_agents.in_trip import monitor
 from travel_concierge.sub_agents.in_trip import prompt
 from travel_concierge.shared_libraries import constants
+from travel_concierge.shared_libraries import timeline
+from travel_concierge.shared_libraries.trip_state import TripState
 
 
 def flight_status_check(flight_number: str, flight_date: str, checkin_time: str, departure_time: str):
@@ -53,17 +58,25 @@ def weather_impact_check(activity_name: str, activity_date: str, activity_locati
     return {"status": f"{activity_name} checked"}
 
 
-def get_event_time_as_destination(destin_json: Dict[str, Any], default_value: str):
-    """Returns an event time appropriate for the location type."""
-    match destin_json["event_type"]:
-        case "flight":
-            return destin_json["boarding_time"]
-        case "hotel":
-            return destin_json["check_in_time"]
-        case "visit":
-            return destin_json["start_time"]
-        case _:
-            return default_value
+async def monitor_itinerary(tool_context: ToolContext):
+    """
+    Checks all the flights, bookings and activities of the itinerary at once,
+    and reports only the events that need the user's attention.
+
+    Args:
+        tool_context: The ADK tool context.
+
+    Returns:
+        A dictionary with the number of checks run, and the exceptions found:
+        the date, event, check and issue of each.
+    """
+    itinerary = tool_context.state.get(constants.ITIN_KEY)
+    if not itinerary:
+        return {"status": "There is no itinerary to monitor."}
+    # Prefer the parsed itinerary, when it follows the schema.
+    return await monitor.trip_monitor.check_itinerary(
+        TripState(tool_context.state).itinerary or itinerary
+    )
 
 
 def parse_as_origin(origin_json: Dict[str, Any]):
@@ -124,7 +137,12 @@ def parse_as_destin(destin_json: Dict[str, Any]):
             return "Local in the region", "as soon as possible"
 
 
-def find_segment(profile: Dict[str, Any], itinerary: Dict[str, Any], current_datetime: str):
+def find_segment(
+    profile: Dict[str, Any],
+    itinerary: Dict[str, Any],
+    current_datetime: str,
+    itin_timeline: Optional[Dict[str, Any]] = None,
+):
     """
     Find the events to travel from A to B
     This follows the itinerary schema in types.Itinerary.
@@ -135,7 +153,9 @@ def find_segment(profile: Dict[str, Any], itinerary: Dict[str, Any], current_dat
     Args:
         profile: A dictionary containing the user's profile.
         itinerary: A dictionary containing the user's itinerary.
-        current_datetime: A string containing the current date and time.   
+        current_datetime: A string containing the current date and time.
+        itin_timeline: The itinerary's timeline from `timeline.build_timeline`,
+            built from the itinerary if not given.
 
     Returns:
       from - capture information about the origin of this segment.
@@ -144,40 +164,18 @@ def find_segment(profile: Dict[str, Any], itinerary: Dict[str, Any], current_dat
     """
     # Expects current_datetime is in '2024-03-15 04:00:00' format
     datetime_object = datetime.fromisoformat(current_datetime)
-    current_date = datetime_object.strftime("%Y-%m-%d")
-    current_time = datetime_object.strftime("%H:%M")
-    event_date = current_date
-    event_time = current_time
-
-    print("-----")
-    print("MATCH DATE", current_date, current_time)
-    print("-----")
-
-    # defaults
-    origin_json = profile["home"]
-    destin_json = profile["home"]
-
-    leave_by = "No movement required"
-    arrive_by = "No movement required"
-
-    # Go through the itinerary to find where we are base on the current date and time
-    for day in itinerary.get("days", []):
-        event_date = day["date"]
-        for event in day["events"]:
-            # for every event we update the origin and destination until
-            # we find one we need to pay attention
-            origin_json = destin_json
-            destin_json = event
-            event_time = get_event_time_as_destination(destin_json, current_time)
-            # The moment we find an event that's in the immediate future we stop to handle it
-            print(
-                event["event_type"], event_date, current_date, event_time, current_time
-            )
-            if event_date >= current_date and event_time >= current_time:
-                break
-        else:  # if inner loop not break, continue
-            continue
-        break  # else break too.
+    if itin_timeline is None:
+        itin_timeline = timeline.build_timeline(itinerary)
+
+    # The event in the immediate future is the destination, and the one before
+    # it, or home at the start of the trip, is the origin.
+    origin_json, destin_json = timeline.find_next_event(
+        itinerary, itin_timeline, datetime_object
+    )
+    if destin_json is None:
+        destin_json = profile["home"]
+    if origin_json is None:
+        origin_json = profile["home"]
 
     #
     # Construct prompt descriptions for travel_from, travel_to, arrive_by
@@ -193,7 +191,6 @@ def _inspect_itinerary(state: dict[str: Any]):
 
     itinerary = state[constants.ITIN_KEY]
     profile = state[constants.PROF_KEY]
-    print("itinerary", itinerary)
     current_datetime = itinerary["start_date"] + " 00:00"
     if state.get(constants.ITIN_DATETIME, ""):
         current_datetime = state[constants.ITIN_DATETIME]
@@ -201,6 +198,18 @@ def _inspect_itinerary(state: dict[str: Any]):
     return itinerary, profile, current_datetime
 
 
+def cache_itinerary_timeline(callback_context: CallbackContext):
+    """
+    Caches the timeline of the itinerary in the session state.
+    Set this as the before_agent_callback of the day_of agent, whose
+    instruction can only read the state.
+
+    Args:
+        callback_context: The callback context.
+    """
+    timeline.refresh_timeline(callback_context.state)
+
+
 def transit_coordination(readonly_context: ReadonlyContext):
     """Dynamically generates an instruction for the day_of agent."""
 
@@ -212,19 +221,9 @@ def transit_coordination(readonly_context: ReadonlyContext):
 
     itinerary, profile, current_datetime = _inspect_itinerary(state)
     travel_from, travel_to, leave_by, arrive_by = find_segment(
-        profile, itinerary, current_datetime
+        profile, itinerary, current_datetime, timeline.get_timeline(state)
     )
 
-    print("-----")
-    print(itinerary["trip_name"])
-    print(current_datetime)
-    print("-----")
-    print("-----")
-    print("TRIP EVENT")
-    print("FROM", travel_from, leave_by)
-    print("TO", travel_to, arrive_by)
-    print("-----")
-
     return prompt.LOGISTIC_INSTR_TEMPLATE.format(
         CURRENT_TIME=current_datetime,
         TRAVEL_FROM=travel_from,
@@ -16,6 +16,7 @@
 
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
+from travel_concierge.shared_libraries.trip_state import refresh_trip_prompts
 from travel_concierge.shared_libraries.types import DestinationIdeas, POISuggestions, json_response_config
 from travel_concierge.sub_agents.inspiration import prompt
 from travel_concierge.tools.places import map_tool
@@ -51,4 +52,5 @@ inspiration_agent = Agent(
     description="A travel inspiration agent who inspire users, and discover their next vacations; Provide information about places, activities, interests,",
     instruction=prompt.INSPIRATION_AGENT_INSTR,
     tools=[AgentTool(agent=place_agent), AgentTool(agent=poi_agent), map_tool],
+    before_agent_callback=refresh_trip_prompts,
 )
@@ -41,7 +41,7 @@ As part of that, user may ask you for general history or knowledge about a desti
 - Please use the context info below for any user preferences:
 Current user:
   <user_profile>
-  {user_profile}
+  {_user_profile_prompt}
   </user_profile>
 
 Current time: {_time}
@@ -18,6 +18,7 @@ from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
 from google.genai.types import GenerateContentConfig
 from travel_concierge.shared_libraries import types
+from travel_concierge.shared_libraries.trip_state import mark_itinerary_changed
 from travel_concierge.sub_agents.planning import prompt
 from travel_concierge.tools.memory import memorize
 
@@ -32,6 +33,7 @@ itinerary_agent = Agent(
     output_schema=types.Itinerary,
     output_key="itinerary",
     generate_content_config=types.json_response_config,
+    after_agent_callback=mark_itinerary_changed,
 )
 
 
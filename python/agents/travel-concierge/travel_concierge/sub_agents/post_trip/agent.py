@@ -16,6 +16,7 @@
 
 from google.adk.agents import Agent
 
+from travel_concierge.shared_libraries.trip_state import refresh_trip_prompts
 from travel_concierge.sub_agents.post_trip import prompt
 from travel_concierge.tools.memory import memorize
 
@@ -25,4 +26,5 @@ post_trip_agent = Agent(
     description="A follow up agent to learn from user's experience; In turn improves the user's future trips planning and in-trip experience.",
     instruction=prompt.POSTTRIP_INSTR,
     tools=[memorize],
+    before_agent_callback=refresh_trip_prompts,
 )
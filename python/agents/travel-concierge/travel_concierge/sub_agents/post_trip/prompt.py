@@ -19,7 +19,7 @@ You are a post-trip travel assistant.  Based on the user's request and any provi
 
 Given the itinerary:
 <itinerary>
-{itinerary}
+{_itinerary_prompt}
 </itinerary>
 
 If the itinerary is empty, inform the user that you can help once there is an itinerary, and asks to transfer the user back to the `inspiration_agent`.
@@ -17,6 +17,7 @@
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
 from travel_concierge.shared_libraries import types
+from travel_concierge.shared_libraries.trip_state import refresh_trip_prompts
 from travel_concierge.sub_agents.pre_trip import prompt
 from travel_concierge.tools.search import google_search_grounding
 
@@ -38,4 +39,5 @@ pre_trip_agent = Agent(
     description="Given an itinerary, this agent keeps up to date and provides relevant travel information to the user before the trip.",
     instruction=prompt.PRETRIP_AGENT_INSTR,
     tools=[google_search_grounding, AgentTool(agent=what_to_pack_agent)],
+    before_agent_callback=refresh_trip_prompts,
 )
@@ -21,12 +21,12 @@ Several tools are provided for your use.
 
 Given the itinerary:
 <itinerary>
-{itinerary}
+{_itinerary_prompt}
 </itinerary>
 
 and the user profile:
 <user_profile>
-{user_profile}
+{_user_profile_prompt}
 </user_profile>
 
 If the itinerary is empty, inform the user that you can help once there is an itinerary, and asks to transfer the user back to the `inspiration_agent`.
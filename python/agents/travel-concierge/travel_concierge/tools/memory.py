@@ -14,7 +14,9 @@
 
 """The 'memorize' tool for several agents to affect session states."""
 
+import copy
 from datetime import datetime
+import functools
 import json
 import os
 from typing import Dict, Any
@@ -24,6 +26,7 @@ from google.adk.sessions.state import State
 from google.adk.tools import ToolContext
 
 from travel_concierge.shared_libraries import constants
+from travel_concierge.shared_libraries.trip_state import TripState, mark_changed
 
 SAMPLE_SCENARIO_PATH = os.getenv(
     "TRAVEL_CONCIERGE_SCENARIO", "travel_concierge/profiles/itinerary_empty_default.json"
@@ -42,11 +45,7 @@ def memorize_list(key: str, value: str, tool_context: ToolContext):
     Returns:
         A status message.
     """
-    mem_dict = tool_context.state
-    if key not in mem_dict:
-        mem_dict[key] = []
-    if value not in mem_dict[key]:
-        mem_dict[key].append(value)
+    TripState(tool_context.state).add_to_list(key, value)
     return {"status": f'Stored "{key}": "{value}"'}
 
 
@@ -64,6 +63,7 @@ def memorize(key: str, value: str, tool_context: ToolContext):
     """
     mem_dict = tool_context.state
     mem_dict[key] = value
+    mark_changed(mem_dict, key)
     return {"status": f'Stored "{key}": "{value}"'}
 
 
@@ -79,10 +79,7 @@ def forget(key: str, value: str, tool_context: ToolContext):
     Returns:
         A status message.
     """
-    if tool_context.state[key] is None:
-        tool_context.state[key] = []
-    if value in tool_context.state[key]:
-        tool_context.state[key].remove(value)
+    TripState(tool_context.state).remove_from_list(key, value)
     return {"status": f'Removed "{key}": "{value}"'}
 
 
@@ -101,6 +98,8 @@ def _set_initial_states(source: Dict[str, Any], target: State | dict[str, Any]):
         target[constants.ITIN_INITIALIZED] = True
 
         target.update(source)
+        for key in source:
+            mark_changed(target, key)
 
         itinerary = source.get(constants.ITIN_KEY, {})
         if itinerary:
@@ -108,6 +107,17 @@ def _set_initial_states(source: Dict[str, Any], target: State | dict[str, Any]):
             target[constants.ITIN_END_DATE] = itinerary[constants.END_DATE]
             target[constants.ITIN_DATETIME] = itinerary[constants.START_DATE]
 
+    TripState(target).refresh_prompts()
+
+
+@functools.lru_cache
+def _load_scenario(path: str) -> Dict[str, Any]:
+    """Loads a scenario file once, for all the sessions."""
+    with open(path, "r") as file:
+        data = json.load(file)
+        print(f"\nLoading Initial State: {data}\n")
+    return data
+
 
 def _load_precreated_itinerary(callback_context: CallbackContext):
     """
@@ -117,10 +127,11 @@ def _load_precreated_itinerary(callback_context: CallbackContext):
 
     Args:
         callback_context: The callback context.
-    """    
-    data = {}
-    with open(SAMPLE_SCENARIO_PATH, "r") as file:
-        data = json.load(file)
-        print(f"\nLoading Initial State: {data}\n")
+    """
+    if constants.ITIN_INITIALIZED in callback_context.state:
+        TripState(callback_context.state).refresh_prompts()
+        return
 
-    _set_initial_states(data["state"], callback_context.state)
+    data = _load_scenario(SAMPLE_SCENARIO_PATH)
+    # Copy the scenario, so that sessions don't share its lists and dicts.
+    _set_initial_states(copy.deepcopy(data["state"]), callback_context.state)
@@ -14,15 +14,51 @@
 
 """Wrapper to Google Maps Places API."""
 
+import asyncio
 import os
-from typing import Dict, List, Any
+import tempfile
+from typing import Dict, List, Any, Optional
 
 from google.adk.tools import ToolContext
-import requests
+import httpx
+
+from travel_concierge.shared_libraries import places_cache
+
+PLACES_API_URL = "https://maps.googleapis.com/maps/api/place"
+
+PLACES_CACHE_PATH = os.getenv(
+    "GOOGLE_PLACES_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "travel_concierge_places.sqlite"),
+)
 
 
 class PlacesService:
-    """Wrapper to Placees API."""
+    """Wrapper to Placees API.
+
+    Requests share a pool of at most `max_concurrent_requests` connections,
+    concurrent lookups of the same place share one request, and the places
+    found are cached in `cache_path` for `cache_ttl_secs`.
+    """
+
+    def __init__(
+        self,
+        base_url: str = PLACES_API_URL,
+        cache_path: str = PLACES_CACHE_PATH,
+        cache_ttl_secs: float = places_cache.DEFAULT_TTL_SECS,
+        max_concurrent_requests: int = 8,
+        timeout_secs: float = 10.0,
+    ):
+        self.base_url = base_url
+        self.cache_path = cache_path
+        self.cache_ttl_secs = cache_ttl_secs
+        self.max_concurrent_requests = max_concurrent_requests
+        self.timeout_secs = timeout_secs
+        # Created on first use, so that the service can be pickled for
+        # deployment.
+        self._cache: Optional[places_cache.PlacesCache] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
 
     def _check_key(self):
         if (
@@ -31,49 +67,96 @@ class PlacesService:
             # https://developers.google.com/maps/documentation/places/web-service/get-api-key
             self.places_api_key = os.getenv("GOOGLE_PLACES_API_KEY")
 
-    def find_place_from_text(self, query: str) -> Dict[str, str]:
+    def _get_cache(self) -> places_cache.PlacesCache:
+        if self._cache is None:
+            self._cache = places_cache.PlacesCache(
+                self.cache_path, ttl_secs=self.cache_ttl_secs
+            )
+        return self._cache
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # The client's connections are bound to the event loop they were
+        # opened on.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                # Waiting for a free connection is bounded by the tool call.
+                timeout=httpx.Timeout(self.timeout_secs, pool=None),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrent_requests,
+                    max_keepalive_connections=self.max_concurrent_requests,
+                ),
+            )
+            self._client_loop = loop
+            self._in_flight = {}
+        return self._client
+
+    async def _fetch_candidate(self, query: str) -> Optional[Dict[str, Any]]:
+        """Fetches the first candidate for the query from the Places API."""
+        response = await self._get_client().get(
+            "/findplacefromtext/json",
+            params={
+                "input": query,
+                "inputtype": "textquery",
+                "fields": "place_id,formatted_address,name,photos,geometry",
+                "key": self.places_api_key,
+            },
+        )
+        response.raise_for_status()
+        candidates = response.json().get("candidates")
+        return candidates[0] if candidates else None
+
+    async def _find_candidate(self, query: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached candidate for the query, or fetches it."""
+        cache_key = places_cache.normalize_query(query)
+        candidate = self._get_cache().get(cache_key)
+        if candidate is not None:
+            return candidate
+
+        self._get_client()  # Resets the requests in flight on a new loop.
+        if cache_key not in self._in_flight:
+            task = asyncio.ensure_future(self._fetch_candidate(query))
+            self._in_flight[cache_key] = task
+            task.add_done_callback(
+                lambda _: self._in_flight.pop(cache_key, None)
+            )
+        candidate = await asyncio.shield(self._in_flight[cache_key])
+        if candidate is not None:
+            self._get_cache().put(cache_key, candidate)
+        return candidate
+
+    async def find_place_from_text(self, query: str) -> Dict[str, str]:
         """Fetches place details using a text query."""
         self._check_key()
-        places_url = "https://maps.googleapis.com/maps/api/place/findplacefromtext/json"
-        params = {
-            "input": query,
-            "inputtype": "textquery",
-            "fields": "place_id,formatted_address,name,photos,geometry",
-            "key": self.places_api_key,
-        }
-
         try:
-            response = requests.get(places_url, params=params)
-            response.raise_for_status()
-            place_data = response.json()
-
-            if not place_data.get("candidates"):
-                return {"error": "No places found."}
-
-            # Extract data for the first candidate
-            place_details = place_data["candidates"][0]
-            place_id = place_details["place_id"]
-            place_name = place_details["name"]
-            place_address = place_details["formatted_address"]
-            photos = self.get_photo_urls(place_details.get("photos", []), maxwidth=400)
-            map_url = self.get_map_url(place_id)
-            location = place_details["geometry"]["location"]
-            lat = str(location["lat"])
-            lng = str(location["lng"])
-
-            return {
-                "place_id": place_id,
-                "place_name": place_name,
-                "place_address": place_address,
-                "photos": photos,
-                "map_url": map_url,
-                "lat": lat,
-                "lng": lng,
-            }
-
-        except requests.exceptions.RequestException as e:
+            place_details = await self._find_candidate(query)
+        except (httpx.HTTPError, ValueError) as e:
             return {"error": f"Error fetching place data: {e}"}
 
+        if place_details is None:
+            return {"error": "No places found."}
+
+        # Extract data for the first candidate
+        place_id = place_details["place_id"]
+        place_name = place_details["name"]
+        place_address = place_details["formatted_address"]
+        photos = self.get_photo_urls(place_details.get("photos", []), maxwidth=400)
+        map_url = self.get_map_url(place_id)
+        location = place_details["geometry"]["location"]
+        lat = str(location["lat"])
+        lng = str(location["lng"])
+
+        return {
+            "place_id": place_id,
+            "place_name": place_name,
+            "place_address": place_address,
+            "photos": photos,
+            "map_url": map_url,
+            "lat": lat,
+            "lng": lng,
+        }
+
     def get_photo_urls(self, photos: List[Dict[str, Any]], maxwidth: int = 400) -> List[str]:
         """Extracts photo URLs from the 'photos' list."""
         photo_urls = []
@@ -91,10 +174,10 @@ class PlacesService:
 places_service = PlacesService()
 
 
-def map_tool(key: str, tool_context: ToolContext):
+async def map_tool(key: str, tool_context: ToolContext):
     """
     This is going to inspect the pois stored under the specified key in the state.
-    One by one it will retrieve the accurate Lat/Lon from the Map API, if the Map API is available for use.
+    It will retrieve the accurate Lat/Lon of all of them from the Map API, if the Map API is available for use.
 
     Args:
         key: The key under which the POIs are stored.
@@ -111,9 +194,15 @@ def map_tool(key: str, tool_context: ToolContext):
         tool_context.state[key]["places"] = []
 
     pois = tool_context.state[key]["places"]
-    for poi in pois:  # The pydantic object types.POI
-        location = poi["place_name"] + ", " + poi["address"]
-        result = places_service.find_place_from_text(location)
+    results = await asyncio.gather(
+        *(
+            places_service.find_place_from_text(
+                poi["place_name"] + ", " + poi["address"]
+            )
+            for poi in pois  # The pydantic object types.POI
+        )
+    )
+    for poi, result in zip(pois, results):
         # Fill the place holders with verified information.
         poi["place_id"] = result["place_id"] if "place_id" in result else None
         poi["map_url"] = result["map_url"] if "map_url" in result else None